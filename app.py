@@ -2,19 +2,56 @@
 Flask Web Application for Schedule Conflict Detection System
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from datetime import time, datetime
-from conflict_detector import Schedule, ScheduleConflictDetector, format_conflict_report
+from conflict_detector import (
+    Schedule, ConflictIndex, ConflictResultCache, ConflictReportWriter,
+    format_conflict_report
+)
 from observer import ScheduleSubject, StudentObserver, LecturerObserver
+from availability import OccupancyIndex
+from conflict_repair import ConflictRepairer
+from enrollment import EnrollmentIndex, StudentConflictDetector
+from schedule_store import ScheduleStore
+from schedule_import import ScheduleImporter, iter_records, IMPORT_FORMATS
+from rules import RuleEngine, RuleBasedDetector
+from rwlock import ReadWriteLock
+from contextlib import contextmanager
+import functools
+import io
 import json
+import os
+import threading
 
 app = Flask(__name__)
 
-# Global state
-detector = ScheduleConflictDetector()
+# Global state: schedules and the conflict log live in SQLite; the
+# in-memory indexes are rebuilt from it on startup
+store = ScheduleStore(os.environ.get('JADWAL_DB', 'jadwal.db'))
+# Conflict listings, statistics and reports evaluate every rule registered
+# here, e.g. rule_engine.register(LecturerTravelBufferRule(15)); new
+# bookings are still checked against room and lecturer overlaps only
+rule_engine = RuleEngine()
+detector = RuleBasedDetector(rule_engine)
+conflict_index = ConflictIndex(store.schedules())
+conflict_cache = ConflictResultCache(detector)
+occupancy = OccupancyIndex(slot_minutes=5, schedules=conflict_index)
 subject = ScheduleSubject()
-schedules = []
-conflicts_log = []
+
+# Routes publish events through this hook; asgi_app.py replaces it so
+# observers are notified in background tasks instead of inside the request
+notify = subject.notify
+
+# Guards the store together with the in-memory indexes and caches:
+# any number of reading routes at once, writing routes one at a time.
+# It only coordinates threads of this process; other worker processes
+# on the same database are kept apart by the store's transactions, and
+# their writes are picked up through state_version
+state_lock = ReadWriteLock()
+
+# Database version the in-memory indexes reflect; a write by another
+# worker process moves store.version past it
+state_version = store.version
 
 # Setup observers
 student_observer = StudentObserver("SYSTEM", "admin@university.ac.id")
@@ -22,6 +59,75 @@ lecturer_observer = LecturerObserver("SYSTEM", "Admin")
 subject.attach(student_observer)
 subject.attach(lecturer_observer)
 
+# A rejected POST only reports the first few conflicts it finds
+MAX_REPORTED_CONFLICTS = 5
+
+# Real free placements offered per conflict suggestion list
+MAX_SUGGESTED_SLOTS = 3
+
+# Suggestions of listed conflicts, keyed by (type, schedule ids) and valid
+# for one conflict_cache version: the free-slot search behind them only
+# changes when a write bumps the version
+suggestion_cache = {'version': -1, 'entries': {}}
+suggestion_lock = threading.Lock()
+
+
+def sync_state():
+    """Rebuild the in-memory indexes if the database moved past them; needs the write lock"""
+    global conflict_index, occupancy, state_version
+    # Read the version first: rows written after it only cause another sync
+    version = store.version
+    if version == state_version:
+        return
+    conflict_index = ConflictIndex(store.schedules())
+    occupancy = OccupancyIndex(slot_minutes=5, schedules=conflict_index)
+    conflict_cache.bump()
+    state_version = version
+
+
+@contextmanager
+def reading_state():
+    """Hold the state lock shared, after catching up with other processes' writes"""
+    if store.version != state_version:
+        with state_lock.write():
+            sync_state()
+    with state_lock.read():
+        yield
+
+
+@contextmanager
+def writing_state():
+    """
+    Hold the state lock exclusively inside one database write transaction
+    
+    No other process can write to the database meanwhile, so the indexes
+    synced on entry stay current until the route's own writes, which it
+    applies to them as well.
+    """
+    global state_version
+    with state_lock.write(), store.transaction():
+        sync_state()
+        yield
+        state_version = store.version
+
+
+def reads_state(view):
+    """Run a route holding the state lock shared"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with reading_state():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def writes_state(view):
+    """Run a route holding the state lock exclusively"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with writing_state():
+            return view(*args, **kwargs)
+    return wrapper
+
 
 def time_to_string(t):
     """Convert time object to string"""
@@ -44,25 +150,74 @@ def index():
     return render_template('index.html')
 
 
+# Serialized fields of a schedule, selectable with ?fields=
+SCHEDULE_FIELDS = {
+    'id': lambda s: s.id,
+    'course_name': lambda s: s.course_name,
+    'hari': lambda s: s.hari,
+    'jam_mulai': lambda s: time_to_string(s.jam_mulai),
+    'jam_selesai': lambda s: time_to_string(s.jam_selesai),
+    'ruangan': lambda s: s.ruangan,
+    'dosen': lambda s: s.dosen,
+}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
 @app.route('/api/schedules', methods=['GET'])
+@reads_state
 def get_schedules():
-    """Get all schedules"""
-    schedules_data = [
-        {
-            'id': s.id,
-            'course_name': s.course_name,
-            'hari': s.hari,
-            'jam_mulai': time_to_string(s.jam_mulai),
-            'jam_selesai': time_to_string(s.jam_selesai),
-            'ruangan': s.ruangan,
-            'dosen': s.dosen
-        }
-        for s in schedules
-    ]
-    return jsonify(schedules_data)
+    """
+    Get one page of schedules
+    
+    Query params:
+        hari, ruangan, dosen, course_name: Exact-match filters
+        jam_mulai, jam_selesai: Only schedules overlapping this window
+        fields: Comma-separated fields to include (default: all)
+        cursor: next_cursor of the previous page
+        limit: Page size (default 100, at most 1000)
+    
+    The response carries an ETag of the schedule-set version; a request
+    whose If-None-Match still matches gets 304 without touching the store.
+    """
+    etag = store.etag
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    args = request.args
+    fields = args.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else list(SCHEDULE_FIELDS)
+    unknown = [f for f in fields if f not in SCHEDULE_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    try:
+        after = int(args.get('cursor', 0))
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        start = string_to_time(args['jam_mulai']) if args.get('jam_mulai') else None
+        end = string_to_time(args['jam_selesai']) if args.get('jam_selesai') else None
+    except (ValueError, IndexError):
+        return jsonify({'error': 'cursor and limit must be integers, times HH:MM'}), 400
+    
+    page, next_cursor = store.page(
+        hari=args.get('hari'), ruangan=args.get('ruangan'), dosen=args.get('dosen'),
+        course_name=args.get('course_name'), start=start, end=end, after=after, limit=limit
+    )
+    getters = [(f, SCHEDULE_FIELDS[f]) for f in fields]
+    response = jsonify({
+        'schedules': [{f: get(s) for f, get in getters} for s in page],
+        'next_cursor': None if next_cursor is None else str(next_cursor)
+    })
+    response.set_etag(etag)
+    # Let browsers keep the page but revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @app.route('/api/schedules', methods=['POST'])
+@writes_state
 def add_schedule():
     """Add a new schedule"""
     try:
@@ -72,6 +227,9 @@ def add_schedule():
         if not all(key in data for key in ['id', 'course_name', 'hari', 'jam_mulai', 'jam_selesai', 'ruangan', 'dosen']):
             return jsonify({'error': 'Missing required fields'}), 400
         
+        if data['id'] in store:
+            return jsonify({'error': f"Schedule ID {data['id']} already exists"}), 409
+        
         # Create schedule object
         new_schedule = Schedule(
             id=data['id'],
@@ -83,54 +241,57 @@ def add_schedule():
             course_name=data['course_name']
         )
         
-        # Check for conflicts
-        test_schedules = schedules + [new_schedule]
-        conflicts = detector.detect_schedule_conflict(test_schedules)
+        # Check against the stored timetable (indexed range queries) and
+        # insert in the same atomic step
+        conflicts = store.add_checked(new_schedule, limit=MAX_REPORTED_CONFLICTS)
         
         if conflicts:
             conflict_details = [
                 {
                     'type': c.conflict_type,
-                    'with_schedule': c.affected_schedules[1].id if len(c.affected_schedules) > 1 else 'Unknown',
+                    'with_schedule': c.affected_schedules[0].id,
                     'details': c.details,
                     'suggestions': get_conflict_suggestions({
                         'type': c.conflict_type,
                         'details': c.details
-                    })
+                    }, new_schedule)
                 }
                 for c in conflicts
             ]
             
             # Log conflict
-            conflicts_log.append({
+            store.log({
                 'timestamp': datetime.now().isoformat(),
                 'schedule_id': data['id'],
                 'status': 'REJECTED',
                 'conflicts': conflict_details
             })
             
-            subject.notify('SCHEDULE_CONFLICT_DETECTED', {
+            notify('SCHEDULE_CONFLICT_DETECTED', {
                 'schedule_id': data['id'],
                 'conflict_count': len(conflicts)
             })
             
+            found = f'{len(conflicts)}+' if len(conflicts) == MAX_REPORTED_CONFLICTS else len(conflicts)
             return jsonify({
-                'error': f'Conflict detected: {len(conflicts)} conflicts found',
+                'error': f'Conflict detected: {found} conflicts found',
                 'conflicts': conflict_details
             }), 409
         
-        # Add schedule
-        schedules.append(new_schedule)
+        # Index the stored schedule
+        conflict_index.add(new_schedule)
+        occupancy.add(new_schedule)
+        conflict_cache.bump()
         
         # Log success
-        conflicts_log.append({
+        store.log({
             'timestamp': datetime.now().isoformat(),
             'schedule_id': data['id'],
             'status': 'ADDED',
             'conflicts': []
         })
         
-        subject.notify('SCHEDULE_ADDED', {
+        notify('SCHEDULE_ADDED', {
             'schedule_id': data['id'],
             'course_name': data['course_name']
         })
@@ -152,32 +313,152 @@ def add_schedule():
         return jsonify({'error': str(e)}), 400
 
 
+IMPORT_MIMETYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+}
+
+
+@app.route('/api/schedules/import', methods=['POST'])
+def import_schedules():
+    """
+    Bulk import schedules from a CSV or JSON Lines upload
+    
+    The upload is the request body, or a multipart file field named 'file'.
+    It is read and parsed without any lock held, so a slow upload never
+    blocks other requests. Only then, under the write lock, every row
+    is validated and checked against the timetable and the rows before it
+    in a single pass, and the batch is committed.
+    
+    Query params:
+        format: 'csv' or 'jsonl' (default: from the content type or file name)
+        on_error: 'abort' (default) commits nothing if any row is invalid,
+            duplicated or conflicting; 'skip' commits the rows that fit
+    """
+    upload = request.files.get('file')
+    fmt = request.args.get('format')
+    if fmt is None:
+        if upload is not None:
+            fmt = upload.filename.rsplit('.', 1)[-1].lower() if upload.filename else None
+            fmt = 'jsonl' if fmt == 'ndjson' else fmt
+        else:
+            fmt = IMPORT_MIMETYPES.get(request.mimetype)
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(IMPORT_FORMATS)}"}), 400
+    
+    on_error = request.args.get('on_error', 'abort')
+    if on_error not in ScheduleImporter.ON_ERROR:
+        return jsonify({'error': "on_error must be 'abort' or 'skip'"}), 400
+    
+    raw = upload.stream if upload is not None else request.stream
+    lines = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    try:
+        records = list(iter_records(lines, fmt))
+    except UnicodeDecodeError:
+        return jsonify({'error': 'Upload must be UTF-8 text'}), 400
+    
+    with writing_state():
+        # Built here: syncing with other processes may replace conflict_index
+        report = ScheduleImporter(conflict_index, on_error, MAX_REPORTED_CONFLICTS).check(records)
+        if report.accepted:
+            # One transaction for the whole batch, one cache invalidation
+            store.add_many(report.accepted)
+            for schedule in report.accepted:
+                conflict_index.add(schedule)
+                occupancy.add(schedule)
+            conflict_cache.bump()
+            
+            store.log({
+                'timestamp': datetime.now().isoformat(),
+                'schedule_id': None,
+                'status': 'IMPORTED',
+                'conflicts': [issue.as_dict() for issue in report.issues[:MAX_REPORTED_CONFLICTS]],
+                'imported': len(report.accepted)
+            })
+            notify('SCHEDULES_IMPORTED', {
+                'count': len(report.accepted),
+                'rejected': len(report.issues)
+            })
+    
+    if report.aborted:
+        return jsonify({'error': f'Import aborted: {len(report.issues)} rows rejected', **report.as_dict()}), 409
+    return jsonify(report.as_dict()), 201 if report.accepted else 200
+
+
 @app.route('/api/schedules/<schedule_id>', methods=['DELETE'])
+@writes_state
 def delete_schedule(schedule_id):
     """Delete a schedule"""
-    global schedules
-    
-    old_count = len(schedules)
-    schedules = [s for s in schedules if s.id != schedule_id]
-    
-    if len(schedules) == old_count:
+    if store.remove(schedule_id) is None:
         return jsonify({'error': 'Schedule not found'}), 404
     
+    conflict_index.remove(schedule_id)
+    occupancy.remove(schedule_id)
+    conflict_cache.bump()
+    
     # Log deletion
-    conflicts_log.append({
+    store.log({
         'timestamp': datetime.now().isoformat(),
         'schedule_id': schedule_id,
         'status': 'DELETED',
         'conflicts': []
     })
     
-    subject.notify('SCHEDULE_REMOVED', {'schedule_id': schedule_id})
+    notify('SCHEDULE_REMOVED', {'schedule_id': schedule_id})
     
     return jsonify({'message': 'Schedule deleted successfully'})
 
 
-def get_conflict_suggestions(conflict):
-    """Generate resolution suggestions for a conflict"""
+@app.route('/api/availability', methods=['GET'])
+@reads_state
+def get_availability():
+    """
+    Check whether a room and/or lecturer is free in a time slot
+    
+    Query params:
+        hari, jam_mulai, jam_selesai: The slot to check (required)
+        ruangan: Room to check (optional)
+        dosen: Lecturer to check (optional)
+    """
+    args = request.args
+    if not all(args.get(key) for key in ('hari', 'jam_mulai', 'jam_selesai')):
+        return jsonify({'error': 'hari, jam_mulai and jam_selesai are required'}), 400
+    
+    try:
+        start = string_to_time(args['jam_mulai'])
+        end = string_to_time(args['jam_selesai'])
+    except (ValueError, IndexError):
+        return jsonify({'error': 'Times must be formatted as HH:MM'}), 400
+    
+    day = args['hari']
+    room = args.get('ruangan')
+    lecturer = args.get('dosen')
+    room_free = occupancy.is_room_free(day, room, start, end) if room else None
+    lecturer_free = occupancy.is_lecturer_free(day, lecturer, start, end) if lecturer else None
+    
+    return jsonify({
+        'hari': day,
+        'jam_mulai': time_to_string(start),
+        'jam_selesai': time_to_string(end),
+        'ruangan': room,
+        'dosen': lecturer,
+        'room_free': room_free,
+        'lecturer_free': lecturer_free,
+        'available': room_free is not False and lecturer_free is not False
+    })
+
+
+def get_conflict_suggestions(conflict, schedule=None, ignore_id=None):
+    """
+    Generate resolution suggestions for a conflict
+    
+    Args:
+        conflict: Dict with the conflict 'type' and 'details'
+        schedule: The schedule to move; when given, real free placements
+            from the occupancy index are suggested first
+        ignore_id: Indexed schedule whose own booking should not count
+    """
     suggestions = []
     
     if conflict['type'] == 'room_conflict':
@@ -189,7 +470,7 @@ def get_conflict_suggestions(conflict):
         suggestions = [
             f"🔄 Reschedule '{course1}' to a different day or time slot",
             f"🔄 Reschedule '{course2}' to a different day or time slot",
-            f"🏢 Move one course to a different room (e.g., Lab 302, Lab 303) on {day}",
+            f"🏢 Move one course to a different room on {day}",
             f"⏰ Stagger the time slots: adjust start/end times to avoid overlap in {room}",
             f"🎯 Consider holding one course online to free up {room}"
         ]
@@ -207,47 +488,430 @@ def get_conflict_suggestions(conflict):
             f"🎓 Split one course section and assign to another qualified lecturer"
         ]
     
+    if schedule is not None and suggestions:
+        suggestions = [
+            f"📍 Move '{schedule.course_name or schedule.id}' to {slot.ruangan}, {slot.hari} "
+            f"{time_to_string(slot.jam_mulai)}-{time_to_string(slot.jam_selesai)} (free)"
+            for slot in find_free_slots_for(schedule, ignore_id=ignore_id, limit=MAX_SUGGESTED_SLOTS)
+        ] + suggestions
+    
     return suggestions
 
 
+def find_free_slots_for(schedule, ignore_id=None, limit=10):
+    """Free placements for a schedule's lecturer and duration, closest to its current slot first"""
+    duration = (schedule.jam_selesai.hour * 60 + schedule.jam_selesai.minute
+                - schedule.jam_mulai.hour * 60 - schedule.jam_mulai.minute)
+    if duration <= 0:
+        return []
+    return occupancy.find_free_slots(
+        duration,
+        lecturer=schedule.dosen,
+        near=(schedule.hari, schedule.jam_mulai, schedule.ruangan),
+        ignore_id=ignore_id,
+        limit=limit
+    )
+
+
+@app.route('/api/free-slots', methods=['GET'])
+@reads_state
+def get_free_slots():
+    """
+    Search free (day, start, room) placements
+    
+    Query params:
+        duration: Class length in minutes (required)
+        dosen: Lecturer who must be free (optional)
+        hari: Allowed day, may be repeated (optional)
+        ruangan: Allowed room, may be repeated (optional)
+        near_hari, near_jam_mulai, near_ruangan: Original slot to rank by closeness (optional)
+        ignore_id: Schedule whose own booking should not count (optional)
+        limit: Maximum number of candidates (default 10)
+    """
+    args = request.args
+    duration = args.get('duration', type=int)
+    if not duration or duration <= 0:
+        return jsonify({'error': 'duration must be a positive number of minutes'}), 400
+    
+    try:
+        near_start = string_to_time(args['near_jam_mulai']) if args.get('near_jam_mulai') else None
+    except (ValueError, IndexError):
+        return jsonify({'error': 'Times must be formatted as HH:MM'}), 400
+    
+    limit = min(max(args.get('limit', 10, type=int), 1), 100)
+    slots = occupancy.find_free_slots(
+        duration,
+        lecturer=args.get('dosen'),
+        days=args.getlist('hari') or None,
+        rooms=args.getlist('ruangan') or None,
+        near=(args.get('near_hari'), near_start, args.get('near_ruangan')),
+        ignore_id=args.get('ignore_id'),
+        limit=limit
+    )
+    
+    return jsonify({
+        'duration': duration,
+        'dosen': args.get('dosen'),
+        'candidates': [
+            {
+                'hari': slot.hari,
+                'jam_mulai': time_to_string(slot.jam_mulai),
+                'jam_selesai': time_to_string(slot.jam_selesai),
+                'ruangan': slot.ruangan
+            }
+            for slot in slots
+        ]
+    })
+
+
 @app.route('/api/conflicts', methods=['GET'])
+@reads_state
 def get_conflicts():
-    """Get current conflicts"""
-    conflicts = detector.detect_schedule_conflict(schedules)
+    """
+    Get current conflicts
+    
+    Query params:
+        type: Only list conflicts of this type (room_conflict, lecturer_conflict)
+        view: 'pairs' (default) lists every conflicting pair; 'clusters'
+            merges overlapping conflicts on one resource into N-way groups
+        offset: Number of listed conflicts (or clusters) to skip
+            (next_offset of the previous page)
+        limit: Page size (default 100, at most 1000)
+    
+    Only the listed page carries resolution suggestions; they are cached
+    with the conflict results until the next write.
+    """
+    conflict_type = request.args.get('type')
+    view = request.args.get('view', 'pairs')
+    if view not in ('pairs', 'clusters'):
+        return jsonify({'error': "view must be 'pairs' or 'clusters'"}), 400
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    
+    table = store.table()
+    conflicts = conflict_cache.clusters(table) if view == 'clusters' else conflict_cache.conflicts(table)
+    if conflict_type:
+        conflicts = [c for c in conflicts if c.conflict_type == conflict_type]
+    next_offset = offset + limit if offset + limit < len(conflicts) else None
+    conflicts = conflicts[offset:offset + limit]
+    
+    summary = conflict_cache.summary(table)
+    
+    if view == 'clusters':
+        return jsonify({
+            'total_conflicts': summary['total_conflicts'],
+            'room_conflicts': summary['room_conflicts'],
+            'lecturer_conflicts': summary['lecturer_conflicts'],
+            'affected_rooms': summary['affected_rooms'],
+            'affected_lecturers': summary['affected_lecturers'],
+            'clusters': [
+                {
+                    'type': c.conflict_type,
+                    'schedules': [s.id for s in c.affected_schedules],
+                    'window': {
+                        'jam_mulai': time_to_string(c.window_start),
+                        'jam_selesai': time_to_string(c.window_end)
+                    },
+                    'details': c.details
+                }
+                for c in conflicts
+            ],
+            'next_offset': next_offset
+        })
     
     conflict_data = [
         {
             'type': c.conflict_type,
             'schedules': [s.id for s in c.affected_schedules],
             'details': c.details,
-            'suggestions': get_conflict_suggestions({
-                'type': c.conflict_type,
-                'details': c.details
-            })
+            'suggestions': cached_conflict_suggestions(c)
         }
         for c in conflicts
     ]
     
-    summary = detector.get_conflict_summary(conflicts)
-    
     return jsonify({
         'total_conflicts': summary['total_conflicts'],
         'room_conflicts': summary['room_conflicts'],
         'lecturer_conflicts': summary['lecturer_conflicts'],
         'affected_rooms': summary['affected_rooms'],
         'affected_lecturers': summary['affected_lecturers'],
-        'conflicts': conflict_data
+        'conflicts': conflict_data,
+        'next_offset': next_offset
+    })
+
+
+def cached_conflict_suggestions(conflict):
+    """Suggestions for a detected conflict, computed once per conflict version"""
+    if conflict.conflict_type not in ('room_conflict', 'lecturer_conflict'):
+        return []
+    version = conflict_cache.version
+    key = (conflict.conflict_type,) + tuple(s.id for s in conflict.affected_schedules)
+    with suggestion_lock:
+        if suggestion_cache['version'] != version:
+            suggestion_cache['version'] = version
+            suggestion_cache['entries'] = {}
+        suggestions = suggestion_cache['entries'].get(key)
+    if suggestions is None:
+        # Searched outside the mutex; the read lock keeps the state fixed
+        moved = conflict.affected_schedules[1]
+        suggestions = get_conflict_suggestions({
+            'type': conflict.conflict_type,
+            'details': conflict.details
+        }, moved, ignore_id=moved.id)
+        with suggestion_lock:
+            if suggestion_cache['version'] == version:
+                suggestion_cache['entries'][key] = suggestions
+    return suggestions
+
+
+def targeted_conflicts_response(conflicts, **scope):
+    """JSON body shared by the per-room, per-lecturer, per-day and per-schedule queries"""
+    return jsonify({
+        **scope,
+        'total_conflicts': len(conflicts),
+        'room_conflicts': sum(1 for c in conflicts if c.conflict_type == 'room_conflict'),
+        'lecturer_conflicts': sum(1 for c in conflicts if c.conflict_type == 'lecturer_conflict'),
+        'conflicts': [
+            {
+                'type': c.conflict_type,
+                'schedules': [s.id for s in c.affected_schedules],
+                'details': c.details
+            }
+            for c in conflicts
+        ]
+    })
+
+
+def requested_conflict_types():
+    """The optional ?type= filter as a conflict_types argument"""
+    conflict_type = request.args.get('type')
+    return [conflict_type] if conflict_type else None
+
+
+@app.route('/api/conflicts/room/<path:room>', methods=['GET'])
+@reads_state
+def get_room_conflicts(room):
+    """
+    Conflicts involving one room, read from the conflict index partition
+    
+    Query params:
+        hari: Restrict to one day
+        type: Only list conflicts of this type
+    """
+    day = request.args.get('hari')
+    conflicts = conflict_index.conflicts_for_room(room, day, requested_conflict_types())
+    return targeted_conflicts_response(conflicts, ruangan=room, hari=day)
+
+
+@app.route('/api/conflicts/lecturer/<path:dosen>', methods=['GET'])
+@reads_state
+def get_lecturer_conflicts(dosen):
+    """
+    Conflicts involving one lecturer, read from the conflict index partition
+    
+    Query params:
+        hari: Restrict to one day
+        type: Only list conflicts of this type
+    """
+    day = request.args.get('hari')
+    conflicts = conflict_index.conflicts_for_lecturer(dosen, day, requested_conflict_types())
+    return targeted_conflicts_response(conflicts, dosen=dosen, hari=day)
+
+
+@app.route('/api/conflicts/day/<hari>', methods=['GET'])
+@reads_state
+def get_day_conflicts(hari):
+    """
+    Conflicts on one day
+    
+    Query params:
+        type: Only list conflicts of this type
+    """
+    conflicts = conflict_index.conflicts_for_day(hari, requested_conflict_types())
+    return targeted_conflicts_response(conflicts, hari=hari)
+
+
+@app.route('/api/conflicts/schedule/<schedule_id>', methods=['GET'])
+@reads_state
+def get_schedule_conflicts(schedule_id):
+    """Conflicts of one schedule"""
+    if schedule_id not in conflict_index:
+        return jsonify({'error': 'Schedule not found'}), 404
+    conflicts = conflict_index.conflicts_for_schedule(schedule_id, requested_conflict_types())
+    return targeted_conflicts_response(conflicts, schedule_id=schedule_id)
+
+
+REPORT_MIMETYPES = {
+    'text': 'text/plain',
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+@app.route('/api/conflicts/report', methods=['GET'])
+@reads_state
+def get_conflict_report():
+    """
+    Stream a conflict report
+    
+    Query params:
+        format: 'text' (default), 'csv' or 'jsonl'
+    """
+    fmt = request.args.get('format', 'text')
+    if fmt not in REPORT_MIMETYPES:
+        return jsonify({'error': f"format must be one of {', '.join(REPORT_MIMETYPES)}"}), 400
+    
+    writer = ConflictReportWriter(fmt)
+    conflicts = conflict_cache.conflicts(store.table())
+    response = Response(stream_with_context(writer.iter_chunks(conflicts)), mimetype=REPORT_MIMETYPES[fmt])
+    if fmt != 'text':
+        response.headers['Content-Disposition'] = f'attachment; filename=conflicts.{fmt}'
+    return response
+
+
+@app.route('/api/conflicts/students', methods=['POST'])
+@reads_state
+def get_student_conflicts():
+    """
+    Find overlapping courses that share enrolled students
+    
+    JSON body:
+        enrollments: {course_name: [student_id, ...]} (required)
+        min_students: Only report pairs sharing at least this many students
+        limit: Maximum number of conflicts to list (default 100)
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    enrollments = data.get('enrollments')
+    if not isinstance(enrollments, dict) or not all(
+            isinstance(students, list) and all(isinstance(student, str) for student in students)
+            for students in enrollments.values()):
+        return jsonify({'error': 'enrollments must map course names to lists of student ids'}), 400
+    
+    try:
+        min_students = int(data.get('min_students', 1))
+        limit = max(int(data.get('limit', 100)), 0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'min_students and limit must be integers'}), 400
+    
+    detector = StudentConflictDetector(EnrollmentIndex(enrollments), min_students=min_students)
+    conflicts = detector.detect(store.schedules())
+    conflicts.sort(key=lambda c: -c.details['students_affected'])
+    
+    return jsonify({
+        'total_conflicts': len(conflicts),
+        'conflicts': [
+            {
+                'type': c.conflict_type,
+                'schedules': [s.id for s in c.affected_schedules],
+                'details': c.details
+            }
+            for c in conflicts[:limit]
+        ]
+    })
+
+
+@app.route('/api/conflicts/repair', methods=['POST'])
+def repair_conflicts():
+    """
+    Compute (and optionally apply) moves that remove all conflicts
+    
+    JSON body (all optional):
+        apply: Apply the moves to the timetable (default false, a dry run)
+        time_budget: Seconds the solver may spend (default 5, at most 30)
+        pinned: Ids of schedules that must not move
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    # A dry run only reads; applying must not interleave with other writes
+    with writing_state() if data.get('apply') else reading_state():
+        return _repair_conflicts(data)
+
+
+def _repair_conflicts(data):
+    try:
+        time_budget = min(float(data.get('time_budget', 5.0)), 30.0)
+    except (TypeError, ValueError):
+        time_budget = 0
+    if time_budget <= 0:
+        return jsonify({'error': 'time_budget must be positive'}), 400
+    pinned = data.get('pinned', [])
+    if not isinstance(pinned, list) or not all(isinstance(schedule_id, str) for schedule_id in pinned):
+        return jsonify({'error': 'pinned must be a list of schedule ids'}), 400
+    
+    plan = ConflictRepairer(time_budget=time_budget).repair(
+        store.schedules(), conflict_cache.conflicts(store.table()), pinned=pinned
+    )
+    
+    if data.get('apply') and plan.moves:
+        for move in plan.moves:
+            store.update(move.schedule_id, move.replacement)
+            conflict_index.update(move.schedule_id, move.replacement)
+            occupancy.update(move.schedule_id, move.replacement)
+        conflict_cache.bump()
+        store.log({
+            'timestamp': datetime.now().isoformat(),
+            'schedule_id': None,
+            'status': 'REPAIRED',
+            'conflicts': [],
+            'moves': [move.schedule_id for move in plan.moves]
+        })
+        for move in plan.moves:
+            notify('SCHEDULE_CHANGED', {
+                'schedule_id': move.schedule_id,
+                'course_name': move.replacement.course_name,
+                'old_day': move.original.hari,
+                'new_day': move.replacement.hari,
+                'old_time': f"{time_to_string(move.original.jam_mulai)} - "
+                            f"{time_to_string(move.original.jam_selesai)}",
+                'new_time': f"{time_to_string(move.replacement.jam_mulai)} - "
+                            f"{time_to_string(move.replacement.jam_selesai)}",
+                'old_room': move.original.ruangan,
+                'new_room': move.replacement.ruangan,
+                'lecturer': move.replacement.dosen
+            })
+    
+    return jsonify({
+        'applied': bool(data.get('apply')),
+        'resolved': plan.resolved,
+        'timed_out': plan.timed_out,
+        'elapsed_seconds': round(plan.elapsed_seconds, 4),
+        'unresolved': plan.unresolved,
+        'moves': [
+            {
+                'schedule_id': move.schedule_id,
+                'kind': move.kind,
+                'from': {
+                    'hari': move.original.hari,
+                    'jam_mulai': time_to_string(move.original.jam_mulai),
+                    'jam_selesai': time_to_string(move.original.jam_selesai),
+                    'ruangan': move.original.ruangan
+                },
+                'to': {
+                    'hari': move.replacement.hari,
+                    'jam_mulai': time_to_string(move.replacement.jam_mulai),
+                    'jam_selesai': time_to_string(move.replacement.jam_selesai),
+                    'ruangan': move.replacement.ruangan
+                }
+            }
+            for move in plan.moves
+        ]
     })
 
 
 @app.route('/api/statistics', methods=['GET'])
+@reads_state
 def get_statistics():
     """Get statistics"""
-    conflicts = detector.detect_schedule_conflict(schedules)
-    summary = detector.get_conflict_summary(conflicts)
+    summary = conflict_cache.summary(store.table())
     
     return jsonify({
-        'total_schedules': len(schedules),
+        'total_schedules': len(store),
         'total_conflicts': summary['total_conflicts'],
         'room_conflicts': summary['room_conflicts'],
         'lecturer_conflicts': summary['lecturer_conflicts'],
@@ -258,16 +922,17 @@ def get_statistics():
 
 
 @app.route('/api/logs', methods=['GET'])
+@reads_state
 def get_logs():
     """Get conflict logs"""
-    return jsonify(conflicts_log)
+    return jsonify(store.logs())
 
 
 @app.route('/api/logs', methods=['DELETE'])
+@writes_state
 def clear_logs():
     """Clear conflict logs"""
-    global conflicts_log
-    conflicts_log = []
+    store.clear_logs()
     return jsonify({'message': 'Logs cleared'})
 
 
@@ -0,0 +1,233 @@
+"""
+ASGI entry point for the Schedule Conflict Detection API
+
+Serves exactly the routes and payloads of app.py from an event loop:
+
+    uvicorn asgi_app:application --workers 1
+
+Every view runs in a thread pool, so conflict detection, repairs and
+imports never block the loop, and one process can hold many idle
+dashboard connections. Observer notifications are fanned out as
+background tasks, one per observer, after the response is sent on its way.
+
+The pool does not make detection itself parallel: CPU-bound views still
+take turns on the GIL, so only the I/O (SQLite, sockets, observers)
+really overlaps. Scale CPU-heavy workloads with processes, not threads.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import io
+import logging
+import sys
+
+import app as api
+
+# Marks the end of a WSGI response body on its way to the loop
+_DONE = object()
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncScheduleAPI:
+    """
+    ASGI application wrapping the Flask app
+
+    Each HTTP request is translated to a WSGI call that runs, together with
+    the iteration of its response body, on one `executor` thread; chunks of
+    streamed reports reach the loop through a bounded queue, so a slow
+    client holds back the producer instead of buffering the report. The
+    lifespan protocol installs the background notifier on startup and
+    waits for outstanding notifications on shutdown.
+
+    max_workers bounds requests in progress, not concurrency of work: the
+    threads share the GIL, so CPU-bound detection in several of them runs
+    one at a time and only blocking I/O actually overlaps.
+    """
+
+    def __init__(self, wsgi_app: Optional[Callable] = None, max_workers: int = 32, notify_workers: int = 4):
+        """
+        Args:
+            wsgi_app: WSGI callable to serve (default: app.app)
+            max_workers: Threads running views; bounds concurrent requests
+                in progress, not open connections
+            notify_workers: Threads delivering observer notifications
+        """
+        self.wsgi_app = wsgi_app or api.app.wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='jadwal-view')
+        self.notify_executor = ThreadPoolExecutor(notify_workers, thread_name_prefix='jadwal-notify')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[asyncio.Task] = set()
+        self._inline_notify = api.notify
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            self._start()
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+    # Notifications
+
+    def _start(self):
+        """Route app.py's notifications through this loop (idempotent)"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            api.notify = self.notify
+
+    def notify(self, event_type: str, data: Dict[str, Any]):
+        """Queue an event for every observer; safe to call from view threads"""
+        self._loop.call_soon_threadsafe(self._fan_out, event_type, data)
+
+    def _fan_out(self, event_type: str, data: Dict[str, Any]):
+        for observer in api.subject.observers:
+            task = self._loop.create_task(self._deliver(observer, event_type, data))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _deliver(self, observer, event_type: str, data: Dict[str, Any]):
+        try:
+            await self._loop.run_in_executor(self.notify_executor, observer.update, event_type, data)
+        except Exception:
+            # A failing observer must not affect the others or the request
+            logger.exception("%s failed on %s", observer.__class__.__name__, event_type)
+
+    async def drain(self):
+        """Wait until every queued notification has been delivered"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending))
+
+    async def _lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.drain()
+                api.notify = self._inline_notify
+                self._loop = None
+                self.executor.shutdown(wait=True)
+                self.notify_executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # HTTP
+
+    async def _http(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        body = io.BytesIO()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+        loop = asyncio.get_running_loop()
+        environ = self._environ(scope, body)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+        cancelled = False
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def exchange():
+            # The whole WSGI exchange stays on one pool thread, as views that
+            # stream inside a pushed request context expect
+            head: List[Tuple[str, List[Tuple[str, str]]]] = []
+
+            def start_response(status, headers, exc_info=None):
+                head[:] = [(status, headers)]
+                return lambda data: None
+
+            try:
+                result = self.wsgi_app(environ, start_response)
+                try:
+                    sent_head = False
+                    for chunk in result:
+                        if cancelled:
+                            return
+                        if not sent_head:
+                            put(head[0])
+                            sent_head = True
+                        if chunk:
+                            put(chunk)
+                    if not sent_head:
+                        put(head[0])
+                finally:
+                    close = getattr(result, 'close', None)
+                    if close is not None:
+                        close()
+            except BaseException as e:
+                put(e)
+            else:
+                put(_DONE)
+
+        job = loop.run_in_executor(self.executor, exchange)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if isinstance(item, tuple):
+                    status, headers = item
+                    await send({
+                        'type': 'http.response.start',
+                        'status': int(status.split(' ', 1)[0]),
+                        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                    for name, value in headers],
+                    })
+                else:
+                    await send({'type': 'http.response.body', 'body': item, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            # On a dropped connection the producer may be blocked on a full
+            # queue: keep discarding chunks until its thread has returned
+            cancelled = True
+            while not job.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({job, getter}, return_when=asyncio.FIRST_COMPLETED)
+                getter.cancel()
+
+    @staticmethod
+    def _environ(scope: Dict[str, Any], body: io.BytesIO) -> Dict[str, Any]:
+        """PEP 3333 environ for an ASGI HTTP scope"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            # The body is buffered, so its length is known even for chunked uploads
+            'CONTENT_LENGTH': str(len(body.getbuffer())),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name, value = name.decode('latin-1'), value.decode('latin-1')
+            if name == 'content-type':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'content-length':
+                key = 'HTTP_' + name.upper().replace('-', '_')
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+application = AsyncScheduleAPI()
@@ -0,0 +1,263 @@
+"""
+Room and Lecturer Availability backed by occupancy bitsets
+"""
+
+from typing import List, Dict, Tuple, Optional, Set, Iterable
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import time
+import heapq
+
+from conflict_detector import Schedule, TimeInterval
+
+MINUTES_PER_DAY = 24 * 60
+WEEKDAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu"]
+
+
+@dataclass(frozen=True)
+class SlotCandidate:
+    """A free (day, start, room) placement returned by a free-slot search"""
+    hari: str
+    jam_mulai: time
+    jam_selesai: time
+    ruangan: str
+
+
+def minutes_to_time(minutes: int) -> time:
+    """Minutes since midnight as a time, clamped to 23:59"""
+    return time(minutes // 60, minutes % 60) if minutes < MINUTES_PER_DAY else time(23, 59)
+
+
+class OccupancyIndex:
+    """
+    Occupancy bitsets per (day, room) and per (day, lecturer)
+
+    Each day is cut into slots of `slot_minutes`; bit i of a bitset is set
+    when slot i is booked. Answering "is this slot free?" is a mask and a
+    bitwise AND, independent of how many schedules exist. Bookings that do
+    not start or end on a slot boundary occupy the partial slots too, so the
+    index may call a slot busy at a finer resolution but never calls a busy
+    slot free.
+    """
+
+    def __init__(self, slot_minutes: int = 5, schedules: Optional[Iterable[Schedule]] = None):
+        """
+        Args:
+            slot_minutes: Slot granularity; must divide a day evenly
+            schedules: Initial schedules to index
+        """
+        if slot_minutes < 1 or MINUTES_PER_DAY % slot_minutes:
+            raise ValueError("slot_minutes must be a positive divisor of 1440")
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = MINUTES_PER_DAY // slot_minutes
+        self._schedules: Dict[str, Schedule] = {}
+        self._masks: Dict[str, int] = {}
+        self._room_bits: Dict[Tuple[str, str], int] = {}
+        self._lecturer_bits: Dict[Tuple[str, str], int] = {}
+        self._room_members: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._lecturer_members: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        for schedule in schedules or []:
+            self.add(schedule)
+
+    def mask(self, start: int, end: int) -> int:
+        """
+        Bitset of the slots touched by [start, end) in minutes
+
+        Returns:
+            0 for empty ranges
+        """
+        first = max(start, 0) // self.slot_minutes
+        last = -(-min(end, MINUTES_PER_DAY) // self.slot_minutes)  # ceil division
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def _schedule_mask(self, schedule: Schedule) -> int:
+        return self.mask(TimeInterval._time_to_minutes(schedule.jam_mulai),
+                         TimeInterval._time_to_minutes(schedule.jam_selesai))
+
+    def add(self, schedule: Schedule):
+        """Mark a schedule's slots as occupied (replaces a schedule with the same id)"""
+        if schedule.id in self._schedules:
+            self.remove(schedule.id)
+        mask = self._schedule_mask(schedule)
+        self._schedules[schedule.id] = schedule
+        self._masks[schedule.id] = mask
+        for bits, members, key in ((self._room_bits, self._room_members, (schedule.hari, schedule.ruangan)),
+                                   (self._lecturer_bits, self._lecturer_members, (schedule.hari, schedule.dosen))):
+            bits[key] = bits.get(key, 0) | mask
+            members[key].add(schedule.id)
+
+    def remove(self, schedule_id: str) -> Optional[Schedule]:
+        """
+        Free a schedule's slots
+
+        Other schedules in the same group may overlap it (a timetable with
+        conflicts), so the group's bitset is rebuilt from its remaining
+        members rather than cleared bit by bit.
+
+        Returns:
+            The removed schedule, or None if the id was not indexed
+        """
+        schedule = self._schedules.pop(schedule_id, None)
+        if schedule is None:
+            return None
+        del self._masks[schedule_id]
+        for bits, members, key in ((self._room_bits, self._room_members, (schedule.hari, schedule.ruangan)),
+                                   (self._lecturer_bits, self._lecturer_members, (schedule.hari, schedule.dosen))):
+            group = members[key]
+            group.discard(schedule_id)
+            if group:
+                combined = 0
+                for member_id in group:
+                    combined |= self._masks[member_id]
+                bits[key] = combined
+            else:
+                del members[key]
+                bits.pop(key, None)
+        return schedule
+
+    def update(self, schedule_id: str, schedule: Schedule) -> Optional[Schedule]:
+        """Replace the schedule indexed under schedule_id; returns the previous one"""
+        previous = self.remove(schedule_id)
+        self.add(schedule)
+        return previous
+
+    def room_bits(self, day: str, room: str) -> int:
+        """Occupied-slot bitset of a room on a day"""
+        return self._room_bits.get((day, room), 0)
+
+    def lecturer_bits(self, day: str, lecturer: str) -> int:
+        """Occupied-slot bitset of a lecturer on a day"""
+        return self._lecturer_bits.get((day, lecturer), 0)
+
+    def is_room_free(self, day: str, room: str, start: time, end: time) -> bool:
+        """True if the room has no booking between start and end on that day"""
+        mask = self.mask(TimeInterval._time_to_minutes(start), TimeInterval._time_to_minutes(end))
+        return not self.room_bits(day, room) & mask
+
+    def is_lecturer_free(self, day: str, lecturer: str, start: time, end: time) -> bool:
+        """True if the lecturer teaches nothing between start and end on that day"""
+        mask = self.mask(TimeInterval._time_to_minutes(start), TimeInterval._time_to_minutes(end))
+        return not self.lecturer_bits(day, lecturer) & mask
+
+    def is_free(self, day: str, start: time, end: time, room: Optional[str] = None,
+                lecturer: Optional[str] = None, ignore_id: Optional[str] = None) -> bool:
+        """
+        True if the given room and/or lecturer are both free in the slot
+
+        Args:
+            ignore_id: Schedule whose own booking should not count, e.g.
+                when checking whether it can be moved within its slot
+        """
+        mask = self.mask(TimeInterval._time_to_minutes(start), TimeInterval._time_to_minutes(end))
+        if not mask:
+            return True
+        occupied = 0
+        if room is not None:
+            occupied |= self._bits_without(self._room_bits, self._room_members, (day, room), ignore_id)
+        if lecturer is not None:
+            occupied |= self._bits_without(self._lecturer_bits, self._lecturer_members, (day, lecturer), ignore_id)
+        return not occupied & mask
+
+    def _bits_without(self, bits: Dict[Tuple[str, str], int], members: Dict[Tuple[str, str], Set[str]],
+                      key: Tuple[str, str], ignore_id: Optional[str]) -> int:
+        """Group bitset, leaving out one member's booking if requested"""
+        group_bits = bits.get(key, 0)
+        if ignore_id is None or ignore_id not in members.get(key, ()):
+            return group_bits
+        combined = 0
+        for member_id in members[key]:
+            if member_id != ignore_id:
+                combined |= self._masks[member_id]
+        return combined
+
+    def find_free_slots(self, duration: int, lecturer: Optional[str] = None,
+                        days: Optional[Iterable[str]] = None, rooms: Optional[Iterable[str]] = None,
+                        near: Optional[Tuple[str, time, Optional[str]]] = None, ignore_id: Optional[str] = None,
+                        earliest: time = time(7, 0), latest: time = time(21, 0),
+                        step_minutes: int = 30, limit: int = 10) -> List[SlotCandidate]:
+        """
+        Find free placements for a class of `duration` minutes
+        
+        For every (day, room) the free bitset is ~(room | lecturer) within
+        [earliest, latest); shifted ANDs of it leave exactly the slots where a
+        run of `duration` free minutes starts, so no booking is scanned.
+        
+        Args:
+            duration: Class length in minutes
+            lecturer: Lecturer who must also be free (optional)
+            days: Allowed days (default: every weekday plus indexed days)
+            rooms: Allowed rooms (default: every indexed room)
+            near: Original (day, start, room) slot; candidates are ranked
+                same day first, then by start distance, then same room first
+            ignore_id: Schedule whose own booking should not count
+            earliest, latest: Daily window the class must fit in
+            step_minutes: Start times are multiples of this
+            limit: Maximum number of candidates returned
+            
+        Returns:
+            Up to `limit` SlotCandidate objects, closest first
+        """
+        if duration <= 0:
+            raise ValueError("duration must be positive")
+        if step_minutes % self.slot_minutes:
+            raise ValueError("step_minutes must be a multiple of slot_minutes")
+        
+        length = -(-duration // self.slot_minutes)
+        window = self.mask(TimeInterval._time_to_minutes(earliest), TimeInterval._time_to_minutes(latest))
+        step = step_minutes // self.slot_minutes
+        aligned = sum(1 << i for i in range(0, self.slots_per_day, step))
+        
+        if days is None:
+            days = WEEKDAYS + sorted({day for day, _ in self._room_bits}.difference(WEEKDAYS))
+        days = list(days)
+        rooms = self.rooms() if rooms is None else list(rooms)
+        near_day, near_start, near_room = near if near is not None else (None, None, None)
+        near_slot = TimeInterval._time_to_minutes(near_start) // self.slot_minutes if near_start is not None else 0
+        
+        # Candidates on the original day outrank every other day, so when
+        # that day alone fills the limit the rest need not be searched
+        order = sorted(range(len(days)), key=lambda i: days[i] != near_day)
+        ranked = []
+        for day_order in order:
+            day = days[day_order]
+            if day != near_day and len(ranked) >= limit and near_day in days:
+                break
+            busy_lecturer = (self._bits_without(self._lecturer_bits, self._lecturer_members, (day, lecturer), ignore_id)
+                             if lecturer is not None else 0)
+            for room in rooms:
+                busy = busy_lecturer | self._bits_without(self._room_bits, self._room_members, (day, room), ignore_id)
+                starts = self._run_starts(~busy & window, length) & aligned
+                while starts:
+                    low = starts & -starts
+                    slot = low.bit_length() - 1
+                    starts ^= low
+                    ranked.append(((day != near_day, abs(slot - near_slot), room != near_room, day_order, slot, room),
+                                   day, slot, room))
+        
+        candidates = []
+        for _, day, slot, room in heapq.nsmallest(limit, ranked):
+            start = slot * self.slot_minutes
+            candidates.append(SlotCandidate(day, minutes_to_time(start), minutes_to_time(start + duration), room))
+        return candidates
+
+    @staticmethod
+    def _run_starts(free: int, length: int) -> int:
+        """Bits i such that bits i .. i+length-1 of `free` are all set"""
+        covered = 1
+        while covered < length:
+            shift = min(covered, length - covered)
+            free &= free >> shift
+            covered += shift
+        return free
+
+    def rooms(self) -> List[str]:
+        """Every room that has at least one booking"""
+        return sorted({room for _, room in self._room_bits})
+
+    def __contains__(self, schedule_id: str) -> bool:
+        return schedule_id in self._schedules
+
+    def __len__(self):
+        return len(self._schedules)
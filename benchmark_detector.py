@@ -0,0 +1,270 @@
+"""
+Scaling benchmark for ScheduleConflictDetector
+
+Generates synthetic timetables, times each detection mode on them, records
+peak memory and conflicts/sec, writes the results as JSON and compares them
+against a stored baseline.
+
+No baseline is shipped, since timings depend on the machine: store one
+first, then compare later runs against it. The default sizes stop at
+100,000; pass --sizes to go up to 1,000,000.
+
+Usage:
+    python benchmark_detector.py --update-baseline        # first run: store a baseline
+    python benchmark_detector.py                          # compare; fails without a baseline
+    python benchmark_detector.py --sizes 1000000 --modes sweep vectorized --no-memory --no-compare
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time as timer
+import tracemalloc
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
+
+from conflict_detector import ScheduleConflictDetector, ScheduleTable
+
+DAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu"]
+DURATIONS = [50, 100, 150]
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_MODES = ['interval_tree', 'sweep', 'parallel', 'vectorized']
+# Largest timetable a mode is run on; the interval tree answers one Python
+# query per booking (about 5 s at 100,000 in the hotspot scenario)
+MODE_MAX_SIZES = {'interval_tree': 100000}
+DEFAULT_RESULTS = 'bench_results.json'
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+
+def _build_table(size: int, seed: int, pick_room: Callable[[random.Random], int],
+                 pick_lecturer: Callable[[random.Random], int]) -> ScheduleTable:
+    """Fill a ScheduleTable with slots on a 30 minute grid between 07:00 and 19:00"""
+    rng = random.Random(seed)
+    table = ScheduleTable()
+    for i in range(size):
+        start = rng.randrange(7 * 60, 19 * 60 - 150 + 1, 30)
+        table.append_row(
+            f"SCH{i:07d}",
+            rng.choice(DAYS),
+            start,
+            start + rng.choice(DURATIONS),
+            f"Room {pick_room(rng)}",
+            f"Dosen {pick_lecturer(rng)}",
+            f"Course {i % 5000}",
+        )
+    return table
+
+
+def generate_uniform(size: int, seed: int = 0) -> ScheduleTable:
+    """Rooms and lecturers chosen uniformly (about 20 and 8 entries per week each)"""
+    rooms = max(1, size // 20)
+    lecturers = max(1, size // 8)
+    return _build_table(size, seed, lambda rng: rng.randrange(rooms), lambda rng: rng.randrange(lecturers))
+
+
+def generate_hotspot_rooms(size: int, seed: int = 0) -> ScheduleTable:
+    """Half of all bookings land in 5% of the rooms"""
+    rooms = max(1, size // 20)
+    hot_rooms = max(1, rooms // 20)
+    lecturers = max(1, size // 8)
+    return _build_table(
+        size, seed,
+        lambda rng: rng.randrange(hot_rooms) if rng.random() < 0.5 else rng.randrange(rooms),
+        lambda rng: rng.randrange(lecturers),
+    )
+
+
+def generate_overloaded_lecturers(size: int, seed: int = 0) -> ScheduleTable:
+    """40% of all classes are taught by 5% of the lecturers"""
+    rooms = max(1, size // 20)
+    lecturers = max(1, size // 8)
+    busy_lecturers = max(1, lecturers // 20)
+    return _build_table(
+        size, seed,
+        lambda rng: rng.randrange(rooms),
+        lambda rng: rng.randrange(busy_lecturers) if rng.random() < 0.4 else rng.randrange(lecturers),
+    )
+
+
+SCENARIOS = {
+    'uniform': generate_uniform,
+    'hotspot_rooms': generate_hotspot_rooms,
+    'overloaded_lecturers': generate_overloaded_lecturers,
+}
+
+
+def make_detector(mode: str) -> Optional[ScheduleConflictDetector]:
+    """Build the detector for a mode, or None if its backend is unavailable"""
+    if mode == 'vectorized':
+        from vectorized_detector import VectorizedConflictDetector
+        try:
+            return VectorizedConflictDetector()
+        except ImportError:
+            return None
+    return ScheduleConflictDetector(mode=mode)
+
+
+def measure(detector: ScheduleConflictDetector, table: ScheduleTable, repeat: int = 3,
+            track_memory: bool = True) -> Dict[str, Any]:
+    """
+    Time detection on one timetable
+
+    The best of `repeat` runs is reported; peak memory is taken from an
+    extra run under tracemalloc so tracing does not distort the timings.
+    """
+    best = float('inf')
+    conflicts = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = timer.perf_counter()
+        conflicts = len(detector.detect_schedule_conflict(table))
+        best = min(best, timer.perf_counter() - started)
+
+    peak = None
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        detector.detect_schedule_conflict(table)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'seconds': round(best, 6),
+        'peak_memory_bytes': peak,
+        'conflicts': conflicts,
+        'conflicts_per_sec': round(conflicts / best, 1) if best > 0 else None,
+    }
+
+
+def run_benchmarks(sizes: List[int], scenarios: List[str], modes: List[str], repeat: int = 3,
+                   track_memory: bool = True, seed: int = 0, log=print) -> Dict[str, Any]:
+    """
+    Run every (scenario, size, mode) combination
+
+    Returns:
+        Machine-readable result document
+    """
+    results = []
+    for scenario in scenarios:
+        for size in sizes:
+            table = SCENARIOS[scenario](size, seed)
+            for mode in modes:
+                if size > MODE_MAX_SIZES.get(mode, size):
+                    log(f"  skipped {scenario:<22} {size:>9,} {mode:<14} (above {MODE_MAX_SIZES[mode]:,} for this mode)")
+                    continue
+                detector = make_detector(mode)
+                if detector is None:
+                    log(f"  skipped {scenario:<22} {size:>9,} {mode:<14} (backend not installed)")
+                    continue
+                with detector:
+                    measured = measure(detector, table, repeat, track_memory)
+                results.append({'scenario': scenario, 'size': size, 'mode': mode, **measured})
+                memory = (f"{measured['peak_memory_bytes'] / 2**20:8.1f} MiB"
+                          if measured['peak_memory_bytes'] is not None else '       n/a')
+                log(f"  {scenario:<22} {size:>9,} {mode:<14} {measured['seconds']:9.3f}s {memory} "
+                    f"{measured['conflicts']:>10,} conflicts")
+            del table
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def _result_key(result: Dict[str, Any]) -> tuple:
+    return result['scenario'], result['size'], result['mode']
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.25) -> List[str]:
+    """
+    Find results that regressed against the baseline
+
+    A result regresses when its time or peak memory exceeds the baseline
+    value by more than `tolerance` (0.25 = 25%), or when it reports a
+    different number of conflicts for the same generated timetable.
+
+    Returns:
+        Human-readable regression messages (empty when everything passed)
+    """
+    previous = {_result_key(r): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(_result_key(result))
+        if old is None:
+            continue
+        label = '{} n={} mode={}'.format(*_result_key(result))
+        if result['conflicts'] != old['conflicts']:
+            regressions.append(f"{label}: {result['conflicts']} conflicts, baseline found {old['conflicts']}")
+        for metric in ('seconds', 'peak_memory_bytes'):
+            if result.get(metric) is None or not old.get(metric):
+                continue
+            if result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: {metric} {result[metric]} exceeds baseline {old[metric]} "
+                    f"by more than {tolerance:.0%}"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='timetable sizes, e.g. 1000 10000 1000000')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--modes', nargs='+', default=DEFAULT_MODES,
+                        choices=list(ScheduleConflictDetector.MODES) + ['vectorized'])
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case (best is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help='where to write the JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown, 0.25 = 25%%')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--no-compare', action='store_true', help='only write the results, skip the baseline check')
+    args = parser.parse_args(argv)
+
+    print(f"Benchmarking ScheduleConflictDetector on Python {platform.python_version()}")
+    report = run_benchmarks(args.sizes, args.scenarios, args.modes, args.repeat,
+                            not args.no_memory, args.seed)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline updated: {args.baseline}")
+        return 0
+    if args.no_compare:
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        # A check that cannot compare anything must not pass
+        print(f"✗ No baseline at {args.baseline}; run with --update-baseline to create one, "
+              f"or pass --no-compare")
+        return 1
+
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s) against {args.baseline}:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    print(f"✓ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,10 +2,27 @@
 Schedule Conflict Detection with Interval Tree Optimization
 """
 
-from typing import List, Dict, Tuple, Any
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Any, Optional, Set, Iterator, Iterable, Callable, Union, TextIO
+from array import array
+from dataclasses import dataclass, field
 from datetime import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from operator import attrgetter
+from time import perf_counter
+import cProfile
+import csv
+import gc
+import heapq
+import io
+import itertools
+import json
+import os
+import pstats
+import tempfile
+import threading
+import tracemalloc
 
 
 @dataclass
@@ -26,12 +43,92 @@ class Schedule:
         return self.id == other.id
 
 
-@dataclass
+def _room_conflict_details(schedule1: Schedule, schedule2: Schedule, day: str) -> Dict[str, Any]:
+    """Human-readable details of a room conflict"""
+    return {
+        'day': day,
+        'room': schedule1.ruangan,
+        'schedule1_time': f"{schedule1.jam_mulai} - {schedule1.jam_selesai}",
+        'schedule2_time': f"{schedule2.jam_mulai} - {schedule2.jam_selesai}",
+        'course1': schedule1.course_name or 'Unknown',
+        'course2': schedule2.course_name or 'Unknown',
+    }
+
+
+def _lecturer_conflict_details(schedule1: Schedule, schedule2: Schedule, day: str) -> Dict[str, Any]:
+    """Human-readable details of a lecturer conflict"""
+    return {
+        'day': day,
+        'lecturer': schedule1.dosen,
+        'schedule1_time': f"{schedule1.jam_mulai} - {schedule1.jam_selesai}",
+        'schedule2_time': f"{schedule2.jam_mulai} - {schedule2.jam_selesai}",
+        'room1': schedule1.ruangan,
+        'room2': schedule2.ruangan,
+        'course1': schedule1.course_name or 'Unknown',
+        'course2': schedule2.course_name or 'Unknown',
+    }
+
+
 class Conflict:
-    """Represents a detected conflict"""
-    conflict_type: str  # 'room_conflict', 'lecturer_conflict'
-    affected_schedules: List[Schedule]
-    details: Dict[str, Any]
+    """
+    Represents a detected conflict
+    
+    For room and lecturer conflicts the details dict is only formatted the
+    first time it is accessed; callers that just count or group conflicts
+    never pay for the string formatting.
+    """
+    
+    __slots__ = ('conflict_type', 'affected_schedules', 'day', '_details')
+    
+    DETAIL_BUILDERS = {
+        'room_conflict': _room_conflict_details,
+        'lecturer_conflict': _lecturer_conflict_details,
+    }
+    
+    def __init__(self, conflict_type: str, affected_schedules: List[Schedule],
+                 details: Optional[Dict[str, Any]] = None, day: Optional[str] = None):
+        """
+        Args:
+            conflict_type: 'room_conflict', 'lecturer_conflict', ...
+            affected_schedules: Schedules involved in the conflict
+            details: Precomputed details; built lazily when omitted
+            day: Day of the conflict, used to build the details lazily
+        """
+        self.conflict_type = conflict_type
+        self.affected_schedules = affected_schedules
+        self.day = day if day is not None else (details or {}).get('day')
+        self._details = details
+    
+    @property
+    def details(self) -> Dict[str, Any]:
+        """Conflict details, materialized on first access"""
+        if self._details is None:
+            self._details = self.format_details()
+        return self._details
+    
+    def format_details(self) -> Dict[str, Any]:
+        """
+        Return the details without caching them on the conflict
+        
+        Already materialized details are returned as they are; otherwise
+        a fresh dict is formatted from the schedules. Reports that render
+        every conflict once use this so the conflicts stay small.
+        """
+        if self._details is not None:
+            return self._details
+        build = self.DETAIL_BUILDERS.get(self.conflict_type)
+        return build(*self.affected_schedules[:2], self.day) if build else {'day': self.day}
+    
+    @details.setter
+    def details(self, value: Dict[str, Any]):
+        self._details = value
+    
+    def __eq__(self, other):
+        if not isinstance(other, Conflict):
+            return NotImplemented
+        return (self.conflict_type == other.conflict_type
+                and self.affected_schedules == other.affected_schedules
+                and self.day == other.day)
     
     def __repr__(self):
         schedule_ids = [s.id for s in self.affected_schedules]
@@ -39,6 +136,60 @@ class Conflict:
                 f"schedules={schedule_ids}, details={self.details})")
 
 
+class ConflictCluster:
+    """
+    N-way conflict: a connected group of overlapping schedules on one resource
+    
+    Stands in for all the pairwise conflicts between its schedules, so 20
+    classes double-booked into one room are one cluster instead of 190
+    Conflict objects.
+    """
+    
+    __slots__ = ('conflict_type', 'day', 'resource', 'affected_schedules',
+                 'window_start', 'window_end', 'pair_count', 'max_concurrent')
+    
+    def __init__(self, conflict_type: str, day: str, resource: str, affected_schedules: List[Schedule],
+                 window_start: time, window_end: time, pair_count: int, max_concurrent: int):
+        """
+        Args:
+            conflict_type: 'room_conflict', 'lecturer_conflict', or the type
+                of a registered rule (see rules.RuleBasedDetector)
+            day: Day of the cluster
+            resource: The shared room or lecturer
+            affected_schedules: Schedules in the cluster, in input order
+            window_start, window_end: Time span the cluster covers
+            pair_count: Number of pairwise conflicts it represents
+            max_concurrent: Most schedules overlapping at a single moment
+        """
+        self.conflict_type = conflict_type
+        self.day = day
+        self.resource = resource
+        self.affected_schedules = affected_schedules
+        self.window_start = window_start
+        self.window_end = window_end
+        self.pair_count = pair_count
+        self.max_concurrent = max_concurrent
+    
+    @property
+    def details(self) -> Dict[str, Any]:
+        """Cluster details in the shape of the pairwise conflict details"""
+        key = {'room_conflict': 'room', 'lecturer_conflict': 'lecturer'}.get(self.conflict_type, 'resource')
+        return {
+            key: self.resource,
+            'day': self.day,
+            'window': f"{self.window_start} - {self.window_end}",
+            'schedule_count': len(self.affected_schedules),
+            'pair_count': self.pair_count,
+            'max_concurrent': self.max_concurrent,
+            'courses': [s.course_name or 'Unknown' for s in self.affected_schedules],
+        }
+    
+    def __repr__(self):
+        schedule_ids = [s.id for s in self.affected_schedules]
+        return (f"ConflictCluster(type={self.conflict_type}, {self.day} {self.resource}, "
+                f"window={self.window_start}-{self.window_end}, schedules={schedule_ids})")
+
+
 class TimeInterval:
     """Represents a time interval for efficient overlap checking"""
     
@@ -66,86 +217,1020 @@ class TimeInterval:
         return f"{hours:02d}:{mins:02d}"
 
 
+# time objects are immutable, so rows share one per minute of the day
+_MINUTE_TIMES = [time(minute // 60, minute % 60) for minute in range(24 * 60)]
+
+
+class ScheduleTable:
+    """
+    Compact, array-backed timetable
+    
+    Start/end times are stored once as minutes in int arrays, and days,
+    rooms, lecturers and course names as interned integer ids, instead of
+    one Schedule object with datetime.time fields per entry. The detectors
+    consume it directly; Schedule objects are only materialized for rows
+    that end up in a conflict.
+    """
+    
+    def __init__(self, schedules: Optional[Iterable[Schedule]] = None):
+        self.ids: List[str] = []
+        self.starts = array('h')
+        self.ends = array('h')
+        self.days = array('i')
+        self.rooms = array('i')
+        self.lecturers = array('i')
+        self.courses = array('i')
+        self.day_names: List[str] = []
+        self.room_names: List[str] = []
+        self.lecturer_names: List[str] = []
+        self.course_names: List[Optional[str]] = []
+        self._day_codes: Dict[str, int] = {}
+        self._room_codes: Dict[str, int] = {}
+        self._lecturer_codes: Dict[str, int] = {}
+        self._course_codes: Dict[Optional[str], int] = {}
+        for schedule in schedules or []:
+            self.append(schedule)
+    
+    @staticmethod
+    def _intern(names: List[Any], codes: Dict[Any, int], value: Any) -> int:
+        """Return the integer id of value, adding it to the name table if new"""
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+    
+    def append(self, schedule: Schedule):
+        """Append a Schedule as a compact row"""
+        self.append_row(
+            schedule.id,
+            schedule.hari,
+            TimeInterval._time_to_minutes(schedule.jam_mulai),
+            TimeInterval._time_to_minutes(schedule.jam_selesai),
+            schedule.ruangan,
+            schedule.dosen,
+            schedule.course_name,
+        )
+    
+    def append_row(self, schedule_id: str, hari: str, start: int, end: int,
+                   ruangan: str, dosen: str, course_name: Optional[str] = None):
+        """
+        Append a row without building a Schedule first
+        
+        Args:
+            start: Start time in minutes since midnight
+            end: End time in minutes since midnight
+        """
+        self.ids.append(schedule_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.days.append(self._intern(self.day_names, self._day_codes, hari))
+        self.rooms.append(self._intern(self.room_names, self._room_codes, ruangan))
+        self.lecturers.append(self._intern(self.lecturer_names, self._lecturer_codes, dosen))
+        self.courses.append(self._intern(self.course_names, self._course_codes, course_name))
+    
+    def extend(self, schedules: Iterable[Schedule]):
+        """Append several schedules"""
+        for schedule in schedules:
+            self.append(schedule)
+    
+    def schedule(self, position: int) -> Schedule:
+        """Materialize the row at position as a Schedule"""
+        return Schedule(
+            id=self.ids[position],
+            hari=self.day_names[self.days[position]],
+            jam_mulai=_MINUTE_TIMES[self.starts[position]],
+            jam_selesai=_MINUTE_TIMES[self.ends[position]],
+            ruangan=self.room_names[self.rooms[position]],
+            dosen=self.lecturer_names[self.lecturers[position]],
+            course_name=self.course_names[self.courses[position]],
+        )
+    
+    def materializer(self) -> Callable[[int], Schedule]:
+        """
+        Return a position -> Schedule lookup that materializes each row at
+        most once, so conflicts sharing a row share the same object
+        """
+        cache: Dict[int, Schedule] = {}
+        
+        def schedule_at(position: int) -> Schedule:
+            schedule = cache.get(position)
+            if schedule is None:
+                schedule = cache[position] = self.schedule(position)
+            return schedule
+        
+        return schedule_at
+    
+    def __iter__(self) -> Iterator[Schedule]:
+        for position in range(len(self.ids)):
+            yield self.schedule(position)
+    
+    def __len__(self):
+        return len(self.ids)
+
+
+class _IntervalNode:
+    """Node of the AVL-balanced interval tree"""
+    
+    __slots__ = ('key', 'interval', 'schedule', 'max_end', 'height', 'left', 'right')
+    
+    def __init__(self, key: Tuple[int, int, str], interval: TimeInterval, schedule: Schedule):
+        self.key = key
+        self.interval = interval
+        self.schedule = schedule
+        self.max_end = interval.end
+        self.height = 1
+        self.left: Optional['_IntervalNode'] = None
+        self.right: Optional['_IntervalNode'] = None
+
+
 class IntervalTree:
     """
     Interval Tree for efficient time overlap queries
     Used to optimize schedule conflict detection
+    
+    Self-balancing (AVL) binary search tree ordered by interval start.
+    Every node is augmented with the maximum end point of its subtree,
+    so subtrees that cannot contain an overlap are skipped entirely.
     """
     
     def __init__(self):
-        self.intervals: List[Tuple[TimeInterval, Schedule]] = []
+        self._root: Optional[_IntervalNode] = None
+        self._size = 0
+    
+    @staticmethod
+    def _key(interval: TimeInterval, schedule: Schedule) -> Tuple[int, int, str]:
+        return (interval.start, interval.end, schedule.id)
+    
+    @staticmethod
+    def _height(node: Optional[_IntervalNode]) -> int:
+        return node.height if node else 0
+    
+    def _update(self, node: _IntervalNode):
+        """Recompute height and max endpoint from the children"""
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        max_end = node.interval.end
+        if node.left and node.left.max_end > max_end:
+            max_end = node.left.max_end
+        if node.right and node.right.max_end > max_end:
+            max_end = node.right.max_end
+        node.max_end = max_end
+    
+    def _rotate_right(self, node: _IntervalNode) -> _IntervalNode:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+    
+    def _rotate_left(self, node: _IntervalNode) -> _IntervalNode:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+    
+    def _rebalance(self, node: _IntervalNode) -> _IntervalNode:
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
     
     def insert(self, interval: TimeInterval, schedule: Schedule):
-        """Insert an interval and its associated schedule"""
-        self.intervals.append((interval, schedule))
+        """
+        Insert an interval and its associated schedule
+        Time Complexity: O(log n)
+        """
+        self._root = self._insert(self._root, _IntervalNode(self._key(interval, schedule), interval, schedule))
+        self._size += 1
+    
+    def _insert(self, node: Optional[_IntervalNode], new_node: _IntervalNode) -> _IntervalNode:
+        if node is None:
+            return new_node
+        if new_node.key < node.key:
+            node.left = self._insert(node.left, new_node)
+        else:
+            node.right = self._insert(node.right, new_node)
+        return self._rebalance(node)
+    
+    def delete(self, interval: TimeInterval, schedule: Schedule) -> bool:
+        """
+        Remove a previously inserted interval/schedule pair
+        Time Complexity: O(log n)
+        
+        Returns:
+            True if the pair was found and removed, False otherwise
+        """
+        key = self._key(interval, schedule)
+        removed = []
+        self._root = self._delete(self._root, key, removed)
+        if removed:
+            self._size -= 1
+        return bool(removed)
+    
+    def _delete(self, node: Optional[_IntervalNode], key: Tuple[int, int, str],
+                removed: List[_IntervalNode]) -> Optional[_IntervalNode]:
+        if node is None:
+            return None
+        if key < node.key:
+            node.left = self._delete(node.left, key, removed)
+        elif key > node.key:
+            node.right = self._delete(node.right, key, removed)
+        else:
+            removed.append(node)
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            # Replace with the in-order successor
+            right, successor = self._pop_min(node.right)
+            successor.left = node.left
+            successor.right = right
+            node = successor
+        return self._rebalance(node)
+    
+    def _pop_min(self, node: _IntervalNode) -> Tuple[Optional[_IntervalNode], _IntervalNode]:
+        """Detach the leftmost node, returning (new subtree, detached node)"""
+        if node.left is None:
+            return node.right, node
+        node.left, smallest = self._pop_min(node.left)
+        return self._rebalance(node), smallest
+    
+    def _query(self, start: int, end: int) -> List[Schedule]:
+        """Collect schedules whose interval overlaps [start, end)"""
+        result = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            # No interval in this subtree ends after the query starts
+            if node.max_end <= start:
+                continue
+            if node.left is not None:
+                stack.append(node.left)
+            # Everything right of a node starting at/after the query end is out of range
+            if node.interval.start < end:
+                if start < node.interval.end:
+                    result.append(node.schedule)
+                if node.right is not None:
+                    stack.append(node.right)
+        return result
     
     def find_overlapping(self, interval: TimeInterval) -> List[Schedule]:
         """
         Find all schedules with intervals that overlap with the given interval
-        Time Complexity: O(n) where n is number of intervals
-        (Could be optimized to O(log n + k) with balanced tree, k = results)
+        Time Complexity: O(log n + k) where k is the number of results
+        """
+        return self._query(interval.start, interval.end)
+    
+    def stab(self, point: time) -> List[Schedule]:
         """
-        overlapping_schedules = []
-        for stored_interval, schedule in self.intervals:
-            if interval.overlaps_with(stored_interval):
-                overlapping_schedules.append(schedule)
-        return overlapping_schedules
+        Find all schedules running at the given moment (start <= point < end)
+        Time Complexity: O(log n + k) where k is the number of results
+        """
+        minutes = TimeInterval._time_to_minutes(point)
+        return self._query(minutes, minutes + 1)
+    
+    def __iter__(self) -> Iterator[Tuple[TimeInterval, Schedule]]:
+        """Iterate over stored (interval, schedule) pairs ordered by start time"""
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.interval, node.schedule
+            node = node.right
+    
+    @property
+    def intervals(self) -> List[Tuple[TimeInterval, Schedule]]:
+        """All stored (interval, schedule) pairs ordered by start time"""
+        return list(self)
     
     def __len__(self):
-        return len(self.intervals)
+        return self._size
+
+
+CONFLICT_TYPES = frozenset(('room_conflict', 'lecturer_conflict'))
+
+# Conflict type per resource column, in the order groups are reported
+RESOURCE_TYPES = ('room_conflict', 'lecturer_conflict')
+
+# Shared no-op context for uninstrumented runs
+_NO_PHASE = nullcontext()
+
+# (start_minutes, end_minutes, position) entries of one (day, resource) group
+GroupEntries = List[Tuple[int, int, int]]
+# (conflict_type, day, resource, entries)
+ResourceGroup = Tuple[str, str, str, GroupEntries]
+
+
+def sweep_overlapping_pairs(entries: GroupEntries) -> Iterator[Tuple[int, int]]:
+    """
+    Sweep-line enumeration of overlapping intervals within one group
+    Time Complexity: O(n log n + k) where k is the number of overlapping pairs
+    
+    Args:
+        entries: (start_minutes, end_minutes, position) tuples
+        
+    Yields:
+        (position_a, position_b) pairs with position_a < position_b
+    """
+    active = []  # min-heap of (end, start, position) still running at the sweep line
+    for start, end, position in sorted(entries):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other_start, other_position in active:
+            # Every active interval started at or before this one; the start
+            # check only matters for empty intervals sharing a start point
+            if other_start < end:
+                if other_position < position:
+                    yield other_position, position
+                else:
+                    yield position, other_position
+        heapq.heappush(active, (end, start, position))
+
+
+def sweep_overlap_clusters(entries: GroupEntries) -> Iterator[Tuple[List[int], int, int, int, int]]:
+    """
+    Sweep-line grouping of overlapping intervals into connected components
+    Time Complexity: O(n log n), independent of the number of overlapping pairs
+    
+    A component ends whenever the sweep line finds no interval still
+    running. Every interval overlaps all intervals active when it starts
+    (empty ones sort first at a shared start point, so they never see
+    each other), which makes the pair count a running sum of active sizes.
+    
+    Args:
+        entries: (start_minutes, end_minutes, position) tuples
+        
+    Yields:
+        (positions, start, end, pair_count, max_concurrent) for every
+        component of two or more intervals, positions sorted ascending
+    """
+    active = []  # min-heap of end minutes still running at the sweep line
+    positions, first_start, last_end, pairs, peak = [], 0, 0, 0, 0
+    for start, end, position in sorted(entries):
+        while active and active[0] <= start:
+            heapq.heappop(active)
+        if not active:
+            if pairs:
+                yield sorted(positions), first_start, last_end, pairs, peak
+            positions, first_start, last_end, pairs, peak = [], start, end, 0, 0
+        positions.append(position)
+        pairs += len(active)
+        last_end = max(last_end, end)
+        heapq.heappush(active, end)
+        peak = max(peak, len(active))
+    if pairs:
+        yield sorted(positions), first_start, last_end, pairs, peak
+
+
+def _shard_groups(columns: Tuple[Any, ...], shard: int, shard_count: int,
+                  counts_only: bool) -> Tuple[int, int, List[Tuple[int, int, int, int, Any]]]:
+    """
+    Process-pool entry point: group, sweep and filter one shard of groups
+    
+    Every worker receives all rows and keeps the (day, resource) groups
+    whose dense group code falls into its shard, so partitioning runs in
+    the workers as well and only compact results travel back.
+    
+    Args:
+        columns: (ids, days, day_count, resource_columns, starts, ends) of a
+            ScheduleTable; resource_columns holds the room and lecturer
+            codes, None for a conflict type that is not wanted
+        shard: Index of this shard
+        shard_count: Number of shards
+        counts_only: Return conflict counts instead of position pairs
+        
+    Returns:
+        (candidate_pairs, groups_examined, found) where found holds
+        (type_index, first_position, day, resource, pairs) for every group
+        with a conflict; pairs is a flat array('i') of position pairs, or
+        the number of conflicts when counts_only
+    """
+    ids, days, day_count, resource_columns, starts, ends = columns
+    candidates = examined = 0
+    found = []
+    for type_index, resources in enumerate(resource_columns):
+        if resources is None:
+            continue
+        groups = defaultdict(list)
+        for position, (day, resource, start, end) in enumerate(zip(days, resources, starts, ends)):
+            if (resource * day_count + day) % shard_count == shard:
+                groups[(day, resource)].append((start, end, position))
+        
+        for (day, resource), entries in groups.items():
+            if len(entries) < 2:
+                continue
+            examined += 1
+            pairs = array('i')
+            for first, second in sweep_overlapping_pairs(entries):
+                candidates += 1
+                if ids[first] != ids[second]:
+                    pairs.append(first)
+                    pairs.append(second)
+            if pairs:
+                # Entries were appended in position order, so entries[0] is
+                # where the sequential sweep first meets this group
+                found.append((type_index, entries[0][2], day, resource, len(pairs) // 2 if counts_only else pairs))
+    return candidates, examined, found
+
+
+class _GCPause:
+    """
+    Suspends the cyclic garbage collector while objects are bulk-built
+    
+    Conflicts and schedules form no reference cycles, yet every few hundred
+    allocations trigger a collection that rescans them all; on large
+    timetables that is most of the Conflict construction time. Nested and
+    concurrent pauses share one switch, restored by the last one to leave.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._was_enabled = False
+    
+    def __enter__(self):
+        with self._lock:
+            if self._depth == 0:
+                self._was_enabled = gc.isenabled()
+                gc.disable()
+            self._depth += 1
+    
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0 and self._was_enabled:
+                gc.enable()
+
+
+_gc_paused = _GCPause()
+
+
+@dataclass
+class DetectionStats:
+    """
+    Per-run instrumentation of ScheduleConflictDetector
+    
+    Phases (seconds spent in each):
+        grouping: partitioning schedules by day or (day, resource)
+        tree_build: building the per-(day, resource) interval trees
+        overlap_query: interval-tree queries / sweep-line pair enumeration
+        pair_dedup: skipping pairs already seen through processed_pairs
+        conflict_construction: building Conflict objects
+    """
+    mode: str
+    schedules: int = 0
+    groups: int = 0
+    candidate_pairs: int = 0  # overlapping pairs examined
+    conflicts: int = 0  # conflicts actually reported
+    total_seconds: float = 0.0
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    peak_memory_bytes: Optional[int] = None  # only known while tracemalloc is tracing
+    profile: Optional[pstats.Stats] = None  # set by profile_run(profiler='cprofile')
+    memory_snapshot: Optional[tracemalloc.Snapshot] = None  # set by profile_run(profiler='tracemalloc')
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Add the wall time of the with-block to the named phase"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + perf_counter() - started
+    
+    @property
+    def discarded_pairs(self) -> int:
+        """Candidate pairs that turned out not to be conflicts"""
+        return max(self.candidate_pairs - self.conflicts, 0)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-friendly view (without profiler objects)"""
+        return {
+            'mode': self.mode,
+            'schedules': self.schedules,
+            'groups': self.groups,
+            'candidate_pairs': self.candidate_pairs,
+            'conflicts': self.conflicts,
+            'discarded_pairs': self.discarded_pairs,
+            'total_seconds': round(self.total_seconds, 6),
+            'phase_seconds': {name: round(seconds, 6) for name, seconds in self.phase_seconds.items()},
+            'peak_memory_bytes': self.peak_memory_bytes,
+        }
 
 
 class ScheduleConflictDetector:
     """
     Detects schedule conflicts using interval tree optimization
+    
+    Modes:
+        'interval_tree': per day, query an interval tree for every schedule
+            and classify each overlapping pair afterwards (default)
+        'sweep': partition by (day, room) and (day, lecturer) and run a
+            sorted sweep-line inside each group, so only pairs that share a
+            resource are ever generated - O(n log n + k)
+        'parallel': the sweep mode with its (day, resource) groups hashed
+            into one shard per worker of a ProcessPoolExecutor; workers do
+            the grouping, sweep and id filtering and send back flat position
+            pairs, merged in the same order the sweep mode produces them;
+            with a single worker it simply runs the sweep
+    
+    The 'parallel' pool is started on first use and kept for later runs;
+    close() (or using the detector as a context manager) shuts it down.
+    
+    With instrument=True every run leaves a DetectionStats in self.stats;
+    profile_run() additionally attaches cProfile or tracemalloc to one run.
     """
     
-    def __init__(self):
-        self.conflicts: List[Conflict] = []
-        self.processed_pairs = set()
+    MODES = ('interval_tree', 'sweep', 'parallel')
     
-    def detect_schedule_conflict(self, schedules: List[Schedule]) -> List[Conflict]:
+    # Implementation of detect_schedule_conflict; subclasses such as
+    # VectorizedConflictDetector override it instead of inventing a mode
+    backend = 'python'
+    
+    def __init__(self, mode: str = 'interval_tree', max_workers: Optional[int] = None,
+                 instrument: bool = False):
+        """
+        Args:
+            mode: Detection mode, one of MODES
+            max_workers: Worker processes for 'parallel' mode
+                (defaults to the number of CPUs)
+            instrument: Collect per-phase timers and counters in self.stats
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown detection mode '{mode}', expected one of {self.MODES}")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.instrument = instrument
+        self.stats: Optional[DetectionStats] = None
+        self._run_started = 0.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+    
+    def close(self):
+        """Shut down the worker pool of 'parallel' mode, if one was started"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def detect_schedule_conflict(self, schedules: Union[List[Schedule], ScheduleTable]) -> List[Conflict]:
         """
         Detect all conflicts in a list of schedules
         
         Args:
-            schedules: List of Schedule objects
+            schedules: List of Schedule objects, or a ScheduleTable
             
         Returns:
             List of Conflict objects with details
         """
-        self.conflicts = []
-        self.processed_pairs = set()
+        # A fresh list per call: one detector may serve several threads
+        conflicts: List[Conflict] = []
+        self._begin_run(schedules)
+        try:
+            with _gc_paused:
+                conflicts.extend(self._iter_all(schedules, CONFLICT_TYPES, pooled=self._pooled()))
+        finally:
+            self._end_run(len(conflicts))
+        return conflicts
+    
+    def iter_conflicts(self, schedules: Union[List[Schedule], ScheduleTable], limit: Optional[int] = None,
+                       conflict_types: Optional[Iterable[str]] = None) -> Iterator[Conflict]:
+        """
+        Yield conflicts as they are found
         
-        # Group schedules by day for efficient processing
-        schedules_by_day = defaultdict(list)
-        for schedule in schedules:
-            schedules_by_day[schedule.hari].append(schedule)
+        Work stops as soon as the consumer stops iterating or the limit is
+        reached; groups of a filtered-out conflict type are never swept.
+        'parallel' mode streams with the sequential sweep, since a process
+        pool would have to finish every shard before the first result.
         
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable
+            limit: Maximum number of conflicts to yield
+            conflict_types: Only yield these types (default: all)
+            
+        Yields:
+            Conflict objects
+        """
+        types = CONFLICT_TYPES if conflict_types is None else frozenset(conflict_types)
+        if limit is not None and limit <= 0:
+            return
+        self._begin_run(schedules)
+        found = 0
+        try:
+            for conflict in itertools.islice(self._iter_all(schedules, types, pooled=False), limit):
+                found += 1
+                yield conflict
+        finally:
+            self._end_run(found)
+    
+    def has_conflicts(self, schedules: Union[List[Schedule], ScheduleTable],
+                      conflict_types: Optional[Iterable[str]] = None) -> bool:
+        """Return True as soon as a first conflict is found"""
+        return next(self.iter_conflicts(schedules, limit=1, conflict_types=conflict_types), None) is not None
+    
+    def profile_run(self, schedules: Union[List[Schedule], ScheduleTable],
+                    profiler: str = 'cprofile') -> DetectionStats:
+        """
+        Run detection once, instrumented, with a profiler attached
+        
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable
+            profiler: 'cprofile' (stats.profile holds a pstats.Stats) or
+                'tracemalloc' (stats.memory_snapshot and peak_memory_bytes)
+            
+        Returns:
+            The DetectionStats of the run (also left in self.stats)
+        """
+        if profiler not in ('cprofile', 'tracemalloc'):
+            raise ValueError(f"Unknown profiler '{profiler}', expected 'cprofile' or 'tracemalloc'")
+        
+        instrument, self.instrument = self.instrument, True
+        try:
+            if profiler == 'cprofile':
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    self.detect_schedule_conflict(schedules)
+                finally:
+                    profile.disable()
+                self.stats.profile = pstats.Stats(profile)
+            else:
+                already_tracing = tracemalloc.is_tracing()
+                if not already_tracing:
+                    tracemalloc.start()
+                try:
+                    self.detect_schedule_conflict(schedules)
+                    self.stats.memory_snapshot = tracemalloc.take_snapshot()
+                finally:
+                    if not already_tracing:
+                        tracemalloc.stop()
+        finally:
+            self.instrument = instrument
+        return self.stats
+    
+    def _begin_run(self, schedules: Union[List[Schedule], ScheduleTable]):
+        """Start a fresh DetectionStats when instrumenting"""
+        if not self.instrument:
+            self.stats = None
+            return
+        self.stats = DetectionStats(mode=self.mode, schedules=len(schedules))
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._run_started = perf_counter()
+    
+    def _end_run(self, conflicts: int):
+        """Finalize the current DetectionStats"""
+        if self.stats is None:
+            return
+        self.stats.total_seconds = perf_counter() - self._run_started
+        self.stats.conflicts = conflicts
+        if tracemalloc.is_tracing():
+            self.stats.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    
+    def _phase(self, name: str):
+        """Time a phase when instrumenting, otherwise do nothing"""
+        return self.stats.phase(name) if self.stats is not None else _NO_PHASE
+    
+    def _iter_all(self, schedules: Union[List[Schedule], ScheduleTable], conflict_types: Iterable[str],
+                  pooled: bool) -> Iterator[Conflict]:
+        """Dispatch to the detection strategy of the current mode"""
+        if self.mode == 'interval_tree':
+            return self._iter_by_day(schedules, conflict_types)
+        return self._iter_by_resource(schedules, conflict_types, pooled)
+    
+    def _iter_by_day(self, schedules: Union[List[Schedule], ScheduleTable],
+                     conflict_types: Iterable[str]) -> Iterator[Conflict]:
+        """
+        Interval-tree detection, one day at a time
+        
+        Args:
+            schedules: List of schedules (any days), or a ScheduleTable
+            conflict_types: Conflict types to report
+        """
+        with self._phase('grouping'):
+            if isinstance(schedules, ScheduleTable):
+                schedules = list(schedules)
+            
+            # Group schedules by day for efficient processing
+            schedules_by_day = defaultdict(list)
+            for schedule in schedules:
+                schedules_by_day[schedule.hari].append(schedule)
         # Check conflicts for each day
         for day, day_schedules in schedules_by_day.items():
-            self._check_conflicts_for_day(day, day_schedules)
+            yield from self._check_conflicts_for_day(day, day_schedules, conflict_types)
+    
+    def _iter_by_resource(self, schedules: Union[List[Schedule], ScheduleTable],
+                          conflict_types: Iterable[str], pooled: bool) -> Iterator[Conflict]:
+        """
+        Sweep-line detection partitioned by (day, room) and (day, lecturer)
+        
+        Args:
+            schedules: List of schedules (any days), or a ScheduleTable
+            conflict_types: Conflict types to report
+            pooled: Run grouping and sweep in the process pool instead of lazily
+        """
+        if pooled:
+            yield from self._detect_pooled(schedules, conflict_types)
+            return
+        
+        stats = self.stats
+        with self._phase('grouping'):
+            groups, id_at, schedule_at = self._resource_groups(schedules)
+            groups = [group for group in groups if group[0] in conflict_types]
+        if stats is not None:
+            stats.groups = len(groups)
+        
+        for conflict_type, day, _, entries in groups:
+            make_conflict = self._room_conflict if conflict_type == 'room_conflict' else self._lecturer_conflict
+            if stats is None:
+                for first, second in sweep_overlapping_pairs(entries):
+                    if id_at(first) != id_at(second):
+                        yield make_conflict(schedule_at(first), schedule_at(second), day)
+                continue
+            
+            # Instrumented: finish each phase per group so the timers never
+            # include time spent suspended in the consumer
+            with stats.phase('overlap_query'):
+                pairs = list(sweep_overlapping_pairs(entries))
+            stats.candidate_pairs += len(pairs)
+            with stats.phase('conflict_construction'):
+                conflicts = [
+                    make_conflict(schedule_at(first), schedule_at(second), day)
+                    for first, second in pairs if id_at(first) != id_at(second)
+                ]
+            yield from conflicts
+    
+    def _detect_pooled(self, schedules: Union[List[Schedule], ScheduleTable],
+                       conflict_types: Iterable[str]) -> List[Conflict]:
+        """
+        'parallel' detection; only Conflict construction runs in this process
         
-        return self.conflicts
+        Args:
+            schedules: List of schedules (any days), or a ScheduleTable
+            conflict_types: Conflict types to report
+        """
+        with self._phase('grouping'):
+            table, schedule_at = self._as_table(schedules)
+        with self._phase('overlap_query'):
+            candidates, examined, groups = self._run_shards(table, conflict_types, counts_only=False)
+        if self.stats is not None:
+            self.stats.groups = examined
+            self.stats.candidate_pairs = candidates
+        
+        conflicts = []
+        makers = (self._room_conflict, self._lecturer_conflict)
+        with self._phase('conflict_construction'):
+            for type_index, _, day, _, pairs in groups:
+                make_conflict, day_name = makers[type_index], table.day_names[day]
+                positions = iter(pairs)
+                conflicts.extend(
+                    make_conflict(schedule_at(first), schedule_at(second), day_name)
+                    for first, second in zip(positions, positions)
+                )
+        return conflicts
     
-    def _check_conflicts_for_day(self, day: str, schedules: List[Schedule]):
+    def count_conflicts(self, schedules: Union[List[Schedule], ScheduleTable]) -> Dict[str, Any]:
+        """
+        Counts-only detection: the same summary as get_conflict_summary,
+        without allocating a Conflict (or its details) per conflicting pair
+        
+        Always uses the (day, resource) sweep; with a 'parallel' pool the
+        workers send back only a count per conflicting group.
+        
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable
+            
+        Returns:
+            Summary dictionary
+        """
+        counts = {'room_conflict': 0, 'lecturer_conflict': 0}
+        affected = {'room_conflict': set(), 'lecturer_conflict': set()}
+        if self._pooled():
+            table, _ = self._as_table(schedules)
+            names = (table.room_names, table.lecturer_names)
+            for type_index, _, _, resource, found in self._run_shards(table, CONFLICT_TYPES, counts_only=True)[2]:
+                counts[RESOURCE_TYPES[type_index]] += found
+                affected[RESOURCE_TYPES[type_index]].add(names[type_index][resource])
+        else:
+            groups, id_at, _ = self._resource_groups(schedules)
+            for conflict_type, _, resource, entries in groups:
+                found = sum(1 for first, second in sweep_overlapping_pairs(entries) if id_at(first) != id_at(second))
+                if found:
+                    counts[conflict_type] += found
+                    affected[conflict_type].add(resource)
+        
+        return {
+            'total_conflicts': counts['room_conflict'] + counts['lecturer_conflict'],
+            'room_conflicts': counts['room_conflict'],
+            'lecturer_conflicts': counts['lecturer_conflict'],
+            'affected_rooms': sorted(affected['room_conflict']),
+            'affected_lecturers': sorted(affected['lecturer_conflict']),
+        }
+    
+    def detect_conflict_clusters(self, schedules: Union[List[Schedule], ScheduleTable],
+                                 conflict_types: Optional[Iterable[str]] = None) -> List[ConflictCluster]:
+        """
+        Detect conflicts as N-way clusters instead of pairs
+        Time Complexity: O(n log n); output is linear in the number of
+        schedules involved, however many pairs overlap
+        
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable
+            conflict_types: Restrict to these conflict types (default: all)
+            
+        Returns:
+            Room clusters first, then lecturer clusters, each ordered by
+            group and start of the cluster window
+        """
+        types = CONFLICT_TYPES if conflict_types is None else frozenset(conflict_types)
+        groups, _, schedule_at = self._resource_groups(schedules)
+        clusters = []
+        for conflict_type, day, resource, entries in groups:
+            if conflict_type not in types:
+                continue
+            for positions, start, end, pairs, peak in sweep_overlap_clusters(entries):
+                first = schedule_at(positions[0])
+                clusters.append(ConflictCluster(
+                    conflict_type,
+                    first.hari,
+                    first.ruangan if conflict_type == 'room_conflict' else first.dosen,
+                    [schedule_at(position) for position in positions],
+                    time(start // 60, start % 60),
+                    time(end // 60, end % 60),
+                    pairs,
+                    peak,
+                ))
+        return clusters
+    
+    @staticmethod
+    def _resource_groups(schedules: Union[List[Schedule], ScheduleTable]
+                         ) -> Tuple[List[ResourceGroup], Callable[[int], str], Callable[[int], Schedule]]:
+        """
+        Partition schedules into (day, room) and (day, lecturer) groups
+        
+        Args:
+            schedules: List of schedules (any days), or a ScheduleTable
+            
+        Returns:
+            (groups, id_at, schedule_at) where groups holds
+            (conflict_type, day, resource, entries) for every group with at
+            least two schedules, entries being (start, end, position) tuples,
+            and id_at/schedule_at resolve a position to its id/Schedule
+        """
+        if isinstance(schedules, ScheduleTable):
+            # Group on the interned ids and minutes already stored in the table
+            rows = zip(schedules.days, schedules.rooms, schedules.lecturers, schedules.starts, schedules.ends)
+            names = {
+                'room_conflict': schedules.room_names,
+                'lecturer_conflict': schedules.lecturer_names,
+            }
+            day_names = schedules.day_names
+            id_at = schedules.ids.__getitem__
+            schedule_at = schedules.materializer()
+        else:
+            rows = (
+                (s.hari, s.ruangan, s.dosen,
+                 TimeInterval._time_to_minutes(s.jam_mulai), TimeInterval._time_to_minutes(s.jam_selesai))
+                for s in schedules
+            )
+            names = day_names = None
+            id_at = lambda position: schedules[position].id
+            schedule_at = schedules.__getitem__
+        
+        room_groups = defaultdict(list)
+        lecturer_groups = defaultdict(list)
+        for position, (day, room, lecturer, start, end) in enumerate(rows):
+            entry = (start, end, position)
+            room_groups[(day, room)].append(entry)
+            lecturer_groups[(day, lecturer)].append(entry)
+        
+        # Only groups with at least two schedules can hold a conflict
+        groups = [
+            (conflict_type, day, resource, entries)
+            for conflict_type, resource_groups in (('room_conflict', room_groups),
+                                                   ('lecturer_conflict', lecturer_groups))
+            for (day, resource), entries in resource_groups.items()
+            if len(entries) > 1
+        ]
+        if names is not None:
+            groups = [
+                (conflict_type, day_names[day], names[conflict_type][resource], entries)
+                for conflict_type, day, resource, entries in groups
+            ]
+        return groups, id_at, schedule_at
+    
+    @staticmethod
+    def _as_table(schedules: Union[List[Schedule], ScheduleTable]
+                  ) -> Tuple[ScheduleTable, Callable[[int], Schedule]]:
+        """The schedules as a ScheduleTable, plus a position -> Schedule lookup"""
+        if isinstance(schedules, ScheduleTable):
+            return schedules, schedules.materializer()
+        return ScheduleTable(schedules), schedules.__getitem__
+    
+    def _workers(self) -> int:
+        """Worker processes 'parallel' mode runs with"""
+        return self.max_workers or os.cpu_count() or 1
+    
+    def _pooled(self) -> bool:
+        """Whether full runs go through the process pool; one worker is just the sweep"""
+        return self.mode == 'parallel' and self._workers() > 1
+    
+    def _executor(self, workers: int) -> ProcessPoolExecutor:
+        """The long-lived worker pool, started on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=workers)
+            return self._pool
+    
+    def _run_shards(self, table: ScheduleTable, conflict_types: Iterable[str],
+                    counts_only: bool) -> Tuple[int, int, List[Tuple[int, int, int, int, Any]]]:
+        """
+        Run _shard_groups for one shard per worker and merge the results
+        
+        Groups are put back in the order the sequential sweep visits them
+        (room groups first, each type by first position in the table), so
+        the result is deterministic and identical to the 'sweep' mode.
+        
+        Returns:
+            (candidate_pairs, groups_examined, found) as in _shard_groups
+        """
+        columns = (
+            table.ids, table.days, len(table.day_names),
+            tuple(resources if conflict_type in conflict_types else None
+                  for conflict_type, resources in zip(RESOURCE_TYPES, (table.rooms, table.lecturers))),
+            table.starts, table.ends,
+        )
+        workers = self._workers()
+        results = list(self._executor(workers).map(
+            _shard_groups, itertools.repeat(columns, workers), range(workers),
+            itertools.repeat(workers, workers), itertools.repeat(counts_only, workers),
+        ))
+        
+        found = sorted((group for _, _, groups in results for group in groups), key=lambda group: group[:2])
+        return sum(result[0] for result in results), sum(result[1] for result in results), found
+    
+    def _check_conflicts_for_day(self, day: str, schedules: List[Schedule],
+                                 conflict_types: Iterable[str] = CONFLICT_TYPES) -> Iterator[Conflict]:
         """
         Check conflicts for schedules on the same day
         
+        Every room and every lecturer of the day gets its own interval tree,
+        so a query only returns schedules that can actually conflict.
+        
         Args:
             day: Day name
             schedules: List of schedules for that day
+            conflict_types: Conflict types to report
+            
+        Yields:
+            Conflicts found on that day, ordered like the schedules
         """
-        # Build interval tree for efficient overlap checking
-        interval_tree = IntervalTree()
-        for schedule in schedules:
-            interval = TimeInterval(schedule.jam_mulai, schedule.jam_selesai)
-            interval_tree.insert(interval, schedule)
+        stats = self.stats
+        
+        # Build the interval trees for efficient overlap checking
+        with self._phase('tree_build'):
+            intervals = [TimeInterval(schedule.jam_mulai, schedule.jam_selesai) for schedule in schedules]
+            resources = [resource for conflict_type, resource in (('room_conflict', attrgetter('ruangan')),
+                                                                  ('lecturer_conflict', attrgetter('dosen')))
+                         if conflict_type in conflict_types]
+            trees = [defaultdict(IntervalTree) for _ in resources]
+            for interval, schedule in zip(intervals, schedules):
+                for resource, resource_trees in zip(resources, trees):
+                    resource_trees[resource(schedule)].insert(interval, schedule)
+            # Query results come back in tree order; positions restore input order
+            position = {id(schedule): index for index, schedule in enumerate(schedules)}
+        if stats is not None:
+            stats.groups += sum(len(resource_trees) for resource_trees in trees)
         
         # Check each schedule against others for conflicts
-        for i, schedule in enumerate(schedules):
-            interval = TimeInterval(schedule.jam_mulai, schedule.jam_selesai)
-            overlapping = interval_tree.find_overlapping(interval)
+        processed_pairs = set()
+        for schedule, interval in zip(schedules, intervals):
+            if stats is not None:
+                yield from self._check_schedule_instrumented(schedule, interval, resources, trees, position, day,
+                                                             conflict_types, processed_pairs)
+                continue
+            
+            overlapping = self._find_resource_overlaps(schedule, interval, resources, trees, position)
             
             # Filter out self and already processed pairs
             for other_schedule in overlapping:
@@ -154,15 +1239,56 @@ class ScheduleConflictDetector:
                 
                 # Create pair key (sorted to avoid duplicates)
                 pair_key = tuple(sorted([schedule.id, other_schedule.id]))
-                if pair_key in self.processed_pairs:
+                if pair_key in processed_pairs:
                     continue
                 
-                self.processed_pairs.add(pair_key)
+                processed_pairs.add(pair_key)
                 
                 # Check conflict types
-                self._check_conflict_types(schedule, other_schedule, day)
+                for conflict in self._check_conflict_types(schedule, other_schedule, day):
+                    if conflict.conflict_type in conflict_types:
+                        yield conflict
     
-    def _check_conflict_types(self, schedule1: Schedule, schedule2: Schedule, day: str):
+    @staticmethod
+    def _find_resource_overlaps(schedule: Schedule, interval: TimeInterval, resources: List[Callable],
+                                trees: List[Dict[str, IntervalTree]], position: Dict[int, int]) -> List[Schedule]:
+        """Schedules overlapping `interval` in the room or lecturer trees of `schedule`, in input order"""
+        overlapping = {}
+        for resource, resource_trees in zip(resources, trees):
+            # A schedule sharing room and lecturer is found in both trees
+            for other_schedule in resource_trees[resource(schedule)].find_overlapping(interval):
+                overlapping[id(other_schedule)] = other_schedule
+        return sorted(overlapping.values(), key=lambda other_schedule: position[id(other_schedule)])
+    
+    def _check_schedule_instrumented(self, schedule: Schedule, interval: TimeInterval, resources: List[Callable],
+                                     trees: List[Dict[str, IntervalTree]], position: Dict[int, int], day: str,
+                                     conflict_types: Iterable[str],
+                                     processed_pairs: Set[Tuple[str, str]]) -> List[Conflict]:
+        """Same steps as _check_conflicts_for_day for one schedule, timed per phase"""
+        stats = self.stats
+        with stats.phase('overlap_query'):
+            overlapping = self._find_resource_overlaps(schedule, interval, resources, trees, position)
+        
+        with stats.phase('pair_dedup'):
+            fresh = []
+            for other_schedule in overlapping:
+                if schedule.id == other_schedule.id:
+                    continue
+                pair_key = tuple(sorted([schedule.id, other_schedule.id]))
+                if pair_key not in processed_pairs:
+                    processed_pairs.add(pair_key)
+                    fresh.append(other_schedule)
+        stats.candidate_pairs += len(fresh)
+        
+        with stats.phase('conflict_construction'):
+            return [
+                conflict
+                for other_schedule in fresh
+                for conflict in self._check_conflict_types(schedule, other_schedule, day)
+                if conflict.conflict_type in conflict_types
+            ]
+    
+    def _check_conflict_types(self, schedule1: Schedule, schedule2: Schedule, day: str) -> Iterator[Conflict]:
         """
         Check specific types of conflicts between two schedules
         
@@ -170,40 +1296,27 @@ class ScheduleConflictDetector:
             schedule1: First schedule
             schedule2: Second schedule
             day: Day name
+            
+        Yields:
+            Room and/or lecturer conflict between the two schedules
         """
         # 1. Room Conflict: same room, same day, overlapping time
         if schedule1.ruangan == schedule2.ruangan:
-            conflict = Conflict(
-                conflict_type='room_conflict',
-                affected_schedules=[schedule1, schedule2],
-                details={
-                    'day': day,
-                    'room': schedule1.ruangan,
-                    'schedule1_time': f"{schedule1.jam_mulai} - {schedule1.jam_selesai}",
-                    'schedule2_time': f"{schedule2.jam_mulai} - {schedule2.jam_selesai}",
-                    'course1': schedule1.course_name or 'Unknown',
-                    'course2': schedule2.course_name or 'Unknown',
-                }
-            )
-            self.conflicts.append(conflict)
+            yield self._room_conflict(schedule1, schedule2, day)
         
         # 2. Lecturer Conflict: same lecturer, same day, overlapping time
         if schedule1.dosen == schedule2.dosen:
-            conflict = Conflict(
-                conflict_type='lecturer_conflict',
-                affected_schedules=[schedule1, schedule2],
-                details={
-                    'day': day,
-                    'lecturer': schedule1.dosen,
-                    'schedule1_time': f"{schedule1.jam_mulai} - {schedule1.jam_selesai}",
-                    'schedule2_time': f"{schedule2.jam_mulai} - {schedule2.jam_selesai}",
-                    'room1': schedule1.ruangan,
-                    'room2': schedule2.ruangan,
-                    'course1': schedule1.course_name or 'Unknown',
-                    'course2': schedule2.course_name or 'Unknown',
-                }
-            )
-            self.conflicts.append(conflict)
+            yield self._lecturer_conflict(schedule1, schedule2, day)
+    
+    @staticmethod
+    def _room_conflict(schedule1: Schedule, schedule2: Schedule, day: str) -> Conflict:
+        """Build a room conflict between two overlapping schedules"""
+        return Conflict('room_conflict', [schedule1, schedule2], day=day)
+    
+    @staticmethod
+    def _lecturer_conflict(schedule1: Schedule, schedule2: Schedule, day: str) -> Conflict:
+        """Build a lecturer conflict between two overlapping schedules"""
+        return Conflict('lecturer_conflict', [schedule1, schedule2], day=day)
     
     def get_conflict_summary(self, conflicts: List[Conflict]) -> Dict[str, Any]:
         """
@@ -218,67 +1331,602 @@ class ScheduleConflictDetector:
         room_conflicts = [c for c in conflicts if c.conflict_type == 'room_conflict']
         lecturer_conflicts = [c for c in conflicts if c.conflict_type == 'lecturer_conflict']
         
+        # Read resources off the schedules so lazy details stay unformatted
         return {
             'total_conflicts': len(conflicts),
             'room_conflicts': len(room_conflicts),
             'lecturer_conflicts': len(lecturer_conflicts),
-            'affected_rooms': list(set(c.details['room'] for c in room_conflicts)),
-            'affected_lecturers': list(set(c.details['lecturer'] for c in lecturer_conflicts)),
+            'affected_rooms': sorted({c.affected_schedules[0].ruangan for c in room_conflicts}),
+            'affected_lecturers': sorted({c.affected_schedules[0].dosen for c in lecturer_conflicts}),
+        }
+
+
+class ConflictIndex:
+    """
+    Persistent index answering "what does this schedule conflict with?"
+    
+    Keeps one IntervalTree per (day, room) and per (day, lecturer), updated
+    in place on add/update/remove, so checking a single candidate costs
+    O(log n + k) instead of re-running detection over the whole timetable.
+    The trees are also indexed by room, lecturer and day, so the conflicts
+    of one room, lecturer, day or schedule are found by sweeping only the
+    trees of that partition.
+    """
+    
+    def __init__(self, schedules: Optional[List[Schedule]] = None):
+        self._schedules: Dict[str, Schedule] = {}
+        self._intervals: Dict[str, TimeInterval] = {}
+        self._room_trees: Dict[Tuple[str, str], IntervalTree] = {}
+        self._lecturer_trees: Dict[Tuple[str, str], IntervalTree] = {}
+        # Partitions: room/lecturer -> its days, day -> its rooms/lecturers
+        # (dicts used as insertion-ordered sets)
+        self._room_days: Dict[str, Dict[str, None]] = {}
+        self._lecturer_days: Dict[str, Dict[str, None]] = {}
+        self._day_rooms: Dict[str, Dict[str, None]] = {}
+        self._day_lecturers: Dict[str, Dict[str, None]] = {}
+        for schedule in schedules or []:
+            self.add(schedule)
+    
+    def add(self, schedule: Schedule):
+        """
+        Index a schedule, replacing any indexed schedule with the same id
+        Time Complexity: O(log n)
+        """
+        if schedule.id in self._schedules:
+            self.remove(schedule.id)
+        interval = TimeInterval(schedule.jam_mulai, schedule.jam_selesai)
+        self._schedules[schedule.id] = schedule
+        self._intervals[schedule.id] = interval
+        self._tree(self._room_trees, self._room_days, self._day_rooms,
+                   schedule.hari, schedule.ruangan).insert(interval, schedule)
+        self._tree(self._lecturer_trees, self._lecturer_days, self._day_lecturers,
+                   schedule.hari, schedule.dosen).insert(interval, schedule)
+    
+    @staticmethod
+    def _tree(trees: Dict[Tuple[str, str], IntervalTree], resource_days: Dict[str, Dict[str, None]],
+              day_resources: Dict[str, Dict[str, None]], day: str, resource: str) -> IntervalTree:
+        """Tree of one (day, resource), created and linked into the partitions on first use"""
+        tree = trees.get((day, resource))
+        if tree is None:
+            tree = trees[(day, resource)] = IntervalTree()
+            resource_days.setdefault(resource, {})[day] = None
+            day_resources.setdefault(day, {})[resource] = None
+        return tree
+    
+    def remove(self, schedule_id: str) -> Optional[Schedule]:
+        """
+        Remove a schedule from the index
+        Time Complexity: O(log n)
+        
+        Returns:
+            The removed schedule, or None if the id was not indexed
+        """
+        schedule = self._schedules.pop(schedule_id, None)
+        if schedule is None:
+            return None
+        interval = self._intervals.pop(schedule_id)
+        for trees, resource_days, day_resources, resource in (
+                (self._room_trees, self._room_days, self._day_rooms, schedule.ruangan),
+                (self._lecturer_trees, self._lecturer_days, self._day_lecturers, schedule.dosen)):
+            key = (schedule.hari, resource)
+            tree = trees[key]
+            tree.delete(interval, schedule)
+            if not len(tree):
+                del trees[key]
+                self._unlink(resource_days, resource, schedule.hari)
+                self._unlink(day_resources, schedule.hari, resource)
+        return schedule
+    
+    @staticmethod
+    def _unlink(partition: Dict[str, Dict[str, None]], outer: str, inner: str):
+        members = partition[outer]
+        del members[inner]
+        if not members:
+            del partition[outer]
+    
+    def update(self, schedule_id: str, schedule: Schedule) -> Optional[Schedule]:
+        """
+        Replace the schedule indexed under schedule_id with a new version
+        
+        Returns:
+            The previous schedule, or None if the id was not indexed
+        """
+        previous = self.remove(schedule_id)
+        self.add(schedule)
+        return previous
+    
+    def find_conflicts(self, candidate: Schedule, replacing: Optional[str] = None) -> List[Conflict]:
+        """
+        Find conflicts between a candidate schedule and the indexed timetable
+        Time Complexity: O(log n + k) where k is the number of conflicts
+        
+        Args:
+            candidate: Schedule to check (need not be indexed)
+            replacing: Id of an indexed schedule the candidate would replace;
+                it is ignored just like an entry with the candidate's own id
+            
+        Returns:
+            Conflicts ordered as [indexed schedule, candidate]
+        """
+        return list(self.iter_conflicts(candidate, replacing=replacing))
+    
+    def iter_conflicts(self, candidate: Schedule, replacing: Optional[str] = None, limit: Optional[int] = None,
+                       conflict_types: Optional[Iterable[str]] = None) -> Iterator[Conflict]:
+        """
+        Yield conflicts between a candidate schedule and the indexed timetable
+        
+        Args:
+            candidate: Schedule to check (need not be indexed)
+            replacing: Id of an indexed schedule the candidate would replace
+            limit: Maximum number of conflicts to yield
+            conflict_types: Only yield these types (default: all)
+            
+        Yields:
+            Conflicts ordered as [indexed schedule, candidate]
+        """
+        if limit is not None and limit <= 0:
+            return
+        types = CONFLICT_TYPES if conflict_types is None else frozenset(conflict_types)
+        yield from itertools.islice(self._iter_candidate_conflicts(candidate, replacing, types), limit)
+    
+    def _iter_candidate_conflicts(self, candidate: Schedule, replacing: Optional[str],
+                                  conflict_types: Iterable[str]) -> Iterator[Conflict]:
+        interval = TimeInterval(candidate.jam_mulai, candidate.jam_selesai)
+        ignored = {candidate.id, replacing}
+        
+        if 'room_conflict' in conflict_types:
+            room_tree = self._room_trees.get((candidate.hari, candidate.ruangan))
+            if room_tree is not None:
+                for other in room_tree.find_overlapping(interval):
+                    if other.id not in ignored:
+                        yield ScheduleConflictDetector._room_conflict(other, candidate, candidate.hari)
+        
+        if 'lecturer_conflict' in conflict_types:
+            lecturer_tree = self._lecturer_trees.get((candidate.hari, candidate.dosen))
+            if lecturer_tree is not None:
+                for other in lecturer_tree.find_overlapping(interval):
+                    if other.id not in ignored:
+                        yield ScheduleConflictDetector._lecturer_conflict(other, candidate, candidate.hari)
+    
+    def has_conflicts(self, candidate: Schedule, replacing: Optional[str] = None) -> bool:
+        """Return True as soon as the candidate is found to conflict"""
+        return next(self.iter_conflicts(candidate, replacing=replacing, limit=1), None) is not None
+    
+    def conflicts_for_schedule(self, schedule_id: str,
+                               conflict_types: Optional[Iterable[str]] = None) -> List[Conflict]:
+        """
+        Conflicts of one indexed schedule
+        Time Complexity: O(log n + k)
+        
+        Returns:
+            Conflicts ordered as [other schedule, this schedule]; empty if
+            the id is not indexed
+        """
+        schedule = self._schedules.get(schedule_id)
+        if schedule is None:
+            return []
+        return list(self.iter_conflicts(schedule, conflict_types=conflict_types))
+    
+    def conflicts_for_room(self, room: str, day: Optional[str] = None,
+                           conflict_types: Optional[Iterable[str]] = None) -> List[Conflict]:
+        """
+        Conflicts involving any schedule held in a room
+        Time Complexity: O(m log m + k) where m is the number of schedules in
+        the room (on that day), independent of the rest of the timetable
+        
+        Args:
+            room: Room name
+            day: Restrict to one day (default: every day)
+            conflict_types: Only return these types (default: all). Room
+                conflicts come from sweeping the room's own trees; lecturer
+                conflicts from one lookup per schedule in the room.
+        """
+        return list(self._iter_partition_conflicts(
+            room, day, self._room_trees, self._room_days, 'room_conflict',
+            self._lecturer_trees, lambda s: s.dosen, 'lecturer_conflict', lambda s: s.ruangan == room,
+            conflict_types))
+    
+    def conflicts_for_lecturer(self, lecturer: str, day: Optional[str] = None,
+                               conflict_types: Optional[Iterable[str]] = None) -> List[Conflict]:
+        """
+        Conflicts involving any schedule taught by a lecturer
+        Time Complexity: O(m log m + k) where m is the number of the
+        lecturer's schedules (on that day), independent of the rest of the timetable
+        
+        Args:
+            lecturer: Lecturer name
+            day: Restrict to one day (default: every day)
+            conflict_types: Only return these types (default: all)
+        """
+        return list(self._iter_partition_conflicts(
+            lecturer, day, self._lecturer_trees, self._lecturer_days, 'lecturer_conflict',
+            self._room_trees, lambda s: s.ruangan, 'room_conflict', lambda s: s.dosen == lecturer,
+            conflict_types))
+    
+    def conflicts_for_day(self, day: str, conflict_types: Optional[Iterable[str]] = None) -> List[Conflict]:
+        """
+        All conflicts on one day
+        Time Complexity: O(m log m + k) where m is the number of schedules on that day
+        
+        Returns:
+            Room conflicts first, then lecturer conflicts
+        """
+        types = CONFLICT_TYPES if conflict_types is None else frozenset(conflict_types)
+        conflicts = []
+        for conflict_type, trees, day_resources in (('room_conflict', self._room_trees, self._day_rooms),
+                                                    ('lecturer_conflict', self._lecturer_trees, self._day_lecturers)):
+            if conflict_type in types:
+                for resource in day_resources.get(day, ()):
+                    conflicts.extend(self._sweep_tree(trees[(day, resource)], conflict_type, day))
+        return conflicts
+    
+    def _iter_partition_conflicts(self, resource: str, day: Optional[str],
+                                  own_trees: Dict[Tuple[str, str], IntervalTree],
+                                  resource_days: Dict[str, Dict[str, None]], own_type: str,
+                                  other_trees: Dict[Tuple[str, str], IntervalTree],
+                                  other_resource: Callable[[Schedule], str], other_type: str,
+                                  is_member: Callable[[Schedule], bool],
+                                  conflict_types: Optional[Iterable[str]]) -> Iterator[Conflict]:
+        """
+        Conflicts touching the trees of one room or lecturer
+        
+        Conflicts of the partition's own type are swept tree by tree; those
+        of the other type are looked up per member schedule, and a pair of
+        two members is reported once.
+        """
+        types = CONFLICT_TYPES if conflict_types is None else frozenset(conflict_types)
+        days = list(resource_days.get(resource, ()))
+        if day is not None:
+            days = [day] if day in days else []
+        
+        if own_type in types:
+            for d in days:
+                yield from self._sweep_tree(own_trees[(d, resource)], own_type, d)
+        
+        if other_type in types:
+            build = (ScheduleConflictDetector._room_conflict if other_type == 'room_conflict'
+                     else ScheduleConflictDetector._lecturer_conflict)
+            for d in days:
+                for interval, schedule in own_trees[(d, resource)]:
+                    for other in other_trees[(d, other_resource(schedule))].find_overlapping(interval):
+                        if other.id == schedule.id or (is_member(other) and other.id < schedule.id):
+                            continue
+                        yield build(other, schedule, d)
+    
+    @staticmethod
+    def _sweep_tree(tree: IntervalTree, conflict_type: str, day: str) -> Iterator[Conflict]:
+        """Every overlapping pair within one (day, resource) tree, in start order"""
+        members = tree.intervals
+        if len(members) < 2:
+            return
+        build = (ScheduleConflictDetector._room_conflict if conflict_type == 'room_conflict'
+                 else ScheduleConflictDetector._lecturer_conflict)
+        entries = [(interval.start, interval.end, position) for position, (interval, _) in enumerate(members)]
+        for a, b in sweep_overlapping_pairs(entries):
+            yield build(members[a][1], members[b][1], day)
+    
+    def get(self, schedule_id: str) -> Optional[Schedule]:
+        """Return the indexed schedule with the given id, if any"""
+        return self._schedules.get(schedule_id)
+    
+    def schedules(self) -> List[Schedule]:
+        """All indexed schedules in insertion order"""
+        return list(self._schedules.values())
+    
+    def __contains__(self, schedule_id: str) -> bool:
+        return schedule_id in self._schedules
+    
+    def __iter__(self) -> Iterator[Schedule]:
+        return iter(self._schedules.values())
+    
+    def __len__(self):
+        return len(self._schedules)
+
+
+class ConflictResultCache:
+    """
+    Conflict results memoized per version of a schedule set
+    
+    The owner of the schedules calls bump() whenever anything is added,
+    updated or removed. Until then, every caller shares the conflicts and
+    summary computed for the current version instead of re-running detection.
+    
+    The cache is safe to share between threads that only hold a read lock
+    on the schedules: results are filled under an internal lock, so each
+    one is computed once per version while concurrent callers wait for it.
+    """
+    
+    def __init__(self, detector: Optional[ScheduleConflictDetector] = None):
+        self.detector = detector or ScheduleConflictDetector(mode='sweep')
+        self.version = 0
+        self._lock = threading.Lock()
+        self._conflicts: Optional[List[Conflict]] = None
+        self._conflicts_version = -1
+        self._summary: Optional[Dict[str, Any]] = None
+        self._summary_version = -1
+        self._clusters: Optional[List[ConflictCluster]] = None
+        self._clusters_version = -1
+    
+    def bump(self) -> int:
+        """Invalidate cached results; returns the new version"""
+        with self._lock:
+            self.version += 1
+            return self.version
+    
+    def conflicts(self, schedules: Union[List[Schedule], ScheduleTable]) -> List[Conflict]:
+        """All conflicts of the current version, detected at most once"""
+        with self._lock:
+            if self._conflicts_version != self.version:
+                self._conflicts = self.detector.detect_schedule_conflict(schedules)
+                self._conflicts_version = self.version
+            return self._conflicts
+    
+    def clusters(self, schedules: Union[List[Schedule], ScheduleTable]) -> List[ConflictCluster]:
+        """All conflict clusters of the current version, detected at most once"""
+        with self._lock:
+            if self._clusters_version != self.version:
+                self._clusters = self.detector.detect_conflict_clusters(schedules)
+                self._clusters_version = self.version
+            return self._clusters
+    
+    def summary(self, schedules: Union[List[Schedule], ScheduleTable]) -> Dict[str, Any]:
+        """
+        Conflict summary of the current version
+        
+        Derived from the cached conflict list when one exists, otherwise
+        from the counts-only path, which allocates no Conflict objects.
+        """
+        with self._lock:
+            if self._summary_version != self.version:
+                if self._conflicts_version == self.version:
+                    self._summary = self.detector.get_conflict_summary(self._conflicts)
+                else:
+                    self._summary = self.detector.count_conflicts(schedules)
+                self._summary_version = self.version
+            return self._summary
+
+
+class ConflictReportWriter:
+    """
+    Streaming conflict report in plain text, CSV or JSON lines
+    
+    Conflicts are consumed in a single pass, each one rendered, counted
+    into the summary and dropped. CSV and JSON lines leave in chunks of
+    `chunk_size` conflicts as they are found.
+    
+    Text keeps the layout of format_conflict_report: one section per
+    conflict type, headed by its count. Since the counts are only known at
+    the end, entries are spooled per type (in memory up to `spool_bytes`,
+    on disk beyond) and the report is emitted once the input is exhausted.
+    """
+    
+    FORMATS = ('text', 'csv', 'jsonl')
+    CSV_COLUMNS = ['type', 'day', 'resource', 'schedule1_id', 'schedule2_id', 'course1', 'course2',
+                   'schedule1_time', 'schedule2_time', 'room1', 'room2']
+    
+    # Section order of the text report; other types follow in order of appearance
+    TEXT_SECTIONS = ('room_conflict', 'lecturer_conflict')
+    
+    def __init__(self, fmt: str = 'text', chunk_size: int = 1000, spool_bytes: int = 8 * 1024 * 1024):
+        """
+        Args:
+            fmt: 'text', 'csv' or 'jsonl'
+            chunk_size: Conflicts rendered per yielded chunk
+            spool_bytes: Text entries kept in memory per section before
+                spilling to a temporary file
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown report format {fmt!r}; expected one of {self.FORMATS}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.spool_bytes = spool_bytes
+        self.summary: Dict[str, Any] = self._new_summary()
+    
+    @staticmethod
+    def _new_summary() -> Dict[str, Any]:
+        return {
+            'total_conflicts': 0,
+            'room_conflicts': 0,
+            'lecturer_conflicts': 0,
+            'affected_rooms': [],
+            'affected_lecturers': [],
         }
+    
+    def write(self, conflicts: Iterable[Conflict], stream: TextIO) -> Dict[str, Any]:
+        """
+        Write the report to a text stream
+        
+        Returns:
+            Summary dictionary (same keys as get_conflict_summary)
+        """
+        for chunk in self.iter_chunks(conflicts):
+            stream.write(chunk)
+        return self.summary
+    
+    def iter_chunks(self, conflicts: Iterable[Conflict]) -> Iterator[str]:
+        """
+        Yield the report in chunks; self.summary is complete once exhausted
+        
+        Args:
+            conflicts: Any iterable of conflicts, e.g. a detector generator
+        """
+        if self.fmt == 'text':
+            yield from self._iter_text(self._tally(conflicts))
+            return
+        
+        render = self._render_csv if self.fmt == 'csv' else self._render_jsonl
+        buffer = io.StringIO()
+        csv_writer = csv.writer(buffer, lineterminator='\n') if self.fmt == 'csv' else None
+        if csv_writer:
+            csv_writer.writerow(self.CSV_COLUMNS)
+        
+        pending = 0
+        for conflict in self._tally(conflicts):
+            render(buffer, csv_writer, conflict, conflict.format_details())
+            pending += 1
+            if pending == self.chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def _tally(self, conflicts: Iterable[Conflict]) -> Iterator[Conflict]:
+        """Pass conflicts through, counting them into self.summary"""
+        self.summary = self._new_summary()
+        counts = {'room_conflict': 0, 'lecturer_conflict': 0}
+        rooms: Set[str] = set()
+        lecturers: Set[str] = set()
+        for index, conflict in enumerate(conflicts, 1):
+            if conflict.conflict_type == 'room_conflict':
+                rooms.add(conflict.affected_schedules[0].ruangan)
+            elif conflict.conflict_type == 'lecturer_conflict':
+                lecturers.add(conflict.affected_schedules[0].dosen)
+            counts[conflict.conflict_type] = counts.get(conflict.conflict_type, 0) + 1
+            self.summary['total_conflicts'] = index
+            yield conflict
+        
+        self.summary.update({
+            'room_conflicts': counts['room_conflict'],
+            'lecturer_conflicts': counts['lecturer_conflict'],
+            'affected_rooms': sorted(rooms),
+            'affected_lecturers': sorted(lecturers),
+        })
+    
+    def _iter_text(self, conflicts: Iterator[Conflict]) -> Iterator[str]:
+        """Spool text entries per conflict type, then emit the sectioned report"""
+        sections: Dict[str, List[Any]] = {}  # type -> [spool, count]
+        try:
+            for conflict in conflicts:
+                section = sections.get(conflict.conflict_type)
+                if section is None:
+                    spool = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes, mode='w+', encoding='utf-8')
+                    section = sections[conflict.conflict_type] = [spool, 0]
+                section[1] += 1
+                self._render_text(section[0], section[1], conflict, conflict.format_details())
+            
+            if not self.summary['total_conflicts']:
+                yield "✓ No conflicts detected!"
+                return
+            
+            yield (f"\n{'=' * 80}\n"
+                   f"CONFLICT DETECTION REPORT - {self.summary['total_conflicts']} conflict(s) found\n"
+                   f"{'=' * 80}\n\n")
+            order = [t for t in self.TEXT_SECTIONS if t in sections]
+            order += [t for t in sections if t not in self.TEXT_SECTIONS]
+            for conflict_type in order:
+                spool, count = sections[conflict_type]
+                yield f"{conflict_type.replace('_', ' ').upper()}S ({count}):\n" + "-" * 80 + "\n"
+                spool.seek(0)
+                for block in iter(lambda: spool.read(64 * 1024), ''):
+                    yield block
+            
+            yield "".join([
+                "SUMMARY:\n",
+                "-" * 80 + "\n",
+                f"Total Conflicts: {self.summary['total_conflicts']}\n",
+                f"Room Conflicts: {self.summary['room_conflicts']}\n",
+                f"Lecturer Conflicts: {self.summary['lecturer_conflicts']}\n",
+                f"Affected Rooms: {', '.join(self.summary['affected_rooms']) or 'None'}\n",
+                f"Affected Lecturers: {', '.join(self.summary['affected_lecturers']) or 'None'}\n",
+                f"{'=' * 80}\n",
+            ])
+        finally:
+            for spool, _ in sections.values():
+                spool.close()
+    
+    @staticmethod
+    def _render_text(stream: TextIO, index: int, conflict: Conflict, d: Dict[str, Any]):
+        if conflict.conflict_type == 'room_conflict':
+            stream.write(f"{index}. {d['day']} - Room {d['room']}\n"
+                         f"   Schedule 1: {d['course1']} ({d['schedule1_time']})\n"
+                         f"   Schedule 2: {d['course2']} ({d['schedule2_time']})\n")
+        elif conflict.conflict_type == 'lecturer_conflict':
+            stream.write(f"{index}. {d['day']} - Lecturer {d['lecturer']}\n"
+                         f"   Schedule 1: {d['course1']} in {d['room1']} ({d['schedule1_time']})\n"
+                         f"   Schedule 2: {d['course2']} in {d['room2']} ({d['schedule2_time']})\n")
+        elif conflict.conflict_type == 'student_conflict':
+            stream.write(f"{index}. {d['day']} - {d['students_affected']} student(s)\n"
+                         f"   Schedule 1: {d['course1']} in {d['room1']} ({d['schedule1_time']})\n"
+                         f"   Schedule 2: {d['course2']} in {d['room2']} ({d['schedule2_time']})\n")
+        else:
+            stream.write(f"{index}. {d.get('day')}\n")
+        # Rule-engine conflicts may involve one schedule or a whole group
+        stream.write(f"   IDs: {' ↔ '.join(s.id for s in conflict.affected_schedules)}\n\n")
+    
+    @staticmethod
+    def _render_csv(_, writer, conflict: Conflict, d: Dict[str, Any]):
+        first = conflict.affected_schedules[0]
+        second_id = conflict.affected_schedules[1].id if len(conflict.affected_schedules) > 1 else ''
+        resource = {'room_conflict': first.ruangan, 'lecturer_conflict': first.dosen}.get(conflict.conflict_type, '')
+        writer.writerow([
+            conflict.conflict_type, d.get('day'), resource, first.id, second_id,
+            d.get('course1'), d.get('course2'), d.get('schedule1_time'), d.get('schedule2_time'),
+            d.get('room1', d.get('room')), d.get('room2', d.get('room')),
+        ])
+    
+    @staticmethod
+    def _render_jsonl(buffer: io.StringIO, _, conflict: Conflict, d: Dict[str, Any]):
+        buffer.write(json.dumps({
+            'type': conflict.conflict_type,
+            'schedules': [s.id for s in conflict.affected_schedules],
+            'details': d,
+        }, ensure_ascii=False))
+        buffer.write("\n")
 
 
-def format_conflict_report(conflicts: List[Conflict]) -> str:
+def format_conflict_report(conflicts: Iterable[Conflict]) -> str:
     """
     Format conflicts into a readable report
     
     Args:
-        conflicts: List of conflicts
+        conflicts: List (or any iterable) of conflicts
+        
+    Returns:
+        Formatted report string; use ConflictReportWriter to stream large
+        reports instead of building the whole string
+    """
+    return ''.join(ConflictReportWriter('text').iter_chunks(conflicts))
+
+
+def format_cluster_report(clusters: List[ConflictCluster]) -> str:
+    """
+    Format conflict clusters into a readable report, one entry per cluster
+    
+    Args:
+        clusters: List of conflict clusters
         
     Returns:
         Formatted report string
     """
-    if not conflicts:
+    if not clusters:
         return "✓ No conflicts detected!"
     
-    report = f"\n{'=' * 80}\n"
-    report += f"CONFLICT DETECTION REPORT - {len(conflicts)} conflict(s) found\n"
-    report += f"{'=' * 80}\n\n"
-    
-    # Group by type
-    room_conflicts = [c for c in conflicts if c.conflict_type == 'room_conflict']
-    lecturer_conflicts = [c for c in conflicts if c.conflict_type == 'lecturer_conflict']
-    
-    if room_conflicts:
-        report += f"ROOM CONFLICTS ({len(room_conflicts)}):\n"
-        report += "-" * 80 + "\n"
-        for idx, conflict in enumerate(room_conflicts, 1):
-            d = conflict.details
-            report += f"{idx}. {d['day']} - Room {d['room']}\n"
-            report += f"   Schedule 1: {d['course1']} ({d['schedule1_time']})\n"
-            report += f"   Schedule 2: {d['course2']} ({d['schedule2_time']})\n"
-            report += f"   IDs: {conflict.affected_schedules[0].id} ↔ {conflict.affected_schedules[1].id}\n\n"
-    
-    if lecturer_conflicts:
-        report += f"LECTURER CONFLICTS ({len(lecturer_conflicts)}):\n"
-        report += "-" * 80 + "\n"
-        for idx, conflict in enumerate(lecturer_conflicts, 1):
-            d = conflict.details
-            report += f"{idx}. {d['day']} - Lecturer {d['lecturer']}\n"
-            report += f"   Schedule 1: {d['course1']} in {d['room1']} ({d['schedule1_time']})\n"
-            report += f"   Schedule 2: {d['course2']} in {d['room2']} ({d['schedule2_time']})\n"
-            report += f"   IDs: {conflict.affected_schedules[0].id} ↔ {conflict.affected_schedules[1].id}\n\n"
-    
-    detector = ScheduleConflictDetector()
-    detector.conflicts = conflicts
-    summary = detector.get_conflict_summary(conflicts)
-    
-    report += f"SUMMARY:\n"
-    report += "-" * 80 + "\n"
-    report += f"Total Conflicts: {summary['total_conflicts']}\n"
-    report += f"Room Conflicts: {summary['room_conflicts']}\n"
-    report += f"Lecturer Conflicts: {summary['lecturer_conflicts']}\n"
-    report += f"Affected Rooms: {', '.join(summary['affected_rooms']) or 'None'}\n"
-    report += f"Affected Lecturers: {', '.join(summary['affected_lecturers']) or 'None'}\n"
-    report += f"{'=' * 80}\n"
-    
-    return report
+    pair_total = sum(c.pair_count for c in clusters)
+    lines = [
+        f"\n{'=' * 80}\n",
+        f"CONFLICT CLUSTER REPORT - {len(clusters)} cluster(s), {pair_total} conflict(s)\n",
+        f"{'=' * 80}\n\n",
+    ]
+    
+    for conflict_type, title, label in (('room_conflict', 'ROOM CONFLICT CLUSTERS', 'Room'),
+                                        ('lecturer_conflict', 'LECTURER CONFLICT CLUSTERS', 'Lecturer')):
+        selected = [c for c in clusters if c.conflict_type == conflict_type]
+        if not selected:
+            continue
+        lines.append(f"{title} ({len(selected)}):\n")
+        lines.append("-" * 80 + "\n")
+        for idx, cluster in enumerate(selected, 1):
+            lines.append(f"{idx}. {cluster.day} - {label} {cluster.resource} "
+                         f"({cluster.window_start} - {cluster.window_end})\n")
+            lines.append(f"   {len(cluster.affected_schedules)} schedules, {cluster.pair_count} conflicting pairs, "
+                         f"up to {cluster.max_concurrent} at once\n")
+            lines.extend(f"   - {schedule.id}: {schedule.course_name} ({schedule.jam_mulai} - {schedule.jam_selesai})\n"
+                         for schedule in cluster.affected_schedules)
+            lines.append("\n")
+    
+    lines.append(f"{'=' * 80}\n")
+    return ''.join(lines)
@@ -0,0 +1,299 @@
+"""
+Automatic Conflict Repair: compute a small set of moves that removes all conflicts
+"""
+
+from typing import List, Dict, Optional, Iterable, Iterator, Set, Tuple
+from dataclasses import dataclass, field, replace
+from datetime import time
+from collections import defaultdict
+from time import perf_counter
+
+from conflict_detector import Schedule, Conflict, ScheduleConflictDetector, ConflictIndex, TimeInterval, CONFLICT_TYPES
+from availability import OccupancyIndex, SlotCandidate, WEEKDAYS, minutes_to_time
+
+
+@dataclass
+class Move:
+    """A schedule moved to a new day, time and/or room"""
+    schedule_id: str
+    original: Schedule
+    replacement: Schedule
+
+    @property
+    def kind(self) -> str:
+        """'time', 'room' or 'time+room'"""
+        moved_time = (self.original.hari, self.original.jam_mulai) != (self.replacement.hari, self.replacement.jam_mulai)
+        moved_room = self.original.ruangan != self.replacement.ruangan
+        return 'time+room' if moved_time and moved_room else 'time' if moved_time else 'room'
+
+
+@dataclass
+class RepairPlan:
+    """Result of a repair run"""
+    moves: List[Move] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def resolved(self) -> bool:
+        """True if applying the moves leaves no conflicts"""
+        return not self.unresolved
+
+    def apply(self, schedules: Iterable[Schedule]) -> List[Schedule]:
+        """Return the schedules with every move applied, in the original order"""
+        replacements = {move.schedule_id: move.replacement for move in self.moves}
+        return [replacements.get(s.id, s) for s in schedules]
+
+
+class ConflictRepairer:
+    """
+    Repair a timetable with as few moves as it can find within a time budget
+
+    1. Pick the schedules to move: a greedy vertex cover of the conflict
+       graph, always taking the schedule involved in the most remaining
+       conflicts, so one move can settle several conflicts at once.
+    2. Lift those schedules out of an incremental ConflictIndex and
+       OccupancyIndex; what is left is conflict-free.
+    3. Re-place them one by one (longest first) into the closest free
+       slot for their lecturer, found with the occupancy bitsets.
+    4. A schedule with no free slot gets a bounded local search: a slot
+       blocked by exactly one movable schedule is taken if that blocker can
+       itself be re-placed (a one-step ejection chain).
+
+    Every placement is confirmed against the ConflictIndex, so the plan
+    never introduces a new conflict.
+    """
+
+    def __init__(self, time_budget: float = 5.0, slot_minutes: int = 5, step_minutes: int = 30,
+                 earliest: time = time(7, 0), latest: time = time(21, 0), allow_day_change: bool = True,
+                 allow_room_change: bool = True, max_ejection_attempts: int = 500):
+        """
+        Args:
+            time_budget: Seconds after which the search stops and reports
+                the schedules it could not re-place
+            slot_minutes: Occupancy slot granularity
+            step_minutes: New start times are multiples of this
+            earliest, latest: Daily window moved classes must fit in
+            allow_day_change: Whether moves may change the day
+            allow_room_change: Whether moves may change the room
+            max_ejection_attempts: Positions examined per schedule in the
+                local search step
+        """
+        if time_budget <= 0:
+            raise ValueError("time_budget must be positive")
+        self.time_budget = time_budget
+        self.slot_minutes = slot_minutes
+        self.step_minutes = step_minutes
+        self.earliest = earliest
+        self.latest = latest
+        self.allow_day_change = allow_day_change
+        self.allow_room_change = allow_room_change
+        self.max_ejection_attempts = max_ejection_attempts
+
+    def repair(self, schedules: List[Schedule], conflicts: Optional[List[Conflict]] = None,
+               pinned: Iterable[str] = ()) -> RepairPlan:
+        """
+        Compute moves that remove all room and lecturer conflicts
+
+        Args:
+            schedules: The current timetable
+            conflicts: Its conflicts, if already known (detected otherwise);
+                conflicts of other types, e.g. from a RuleEngine, are ignored
+            pinned: Ids of schedules that must not move
+
+        Returns:
+            RepairPlan with the moves and any schedules left unresolved
+
+        Raises:
+            ValueError: pinned is a single string rather than a collection of ids
+        """
+        if isinstance(pinned, str):
+            raise ValueError("pinned must be a collection of schedule ids, not a string")
+        started = perf_counter()
+        self._deadline = started + self.time_budget
+        self._pinned = set(pinned)
+        if conflicts is None:
+            conflicts = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(schedules)
+        conflicts = [c for c in conflicts if c.conflict_type in CONFLICT_TYPES]
+
+        plan = RepairPlan()
+        to_move = self._select_moves(conflicts)
+        self._rooms = sorted({s.ruangan for s in schedules})
+        self._index = ConflictIndex([s for s in schedules if s.id not in to_move])
+        self._occupancy = OccupancyIndex(self.slot_minutes, self._index)
+        self._moved: Dict[str, Move] = {}
+
+        pending = sorted((s for s in schedules if s.id in to_move), key=lambda s: -self._duration(s))
+        for schedule in pending:
+            if perf_counter() > self._deadline:
+                plan.timed_out = True
+            elif self._place(schedule) or self._place_with_ejection(schedule):
+                continue
+            # Leave it where it was and keep later moves out of its way
+            plan.unresolved.append(schedule.id)
+            self._pinned.add(schedule.id)
+            self._restore(schedule)
+
+        plan.unresolved.extend(sorted(self._stuck))
+        plan.moves = list(self._moved.values())
+        plan.elapsed_seconds = perf_counter() - started
+        return plan
+
+    def _select_moves(self, conflicts: List[Conflict]) -> Set[str]:
+        """Greedy vertex cover of the conflict graph, skipping pinned schedules"""
+        neighbours: Dict[str, Set[str]] = defaultdict(set)
+        for conflict in conflicts:
+            first, second = conflict.affected_schedules[0].id, conflict.affected_schedules[1].id
+            neighbours[first].add(second)
+            neighbours[second].add(first)
+
+        selected = set()
+        self._stuck: Set[str] = set()
+        # Bucket queue keyed by degree; stale entries are skipped on pop
+        buckets: Dict[int, List[str]] = defaultdict(list)
+        for schedule_id, adjacent in neighbours.items():
+            buckets[len(adjacent)].append(schedule_id)
+        degree = max(buckets, default=0)
+        while degree > 0:
+            if not buckets[degree]:
+                degree -= 1
+                continue
+            schedule_id = buckets[degree].pop()
+            adjacent = neighbours[schedule_id]
+            if len(adjacent) != degree:
+                continue
+            if schedule_id in self._pinned:
+                # Its conflicts must be solved by moving the other side
+                movable = [other for other in adjacent if other not in self._pinned]
+                for other in movable:
+                    selected.add(other)
+                    self._drop(other, neighbours, buckets)
+                if neighbours[schedule_id]:
+                    # Two pinned schedules conflict; nothing can fix that
+                    self._stuck.add(schedule_id)
+                    self._stuck.update(neighbours[schedule_id])
+                    self._drop(schedule_id, neighbours, buckets)
+                continue
+            selected.add(schedule_id)
+            self._drop(schedule_id, neighbours, buckets)
+        return selected
+
+    @staticmethod
+    def _drop(schedule_id: str, neighbours: Dict[str, Set[str]], buckets: Dict[int, List[str]]):
+        """Remove a selected schedule's edges and requeue its neighbours at their new degree"""
+        for other in neighbours[schedule_id]:
+            neighbours[other].discard(schedule_id)
+            buckets[len(neighbours[other])].append(other)
+        neighbours[schedule_id] = set()
+
+    def _place(self, schedule: Schedule, near: Optional[Schedule] = None) -> bool:
+        """Move a lifted schedule to the closest free slot; True on success"""
+        if self._duration(schedule) <= 0:
+            return False
+        for slot in self._free_slots(schedule, near or schedule):
+            if self._commit(schedule, slot):
+                return True
+        return False
+
+    def _free_slots(self, schedule: Schedule, near: Schedule, limit: int = 5) -> List[SlotCandidate]:
+        return self._occupancy.find_free_slots(
+            self._duration(schedule),
+            lecturer=schedule.dosen,
+            days=None if self.allow_day_change else [schedule.hari],
+            rooms=self._rooms if self.allow_room_change else [schedule.ruangan],
+            near=(near.hari, near.jam_mulai, near.ruangan),
+            earliest=self.earliest,
+            latest=self.latest,
+            step_minutes=self.step_minutes,
+            limit=limit,
+        )
+
+    def _commit(self, schedule: Schedule, slot: SlotCandidate) -> bool:
+        moved = replace(schedule, hari=slot.hari, jam_mulai=slot.jam_mulai,
+                        jam_selesai=slot.jam_selesai, ruangan=slot.ruangan)
+        if self._index.has_conflicts(moved):
+            return False
+        self._add(moved, schedule)
+        return True
+
+    def _add(self, moved: Schedule, schedule: Schedule):
+        self._index.add(moved)
+        self._occupancy.add(moved)
+        original = self._moved[schedule.id].original if schedule.id in self._moved else schedule
+        if self._slot(moved) == self._slot(original):
+            self._moved.pop(schedule.id, None)
+        else:
+            self._moved[schedule.id] = Move(schedule.id, original, moved)
+
+    def _lift(self, schedule_id: str) -> Schedule:
+        self._occupancy.remove(schedule_id)
+        return self._index.remove(schedule_id)
+
+    def _place_with_ejection(self, schedule: Schedule) -> bool:
+        """
+        Take a slot held by a single movable schedule and re-place that one
+
+        Positions are tried closest first; the search stops after
+        max_ejection_attempts positions or at the deadline.
+        """
+        for attempt, candidate in enumerate(self._nearby_positions(schedule)):
+            if attempt >= self.max_ejection_attempts or perf_counter() > self._deadline:
+                return False
+            blockers = {c.affected_schedules[0].id for c in self._index.iter_conflicts(candidate)}
+            if len(blockers) != 1:
+                continue
+            blocker_id = blockers.pop()
+            if blocker_id in self._pinned:
+                continue
+            blocker = self._lift(blocker_id)
+            if self._index.has_conflicts(candidate):
+                self._restore(blocker)
+                continue
+            self._add(candidate, schedule)
+            if self._place(blocker, near=self._moved[blocker_id].original if blocker_id in self._moved else blocker):
+                return True
+            # Undo: lift the candidate and put the blocker back where it was
+            self._lift(candidate.id)
+            self._moved.pop(schedule.id, None)
+            self._restore(blocker)
+        return False
+
+    def _restore(self, blocker: Schedule):
+        self._index.add(blocker)
+        self._occupancy.add(blocker)
+
+    def _nearby_positions(self, schedule: Schedule) -> Iterator[Schedule]:
+        """Aligned positions in the daily window, same day and nearest start first"""
+        duration = self._duration(schedule)
+        first = -(-TimeInterval._time_to_minutes(self.earliest) // self.step_minutes) * self.step_minutes
+        last = TimeInterval._time_to_minutes(self.latest) - duration
+        origin = TimeInterval._time_to_minutes(schedule.jam_mulai)
+        starts = sorted(range(first, last + 1, self.step_minutes), key=lambda m: abs(m - origin))
+        if self.allow_day_change:
+            days = [schedule.hari] + [d for d in WEEKDAYS if d != schedule.hari]
+        else:
+            days = [schedule.hari]
+        rooms = [schedule.ruangan]
+        if self.allow_room_change:
+            rooms += [r for r in self._rooms if r != schedule.ruangan]
+        for day in days:
+            for start in starts:
+                for room in rooms:
+                    yield replace(schedule, hari=day, jam_mulai=minutes_to_time(start),
+                                  jam_selesai=minutes_to_time(start + duration), ruangan=room)
+
+    @staticmethod
+    def _slot(schedule: Schedule) -> Tuple[str, time, time, str]:
+        return schedule.hari, schedule.jam_mulai, schedule.jam_selesai, schedule.ruangan
+
+    @staticmethod
+    def _duration(schedule: Schedule) -> int:
+        return (TimeInterval._time_to_minutes(schedule.jam_selesai)
+                - TimeInterval._time_to_minutes(schedule.jam_mulai))
+
+
+def repair_conflicts(schedules: List[Schedule], conflicts: Optional[List[Conflict]] = None,
+                     time_budget: float = 5.0, pinned: Iterable[str] = ()) -> RepairPlan:
+    """Convenience wrapper around ConflictRepairer.repair with default settings"""
+    return ConflictRepairer(time_budget=time_budget).repair(schedules, conflicts, pinned)
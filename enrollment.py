@@ -0,0 +1,211 @@
+"""
+Student Enrollment Conflicts backed by course bitsets and a sparse co-enrollment matrix
+"""
+
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Mapping, Callable, Set
+from collections import defaultdict
+
+from conflict_detector import Schedule, Conflict, TimeInterval, sweep_overlapping_pairs
+
+STUDENT_CONFLICT = 'student_conflict'
+
+
+class EnrollmentIndex:
+    """
+    Co-enrollment index over a course -> students mapping
+
+    Each course keeps a bitset with one bit per student id ever seen, so
+    the students two courses share are one AND and popcount away. For bulk
+    detection the index also derives, once per change, the sparse
+    co-enrollment matrix: shared-student counts for exactly the course
+    pairs that have any student in common.
+    """
+
+    def __init__(self, enrollments: Optional[Mapping[str, Iterable[str]]] = None):
+        """
+        Args:
+            enrollments: Mapping of course key to the ids of its students
+        """
+        self._student_bits: Dict[str, int] = {}
+        self._students: List[str] = []
+        self._student_courses: List[Set[int]] = []
+        self._course_ids: Dict[str, int] = {}
+        self._course_bits: List[int] = []
+        self._pair_counts: Optional[Dict[int, int]] = None
+        self._pair_stride = 0
+        for course, students in (enrollments or {}).items():
+            self.enroll_many(course, students)
+
+    def _bit(self, student: str) -> int:
+        position = self._student_bits.get(student)
+        if position is None:
+            position = self._student_bits[student] = len(self._students)
+            self._students.append(student)
+            self._student_courses.append(set())
+        return position
+
+    def course_id(self, course: str) -> int:
+        """Dense id of a course, assigned on first use"""
+        course_id = self._course_ids.get(course)
+        if course_id is None:
+            course_id = self._course_ids[course] = len(self._course_bits)
+            self._course_bits.append(0)
+            self._pair_counts = None
+        return course_id
+
+    def find_course_id(self, course: str) -> Optional[int]:
+        """Dense id of a known course, or None; never assigns one"""
+        return self._course_ids.get(course)
+
+    def enroll(self, course: str, student: str):
+        """Add one student to a course"""
+        self.enroll_many(course, (student,))
+
+    def enroll_many(self, course: str, students: Iterable[str]):
+        """Add several students to a course"""
+        course_id = self.course_id(course)
+        bits = 0
+        for student in students:
+            position = self._bit(student)
+            bits |= 1 << position
+            self._student_courses[position].add(course_id)
+        self._course_bits[course_id] |= bits
+        self._pair_counts = None
+
+    def drop(self, course: str, student: str):
+        """Remove a student from a course"""
+        position = self._student_bits.get(student)
+        course_id = self._course_ids.get(course)
+        if position is not None and course_id is not None:
+            self._course_bits[course_id] &= ~(1 << position)
+            self._student_courses[position].discard(course_id)
+            self._pair_counts = None
+
+    def course_bits(self, course: str) -> int:
+        course_id = self._course_ids.get(course)
+        return 0 if course_id is None else self._course_bits[course_id]
+
+    def enrolled_count(self, course: str) -> int:
+        return self.course_bits(course).bit_count()
+
+    def shared_count(self, course1: str, course2: str) -> int:
+        """Number of students enrolled in both courses"""
+        return (self.course_bits(course1) & self.course_bits(course2)).bit_count()
+
+    def shared_students(self, course1: str, course2: str) -> List[str]:
+        """Ids of the students enrolled in both courses"""
+        bits = self.course_bits(course1) & self.course_bits(course2)
+        students = []
+        while bits:
+            low = bits & -bits
+            students.append(self._students[low.bit_length() - 1])
+            bits ^= low
+        return students
+
+    def pair_counts(self) -> Dict[int, int]:
+        """
+        Sparse co-enrollment matrix: {low_id * course_count + high_id: shared}
+
+        Only course pairs with at least one shared student are present.
+        Built in O(sum of k^2) over students' course lists, then cached
+        until the next enrollment change or new course. Use pair_count()
+        to look up a pair without depending on the key layout.
+        """
+        if self._pair_counts is None:
+            stride = self._pair_stride = len(self._course_bits)
+            counts: Dict[int, int] = {}
+            for courses in self._student_courses:
+                if len(courses) < 2:
+                    continue
+                ordered = sorted(courses)
+                for i, low in enumerate(ordered):
+                    base = low * stride
+                    for high in ordered[i + 1:]:
+                        key = base + high
+                        counts[key] = counts.get(key, 0) + 1
+            self._pair_counts = counts
+        return self._pair_counts
+
+    def pair_count(self, course_id1: int, course_id2: int) -> int:
+        """Students shared by two courses given by id, read from the co-enrollment matrix"""
+        counts = self.pair_counts()
+        low, high = (course_id1, course_id2) if course_id1 < course_id2 else (course_id2, course_id1)
+        return counts.get(low * self._pair_stride + high, 0)
+
+    def __contains__(self, course: str) -> bool:
+        return bool(self.course_bits(course))
+
+    def __len__(self):
+        return len(self._course_ids)
+
+
+def _default_course_key(schedule: Schedule) -> str:
+    return schedule.course_name or schedule.id
+
+
+class StudentConflictDetector:
+    """
+    Report overlapping schedules whose courses share enrolled students
+
+    Schedules of enrolled courses are swept per day to find every pair
+    that overlaps in time; each pair is scored with one lookup in the
+    sparse co-enrollment matrix (EnrollmentIndex.pair_counts).
+    """
+
+    def __init__(self, enrollment: EnrollmentIndex, course_key: Callable[[Schedule], str] = _default_course_key,
+                 min_students: int = 1):
+        """
+        Args:
+            enrollment: The co-enrollment index
+            course_key: Maps a schedule to its enrollment key (default:
+                course_name, falling back to the schedule id)
+            min_students: Report only pairs sharing at least this many students
+        """
+        self.enrollment = enrollment
+        self.course_key = course_key
+        self.min_students = max(1, min_students)
+
+    def detect(self, schedules: List[Schedule]) -> List[Conflict]:
+        """
+        Detect student conflicts
+
+        Returns:
+            Conflicts of type 'student_conflict', grouped by day and by start time;
+            details carry the number of affected students
+        """
+        return list(self.iter_conflicts(schedules))
+
+    def iter_conflicts(self, schedules: List[Schedule]) -> Iterator[Conflict]:
+        enrollment = self.enrollment
+        by_day: Dict[str, List[Tuple[int, int, int]]] = defaultdict(list)
+        course_at = []
+        for position, schedule in enumerate(schedules):
+            key = self.course_key(schedule)
+            course_id = enrollment.find_course_id(key)
+            course_at.append(-1 if course_id is None else course_id)
+            if key in enrollment:
+                by_day[schedule.hari].append((TimeInterval._time_to_minutes(schedule.jam_mulai),
+                                              TimeInterval._time_to_minutes(schedule.jam_selesai), position))
+
+        min_students = self.min_students
+        for day, entries in by_day.items():
+            for a, b in sweep_overlapping_pairs(entries):
+                first, second = course_at[a], course_at[b]
+                if first == second:
+                    continue
+                count = enrollment.pair_count(first, second)
+                if count >= min_students:
+                    yield self._conflict(schedules[a], schedules[b], day, count)
+
+    @staticmethod
+    def _conflict(schedule1: Schedule, schedule2: Schedule, day: str, count: int) -> Conflict:
+        return Conflict(STUDENT_CONFLICT, [schedule1, schedule2], {
+            'day': day,
+            'course1': schedule1.course_name or 'Unknown',
+            'course2': schedule2.course_name or 'Unknown',
+            'schedule1_time': f"{schedule1.jam_mulai} - {schedule1.jam_selesai}",
+            'schedule2_time': f"{schedule2.jam_mulai} - {schedule2.jam_selesai}",
+            'room1': schedule1.ruangan,
+            'room2': schedule2.ruangan,
+            'students_affected': count,
+        }, day=day)
@@ -4,7 +4,11 @@ Integration example: Combining Observer Pattern with Conflict Detection
 
 from datetime import time
 from observer import ScheduleSubject, StudentObserver, LecturerObserver
-from conflict_detector import Schedule, ScheduleConflictDetector, format_conflict_report
+from conflict_detector import (
+    Schedule, ScheduleConflictDetector, ConflictIndex, ConflictResultCache, format_conflict_report
+)
+from conflict_repair import ConflictRepairer, RepairPlan
+from schedule_import import ScheduleImporter, ImportReport, iter_records
 
 
 class ScheduleManager:
@@ -13,10 +17,16 @@ class ScheduleManager:
     """
     
     def __init__(self):
-        self.schedules = []
-        self.detector = ScheduleConflictDetector()
+        self.index = ConflictIndex()
+        self.detector = ScheduleConflictDetector(mode='sweep')
+        self.cache = ConflictResultCache(self.detector)
         self.subject = ScheduleSubject()
     
+    @property
+    def schedules(self):
+        """Current schedules in insertion order"""
+        return self.index.schedules()
+    
     def register_observer(self, observer):
         """Register an observer to be notified of schedule changes"""
         self.subject.attach(observer)
@@ -29,13 +39,20 @@ class ScheduleManager:
             schedule: Schedule object to add
             
         Returns:
-            True if added successfully, False if conflicts found
+            True if added successfully, False if the ID is taken or
+            conflicts were found
         """
-        # Try adding the schedule
-        test_schedules = self.schedules + [schedule]
+        # Adding must never silently replace an existing schedule
+        if schedule.id in self.index:
+            print(f"✗ Schedule ID {schedule.id} already exists!")
+            self.subject.notify('SCHEDULE_ADD_FAILED', {
+                'schedule_id': schedule.id,
+                'reason': 'Schedule ID already exists'
+            })
+            return False
         
-        # Detect conflicts
-        conflicts = self.detector.detect_schedule_conflict(test_schedules)
+        # Check the candidate against the indexed timetable
+        conflicts = self.index.find_conflicts(schedule)
         
         if conflicts:
             # Notify about conflicts detected
@@ -46,7 +63,7 @@ class ScheduleManager:
                 'conflicts': [
                     {
                         'type': c.conflict_type,
-                        'with_schedule': c.affected_schedules[1].id,
+                        'with_schedule': c.affected_schedules[0].id,
                         'details': c.details
                     }
                     for c in conflicts
@@ -55,7 +72,8 @@ class ScheduleManager:
             return False
         
         # Add schedule and notify observers
-        self.schedules.append(schedule)
+        self.index.add(schedule)
+        self.cache.bump()
         print(f"\n✓ Schedule {schedule.id} added successfully!")
         
         self.subject.notify('SCHEDULE_ADDED', {
@@ -80,23 +98,14 @@ class ScheduleManager:
         Returns:
             True if updated successfully, False if conflicts found
         """
-        # Find and remove old schedule
-        old_schedule = None
-        remaining_schedules = []
-        
-        for sch in self.schedules:
-            if sch.id == schedule_id:
-                old_schedule = sch
-            else:
-                remaining_schedules.append(sch)
+        old_schedule = self.index.get(schedule_id)
         
         if old_schedule is None:
             print(f"✗ Schedule {schedule_id} not found!")
             return False
         
-        # Check conflicts with new schedule
-        test_schedules = remaining_schedules + [updated_schedule]
-        conflicts = self.detector.detect_schedule_conflict(test_schedules)
+        # Check conflicts with new schedule, ignoring the version it replaces
+        conflicts = self.index.find_conflicts(updated_schedule, replacing=schedule_id)
         
         if conflicts:
             print(format_conflict_report(conflicts))
@@ -108,7 +117,8 @@ class ScheduleManager:
             return False
         
         # Update schedule
-        self.schedules = test_schedules
+        self.index.update(schedule_id, updated_schedule)
+        self.cache.bump()
         print(f"\n✓ Schedule {schedule_id} updated successfully!")
         
         self.subject.notify('SCHEDULE_CHANGED', {
@@ -127,12 +137,10 @@ class ScheduleManager:
     
     def remove_schedule(self, schedule_id: str) -> bool:
         """Remove a schedule"""
-        old_length = len(self.schedules)
-        self.schedules = [s for s in self.schedules if s.id != schedule_id]
-        
-        if len(self.schedules) == old_length:
+        if self.index.remove(schedule_id) is None:
             print(f"✗ Schedule {schedule_id} not found!")
             return False
+        self.cache.bump()
         
         print(f"\n✓ Schedule {schedule_id} removed successfully!")
         self.subject.notify('SCHEDULE_REMOVED', {
@@ -141,10 +149,66 @@ class ScheduleManager:
         
         return True
     
+    def import_schedules(self, lines, fmt: str = 'csv', on_error: str = 'abort') -> ImportReport:
+        """
+        Bulk import schedules from CSV or JSON Lines text
+        
+        Args:
+            lines: Iterable of text lines, e.g. an open file
+            fmt: 'csv' or 'jsonl'
+            on_error: 'abort' adds nothing if any row is rejected; 'skip'
+                adds the rows that fit
+            
+        Returns:
+            ImportReport with the added schedules and per-row issues
+        """
+        report = ScheduleImporter(self.index, on_error).check(iter_records(lines, fmt))
+        for schedule in report.accepted:
+            self.index.add(schedule)
+        if report.accepted:
+            self.cache.bump()
+            self.subject.notify('SCHEDULES_IMPORTED', {
+                'count': len(report.accepted),
+                'rejected': len(report.issues)
+            })
+        print(f"\n✓ Imported {len(report.accepted)} of {report.rows} rows "
+              f"({len(report.issues)} rejected{', import aborted' if report.aborted else ''})")
+        return report
+    
+    def repair_conflicts(self, apply: bool = True, time_budget: float = 5.0) -> RepairPlan:
+        """
+        Compute moves that remove all current conflicts
+        
+        Args:
+            apply: Apply the moves and notify observers of each change
+            time_budget: Seconds the solver may spend
+            
+        Returns:
+            The RepairPlan that was computed
+        """
+        plan = ConflictRepairer(time_budget=time_budget).repair(self.schedules, self.cache.conflicts(self.schedules))
+        if apply:
+            for move in plan.moves:
+                self.index.update(move.schedule_id, move.replacement)
+                self.subject.notify('SCHEDULE_CHANGED', {
+                    'schedule_id': move.schedule_id,
+                    'course_name': move.replacement.course_name,
+                    'old_day': move.original.hari,
+                    'new_day': move.replacement.hari,
+                    'old_time': f"{move.original.jam_mulai} - {move.original.jam_selesai}",
+                    'new_time': f"{move.replacement.jam_mulai} - {move.replacement.jam_selesai}",
+                    'old_room': move.original.ruangan,
+                    'new_room': move.replacement.ruangan,
+                    'lecturer': move.replacement.dosen
+                })
+            if plan.moves:
+                self.cache.bump()
+        return plan
+    
     def get_schedule_status(self) -> dict:
         """Get current schedule status and conflicts"""
-        conflicts = self.detector.detect_schedule_conflict(self.schedules)
-        summary = self.detector.get_conflict_summary(conflicts)
+        conflicts = self.cache.conflicts(self.schedules)
+        summary = self.cache.summary(self.schedules)
         
         return {
             'total_schedules': len(self.schedules),
@@ -46,6 +46,11 @@ class ScheduleSubject:
             self._observers.remove(observer)
             print(f"✓ Observer {observer.__class__.__name__} detached")
     
+    @property
+    def observers(self) -> List[Observer]:
+        """Snapshot of the attached observers"""
+        return list(self._observers)
+    
     def notify(self, event_type: str, schedule_data: Dict[str, Any]) -> None:
         """
         Notify all attached observers about an event
@@ -0,0 +1,262 @@
+"""
+Recurring Schedules: semester date ranges, biweekly sessions, holidays and one-off moves
+"""
+
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable, FrozenSet
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import date, time, timedelta
+from math import gcd
+
+from conflict_detector import Schedule, Conflict, ScheduleConflictDetector, TimeInterval, sweep_overlapping_pairs
+
+HARI_TO_WEEKDAY = {"Senin": 0, "Selasa": 1, "Rabu": 2, "Kamis": 3, "Jumat": 4, "Sabtu": 5, "Minggu": 6}
+WEEKDAY_TO_HARI = {weekday: hari for hari, weekday in HARI_TO_WEEKDAY.items()}
+
+
+@dataclass
+class RecurringSchedule:
+    """
+    A schedule that repeats every `interval_weeks` weeks on its weekday
+
+    The weekday, time, room and lecturer come from `schedule`. Dates in
+    `exceptions` have no session (holidays, cancellations); `extra_sessions`
+    are one-off dated sessions, e.g. the new slot of a moved class.
+    """
+    schedule: Schedule
+    start_date: date
+    end_date: date
+    interval_weeks: int = 1
+    exceptions: FrozenSet[date] = frozenset()
+    extra_sessions: List[Tuple[date, Schedule]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.schedule.hari not in HARI_TO_WEEKDAY:
+            raise ValueError(f"Unknown day {self.schedule.hari!r}")
+        if self.interval_weeks < 1:
+            raise ValueError("interval_weeks must be at least 1")
+        self.exceptions = frozenset(self.exceptions)
+
+    @property
+    def id(self) -> str:
+        return self.schedule.id
+
+    @property
+    def weekday(self) -> int:
+        return HARI_TO_WEEKDAY[self.schedule.hari]
+
+    @property
+    def first_date(self) -> date:
+        """First date on or after start_date that falls on the weekday"""
+        return self.start_date + timedelta(days=(self.weekday - self.start_date.weekday()) % 7)
+
+    @property
+    def period_days(self) -> int:
+        return 7 * self.interval_weeks
+
+    def occurs_on(self, day: date) -> bool:
+        """True if the regular series has a session on that date"""
+        if not self.start_date <= day <= self.end_date or day in self.exceptions:
+            return False
+        offset = (day - self.first_date).days
+        return offset >= 0 and offset % self.period_days == 0
+
+    def dates(self, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[date]:
+        """Lazily yield the regular session dates, optionally within [start, end]"""
+        first = self.first_date
+        if start is not None and start > first:
+            first += timedelta(days=-(-(start - first).days // self.period_days) * self.period_days)
+        last = self.end_date if end is None else min(self.end_date, end)
+        step = timedelta(days=self.period_days)
+        while first <= last:
+            if first not in self.exceptions:
+                yield first
+            first += step
+
+    def occurrences(self, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[Tuple[date, Schedule]]:
+        """Lazily yield (date, schedule) for every session, one-off sessions included"""
+        for day in self.dates(start, end):
+            yield day, self.schedule
+        for day, session in self.extra_sessions:
+            if (start is None or day >= start) and (end is None or day <= end):
+                yield day, session
+
+    def move(self, from_date: date, to_date: date, jam_mulai: Optional[time] = None,
+             jam_selesai: Optional[time] = None, ruangan: Optional[str] = None):
+        """
+        Move one session: cancel it on from_date and add a one-off on to_date
+
+        Omitted times and room keep the regular values.
+        """
+        if not self.occurs_on(from_date):
+            raise ValueError(f"{self.id} has no session on {from_date}")
+        self.exceptions = self.exceptions | {from_date}
+        self.extra_sessions.append((to_date, replace(
+            self.schedule,
+            hari=WEEKDAY_TO_HARI[to_date.weekday()],
+            jam_mulai=jam_mulai or self.schedule.jam_mulai,
+            jam_selesai=jam_selesai or self.schedule.jam_selesai,
+            ruangan=ruangan or self.schedule.ruangan,
+        )))
+
+
+class RecurringConflict:
+    """
+    A conflict between two recurring schedules, kept in compact form
+
+    The clashing dates are an arithmetic progression from first_date to
+    last_date every period_days days (period_days is 0 for a single date),
+    minus the excluded dates. They are only expanded on request.
+    """
+
+    __slots__ = ('conflict_type', 'affected_schedules', 'first_date', 'last_date', 'period_days', 'excluded')
+
+    def __init__(self, conflict_type: str, affected_schedules: List[Schedule], first_date: date,
+                 last_date: date, period_days: int = 0, excluded: FrozenSet[date] = frozenset()):
+        self.conflict_type = conflict_type
+        self.affected_schedules = affected_schedules
+        self.first_date = first_date
+        self.last_date = last_date
+        self.period_days = period_days
+        self.excluded = excluded
+
+    def dates(self) -> Iterator[date]:
+        """Lazily yield every date on which the two schedules clash"""
+        if not self.period_days:
+            if self.first_date not in self.excluded:
+                yield self.first_date
+            return
+        day, step = self.first_date, timedelta(days=self.period_days)
+        while day <= self.last_date:
+            if day not in self.excluded:
+                yield day
+            day += step
+
+    @property
+    def occurrence_count(self) -> int:
+        """Number of clashing dates, computed without expanding them"""
+        if not self.period_days:
+            return int(self.first_date not in self.excluded)
+        total = (self.last_date - self.first_date).days // self.period_days + 1
+        hits = sum(1 for d in self.excluded
+                   if self.first_date <= d <= self.last_date and (d - self.first_date).days % self.period_days == 0)
+        return total - hits
+
+    def expand(self, limit: Optional[int] = None) -> Iterator[Conflict]:
+        """Lazily yield one dated Conflict per clashing date"""
+        first, second = self.affected_schedules
+        for count, day in enumerate(self.dates()):
+            if limit is not None and count >= limit:
+                return
+            label = f"{first.hari} {day.isoformat()}"
+            if self.conflict_type == 'room_conflict':
+                yield ScheduleConflictDetector._room_conflict(first, second, label)
+            else:
+                yield ScheduleConflictDetector._lecturer_conflict(first, second, label)
+
+    def __repr__(self):
+        return (f"RecurringConflict(type={self.conflict_type}, "
+                f"schedules={[s.id for s in self.affected_schedules]}, "
+                f"dates={self.first_date}..{self.last_date}, occurrences={self.occurrence_count})")
+
+
+class RecurringConflictDetector:
+    """
+    Detect conflicts between recurring schedules on their rule form
+
+    Rules are grouped by (weekday, room) and (weekday, lecturer) and swept
+    by time of day, exactly like weekly schedules. Only the pairs found
+    there have their date ranges intersected; the common dates of two
+    weekly/biweekly series form a single progression, so no occurrence is
+    materialized. One-off sessions are checked against the rules of their
+    weekday and against each other.
+    """
+
+    def detect(self, rules: Iterable[RecurringSchedule]) -> List[RecurringConflict]:
+        """
+        Detect all room and lecturer conflicts
+
+        Args:
+            rules: Recurring schedules
+
+        Returns:
+            Room conflicts first, then lecturer conflicts, rule-vs-rule
+            conflicts before those involving one-off sessions
+        """
+        return list(self.iter_conflicts(rules))
+
+    def iter_conflicts(self, rules: Iterable[RecurringSchedule]) -> Iterator[RecurringConflict]:
+        rules = list(rules)
+        for conflict_type, resource_of in (('room_conflict', lambda s: s.ruangan),
+                                           ('lecturer_conflict', lambda s: s.dosen)):
+            groups: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+            for position, rule in enumerate(rules):
+                groups[(rule.weekday, resource_of(rule.schedule))].append(position)
+
+            for positions in groups.values():
+                if len(positions) < 2:
+                    continue
+                entries = [(*self._minutes(rules[p].schedule), p) for p in positions]
+                for a, b in sweep_overlapping_pairs(entries):
+                    first, second = rules[a], rules[b]
+                    if first.id == second.id:
+                        continue
+                    conflict = self._series_conflict(conflict_type, first, second)
+                    if conflict is not None:
+                        yield conflict
+
+            yield from self._session_conflicts(conflict_type, resource_of, rules, groups)
+
+    @staticmethod
+    def _minutes(schedule: Schedule) -> Tuple[int, int]:
+        return TimeInterval._time_to_minutes(schedule.jam_mulai), TimeInterval._time_to_minutes(schedule.jam_selesai)
+
+    @staticmethod
+    def _series_conflict(conflict_type: str, first: RecurringSchedule,
+                         second: RecurringSchedule) -> Optional[RecurringConflict]:
+        """Intersect two series on the same weekday; None if they never meet"""
+        start_a, start_b = first.first_date, second.first_date
+        last = min(first.end_date, second.end_date)
+        if max(start_a, start_b) > last:
+            return None
+
+        # Weeks since start_a of a common date: x = 0 (mod ia), x = shift (mod ib)
+        ia, ib = first.interval_weeks, second.interval_weeks
+        shift = (start_b - start_a).days // 7
+        for k in range(ib // gcd(ia, ib)):
+            if (k * ia - shift) % ib == 0:
+                break
+        else:
+            return None
+        period = 7 * ia * ib // gcd(ia, ib)
+        common = start_a + timedelta(weeks=k * ia)
+        if common < start_b:
+            common += timedelta(days=-(-(start_b - common).days // period) * period)
+        if common > last:
+            return None
+
+        conflict = RecurringConflict(conflict_type, [first.schedule, second.schedule], common,
+                                     last, period, first.exceptions | second.exceptions)
+        return conflict if conflict.occurrence_count else None
+
+    def _session_conflicts(self, conflict_type: str, resource_of, rules: List[RecurringSchedule],
+                           groups: Dict[Tuple[int, str], List[int]]) -> Iterator[RecurringConflict]:
+        """One-off sessions against the regular series and against each other"""
+        sessions_by_day: Dict[Tuple[date, str], List[Tuple[int, int, str, Schedule]]] = defaultdict(list)
+        for rule in rules:
+            for day, session in rule.extra_sessions:
+                start, end = self._minutes(session)
+                sessions_by_day[(day, resource_of(session))].append((start, end, rule.id, session))
+
+        for (day, resource), sessions in sessions_by_day.items():
+            for start, end, owner, session in sessions:
+                for position in groups.get((day.weekday(), resource), ()):
+                    rule = rules[position]
+                    other_start, other_end = self._minutes(rule.schedule)
+                    if rule.id != owner and other_start < end and start < other_end and rule.occurs_on(day):
+                        yield RecurringConflict(conflict_type, [rule.schedule, session], day, day)
+
+            entries = [(start, end, i) for i, (start, end, _, _) in enumerate(sessions)]
+            for a, b in sweep_overlapping_pairs(entries):
+                if sessions[a][2] != sessions[b][2]:
+                    yield RecurringConflict(conflict_type, [sessions[a][3], sessions[b][3]], day, day)
@@ -0,0 +1,477 @@
+"""
+Pluggable Conflict Rules evaluated in one shared grouping and sweep
+"""
+
+from typing import Any, List, Dict, Tuple, Optional, Iterable, Iterator, Callable, Mapping, Union
+from collections import defaultdict
+import heapq
+import itertools
+
+from conflict_detector import Schedule, Conflict, ConflictCluster, ScheduleConflictDetector, ScheduleTable, TimeInterval
+
+GroupKey = Tuple[str, ...]
+
+
+class ConflictRule:
+    """
+    Base class of a conflict rule
+
+    A rule declares what it needs and the engine does the traversal:
+
+    - group_by None: check_schedule() sees every schedule once
+    - group_by set, window set: check_pair() sees every pair in the same
+      group whose gap is below `window` minutes (the later start minus
+      the earlier interval's end; negative means overlap)
+    - group_by set, window None: check_group() sees each whole group,
+      sorted by start time
+
+    group_by names Schedule attributes, e.g. ('hari', 'ruangan').
+    """
+
+    conflict_type: str = ''
+    group_by: Optional[GroupKey] = None
+    window: Optional[int] = None
+
+    def check_schedule(self, schedule: Schedule) -> Optional[Conflict]:
+        return None
+
+    def check_pair(self, schedule1: Schedule, schedule2: Schedule, gap: int) -> Optional[Conflict]:
+        return None
+
+    def check_group(self, key: tuple, schedules: List[Schedule]) -> Iterable[Conflict]:
+        return ()
+
+
+class RoomOverlapRule(ConflictRule):
+    """Same room, same day, overlapping time"""
+    conflict_type = 'room_conflict'
+    group_by = ('hari', 'ruangan')
+    window = 0
+
+    def check_pair(self, schedule1, schedule2, gap):
+        if schedule1.id != schedule2.id:
+            return ScheduleConflictDetector._room_conflict(schedule1, schedule2, schedule1.hari)
+
+
+class LecturerOverlapRule(ConflictRule):
+    """Same lecturer, same day, overlapping time"""
+    conflict_type = 'lecturer_conflict'
+    group_by = ('hari', 'dosen')
+    window = 0
+
+    def check_pair(self, schedule1, schedule2, gap):
+        if schedule1.id != schedule2.id:
+            return ScheduleConflictDetector._lecturer_conflict(schedule1, schedule2, schedule1.hari)
+
+
+def _building_of(room: str) -> str:
+    """Default building of a room: its name without the room number ('Gedung A 101' -> 'Gedung A')"""
+    return room.rsplit(' ', 1)[0]
+
+
+class LecturerTravelBufferRule(ConflictRule):
+    """Back-to-back classes of one lecturer in different buildings without enough time to walk"""
+    conflict_type = 'lecturer_travel_conflict'
+    group_by = ('hari', 'dosen')
+
+    def __init__(self, buffer_minutes: int = 15, building_of: Callable[[str], str] = _building_of):
+        """
+        Args:
+            buffer_minutes: Minimum break between classes in different buildings
+            building_of: Maps a room name to its building
+        """
+        self.window = buffer_minutes
+        self.building_of = building_of
+
+    def check_pair(self, schedule1, schedule2, gap):
+        if gap < 0 or self.building_of(schedule1.ruangan) == self.building_of(schedule2.ruangan):
+            return None
+        return Conflict(self.conflict_type, [schedule1, schedule2], {
+            'day': schedule1.hari,
+            'lecturer': schedule1.dosen,
+            'room1': schedule1.ruangan,
+            'room2': schedule2.ruangan,
+            'gap_minutes': gap,
+            'required_minutes': self.window,
+            'course1': schedule1.course_name or 'Unknown',
+            'course2': schedule2.course_name or 'Unknown',
+        }, day=schedule1.hari)
+
+
+class RoomCapacityRule(ConflictRule):
+    """More students than the room seats"""
+    conflict_type = 'room_capacity_conflict'
+
+    def __init__(self, capacities: Mapping[str, int], class_sizes: Mapping[str, int]):
+        """
+        Args:
+            capacities: Seats per room
+            class_sizes: Students per course (keyed by course_name, or schedule id)
+        """
+        self.capacities = capacities
+        self.class_sizes = class_sizes
+
+    def check_schedule(self, schedule):
+        capacity = self.capacities.get(schedule.ruangan)
+        size = self.class_sizes.get(schedule.course_name or schedule.id)
+        if capacity is None or size is None or size <= capacity:
+            return None
+        return Conflict(self.conflict_type, [schedule], {
+            'day': schedule.hari,
+            'room': schedule.ruangan,
+            'capacity': capacity,
+            'students': size,
+            'course': schedule.course_name or 'Unknown',
+        }, day=schedule.hari)
+
+
+class MaxTeachingHoursRule(ConflictRule):
+    """A lecturer teaching more than the allowed minutes on one day"""
+    conflict_type = 'teaching_load_conflict'
+    group_by = ('hari', 'dosen')
+
+    def __init__(self, max_minutes: int = 6 * 60):
+        self.max_minutes = max_minutes
+
+    def check_group(self, key, schedules):
+        minutes = sum(TimeInterval._time_to_minutes(s.jam_selesai) - TimeInterval._time_to_minutes(s.jam_mulai)
+                      for s in schedules)
+        if minutes > self.max_minutes:
+            yield Conflict(self.conflict_type, schedules, {
+                'day': key[0],
+                'lecturer': key[1],
+                'teaching_minutes': minutes,
+                'max_minutes': self.max_minutes,
+            }, day=key[0])
+
+
+def sweep_nearby_pairs(entries: List[Tuple[int, int, int]], window: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Sweep-line enumeration of interval pairs less than `window` minutes apart
+    Time Complexity: O(n log n + k) where k is the number of pairs reported
+
+    The gap is the later start minus the end of the interval that started
+    first: negative exactly when they overlap, so window 0 reproduces
+    sweep_overlapping_pairs.
+
+    Yields:
+        (position_a, position_b, gap) with position_a < position_b
+    """
+    active = []  # min-heap of (end, start, position)
+    for start, end, position in sorted(entries):
+        while active and active[0][0] + window <= start:
+            heapq.heappop(active)
+        for other_end, other_start, other_position in active:
+            gap = start - other_end
+            if gap < 0 and other_start >= end:
+                gap = 0  # an empty interval at the other one's start only touches it
+            if gap < window:
+                if other_position < position:
+                    yield other_position, position, gap
+                else:
+                    yield position, other_position, gap
+        heapq.heappush(active, (end, start, position))
+
+
+# ScheduleTable columns (codes, names) that can be grouped on without materializing rows
+_TABLE_COLUMNS = {
+    'hari': ('days', 'day_names'),
+    'ruangan': ('rooms', 'room_names'),
+    'dosen': ('lecturers', 'lecturer_names'),
+    'course_name': ('courses', 'course_names'),
+}
+
+
+class RuleEngine:
+    """
+    Registry of conflict rules evaluated together
+
+    detect() groups the schedules once for every distinct group_by among
+    the registered rules, sorts and sweeps each group once with the widest
+    window any of its rules needs, and dispatches every candidate pair to
+    the rules whose window it falls in. A new rule on an existing grouping
+    adds no traversal of its own.
+    """
+
+    def __init__(self, rules: Optional[Iterable[ConflictRule]] = None):
+        """
+        Args:
+            rules: Rules to register (default: default_rules())
+        """
+        self.rules: List[ConflictRule] = []
+        for rule in (rules if rules is not None else self.default_rules()):
+            self.register(rule)
+
+    @staticmethod
+    def default_rules() -> List[ConflictRule]:
+        """The built-in room and lecturer overlap checks"""
+        return [RoomOverlapRule(), LecturerOverlapRule()]
+
+    def only_default_rules(self) -> bool:
+        """True while exactly the built-in overlap checks are registered"""
+        return sorted(type(rule).__name__ for rule in self.rules) == ['LecturerOverlapRule', 'RoomOverlapRule']
+
+    def register(self, rule: ConflictRule) -> ConflictRule:
+        """Add a rule; returns it so the call can be chained"""
+        if rule.window is not None and rule.group_by is None:
+            raise ValueError(f"{type(rule).__name__} declares a window but no group_by")
+        self.rules.append(rule)
+        return rule
+
+    def plan(self, rules: Optional[Iterable[ConflictRule]] = None) -> Dict[GroupKey, Optional[int]]:
+        """Groupings to build, with the sweep window each needs (None: no sweep)"""
+        plan: Dict[GroupKey, Optional[int]] = {}
+        for rule in (self.rules if rules is None else rules):
+            if rule.group_by is None:
+                continue
+            window = plan.get(rule.group_by)
+            if rule.window is not None:
+                window = rule.window if window is None else max(window, rule.window)
+            plan[rule.group_by] = window
+        return plan
+
+    def detect(self, schedules: Union[List[Schedule], ScheduleTable],
+               conflict_types: Optional[Iterable[str]] = None) -> List[Conflict]:
+        """
+        Evaluate every registered rule
+
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable
+            conflict_types: Only evaluate rules of these types (default: all)
+
+        Returns:
+            Conflicts grouped by rule, in registration order
+        """
+        found: List[List[Conflict]] = [[] for _ in self.rules]
+        for i, conflict in self._iter_found(schedules, conflict_types):
+            found[i].append(conflict)
+        return [conflict for conflicts in found for conflict in conflicts]
+
+    def iter_detect(self, schedules: Union[List[Schedule], ScheduleTable],
+                    conflict_types: Optional[Iterable[str]] = None) -> Iterator[Conflict]:
+        """
+        Yield conflicts as the traversal finds them
+
+        Rules without a group_by come first, then group after group of
+        each grouping; work stops when the consumer stops iterating.
+
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable
+            conflict_types: Only evaluate rules of these types (default: all)
+        """
+        for _, conflict in self._iter_found(schedules, conflict_types):
+            yield conflict
+
+    def _iter_found(self, schedules: Union[List[Schedule], ScheduleTable],
+                    conflict_types: Optional[Iterable[str]]) -> Iterator[Tuple[int, Conflict]]:
+        """Yield (rule index, conflict) pairs in traversal order"""
+        types = None if conflict_types is None else frozenset(conflict_types)
+        rules = [(i, rule) for i, rule in enumerate(self.rules) if types is None or rule.conflict_type in types]
+        if not rules:
+            return
+
+        if isinstance(schedules, ScheduleTable):
+            starts, ends = schedules.starts, schedules.ends
+            schedule_at = schedules.materializer()
+        else:
+            schedules = schedules if isinstance(schedules, list) else list(schedules)
+            starts = [TimeInterval._time_to_minutes(s.jam_mulai) for s in schedules]
+            ends = [TimeInterval._time_to_minutes(s.jam_selesai) for s in schedules]
+            schedule_at = schedules.__getitem__
+
+        schedule_rules = [(i, rule) for i, rule in rules if rule.group_by is None]
+        if schedule_rules:
+            for position in range(len(schedules)):
+                schedule = schedule_at(position)
+                for i, rule in schedule_rules:
+                    conflict = rule.check_schedule(schedule)
+                    if conflict is not None:
+                        yield i, conflict
+
+        plan = self.plan(rule for _, rule in rules)
+        for group_by, window in plan.items():
+            keys, key_values = self._group_keys(schedules, group_by, schedule_at)
+            groups: Dict[tuple, List[Tuple[int, int, int]]] = defaultdict(list)
+            for position, key in enumerate(keys):
+                groups[key].append((starts[position], ends[position], position))
+
+            pair_rules = [(i, rule) for i, rule in rules if rule.group_by == group_by and rule.window is not None]
+            group_rules = [(i, rule) for i, rule in rules if rule.group_by == group_by and rule.window is None]
+            for key, entries in groups.items():
+                if pair_rules and len(entries) > 1:
+                    for a, b, gap in sweep_nearby_pairs(entries, window):
+                        for i, rule in pair_rules:
+                            if gap < rule.window:
+                                conflict = rule.check_pair(schedule_at(a), schedule_at(b), gap)
+                                if conflict is not None:
+                                    yield i, conflict
+                if group_rules:
+                    members = [schedule_at(position) for _, _, position in sorted(entries)]
+                    for i, rule in group_rules:
+                        for conflict in rule.check_group(key_values(key), members):
+                            yield i, conflict
+
+    @staticmethod
+    def _group_keys(schedules: Union[List[Schedule], ScheduleTable], group_by: GroupKey,
+                    schedule_at: Callable[[int], Schedule]) -> Tuple[Iterable[tuple], Callable[[tuple], tuple]]:
+        """
+        Group key of every row, plus a function turning a key into the
+        attribute values rules see
+
+        On a ScheduleTable, groupings over its interned columns use the
+        integer codes and never materialize a Schedule.
+        """
+        if isinstance(schedules, ScheduleTable) and all(attribute in _TABLE_COLUMNS for attribute in group_by):
+            codes = [getattr(schedules, _TABLE_COLUMNS[attribute][0]) for attribute in group_by]
+            names = [getattr(schedules, _TABLE_COLUMNS[attribute][1]) for attribute in group_by]
+            return zip(*codes), lambda key: tuple(column[code] for column, code in zip(names, key))
+        keys = (tuple(getattr(schedule_at(position), attribute) for attribute in group_by)
+                for position in range(len(schedules)))
+        return keys, lambda key: key
+
+
+class RuleBasedDetector(ScheduleConflictDetector):
+    """
+    ScheduleConflictDetector that reports through a RuleEngine
+
+    detect_schedule_conflict(), iter_conflicts(), count_conflicts() and
+    detect_conflict_clusters() follow the rules registered with the
+    engine, so a new rule reaches everything built on the detector
+    (ConflictResultCache, the web API) without further changes. While only
+    the default rules are registered, every call takes the inherited
+    sweep path: streaming with early exit, allocation-free counting.
+    """
+
+    def __init__(self, engine: Optional[RuleEngine] = None, instrument: bool = False):
+        """
+        Args:
+            engine: Rules to evaluate (default: RuleEngine with the default rules)
+            instrument: See ScheduleConflictDetector
+        """
+        super().__init__(mode='sweep', instrument=instrument)
+        self.engine = engine if engine is not None else RuleEngine()
+
+    def detect_schedule_conflict(self, schedules: Union[List[Schedule], ScheduleTable]) -> List[Conflict]:
+        """
+        Detect conflicts of every registered rule
+
+        Returns:
+            Conflicts grouped by rule, in registration order
+        """
+        if self.engine.only_default_rules():
+            return super().detect_schedule_conflict(schedules)
+        conflicts: List[Conflict] = []
+        self._begin_run(schedules)
+        try:
+            conflicts = self.engine.detect(schedules)
+        finally:
+            self._end_run(len(conflicts))
+        return conflicts
+
+    def iter_conflicts(self, schedules: Union[List[Schedule], ScheduleTable], limit: Optional[int] = None,
+                       conflict_types: Optional[Iterable[str]] = None) -> Iterator[Conflict]:
+        """
+        Yield conflicts of every registered rule as they are found
+
+        Rules of a filtered-out type are not evaluated. Conflicts come in
+        traversal order (see RuleEngine.iter_detect), not grouped by rule.
+        """
+        if self.engine.only_default_rules():
+            return super().iter_conflicts(schedules, limit, conflict_types)
+        return self._iter_engine(schedules, limit, conflict_types)
+
+    def _iter_engine(self, schedules: Union[List[Schedule], ScheduleTable], limit: Optional[int],
+                     conflict_types: Optional[Iterable[str]]) -> Iterator[Conflict]:
+        if limit is not None and limit <= 0:
+            return
+        self._begin_run(schedules)
+        found = 0
+        try:
+            for conflict in itertools.islice(self.engine.iter_detect(schedules, conflict_types), limit):
+                found += 1
+                yield conflict
+        finally:
+            self._end_run(found)
+
+    def count_conflicts(self, schedules: Union[List[Schedule], ScheduleTable]) -> Dict[str, Any]:
+        if self.engine.only_default_rules():
+            return super().count_conflicts(schedules)
+        return self.get_conflict_summary(self.detect_schedule_conflict(schedules))
+
+    def detect_conflict_clusters(self, schedules: Union[List[Schedule], ScheduleTable],
+                                 conflict_types: Optional[Iterable[str]] = None) -> List[ConflictCluster]:
+        """
+        Conflict clusters of the registered rules
+
+        The overlap rules keep the O(n log n) cluster sweep, only for the
+        types actually registered. Conflicts of every other rule are merged
+        into one cluster per connected set of schedules, after them.
+        """
+        types = None if conflict_types is None else frozenset(conflict_types)
+        overlap_types = [rule.conflict_type for rule in self.engine.rules
+                         if isinstance(rule, (RoomOverlapRule, LecturerOverlapRule))
+                         and (types is None or rule.conflict_type in types)]
+        other_types = {rule.conflict_type for rule in self.engine.rules
+                       if not isinstance(rule, (RoomOverlapRule, LecturerOverlapRule))
+                       and (types is None or rule.conflict_type in types)}
+
+        clusters = super().detect_conflict_clusters(schedules, overlap_types) if overlap_types else []
+        if other_types:
+            other_rules = RuleEngine([rule for rule in self.engine.rules
+                                      if not isinstance(rule, (RoomOverlapRule, LecturerOverlapRule))])
+            clusters.extend(self._component_clusters(other_rules.iter_detect(schedules, other_types)))
+        return clusters
+
+    @staticmethod
+    def _component_clusters(conflicts: Iterable[Conflict]) -> List[ConflictCluster]:
+        """Merge conflicts of one type that share a schedule, in order of first appearance"""
+        parent: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        found = []
+        for conflict in conflicts:
+            nodes = [(conflict.conflict_type, s.id) for s in conflict.affected_schedules]
+            for node in nodes:
+                parent.setdefault(node, node)
+            root = find(nodes[0])
+            for node in nodes[1:]:
+                other = find(node)
+                if other != root:
+                    parent[other] = root
+            found.append((nodes[0], conflict))
+
+        components: Dict[Tuple[str, str], List[Conflict]] = defaultdict(list)
+        for node, conflict in found:
+            components[find(node)].append(conflict)
+
+        clusters = []
+        for members in components.values():
+            first = members[0]
+            schedules = list({s.id: s for c in members for s in c.affected_schedules}.values())
+            details = first.details
+            intervals = sorted(
+                (TimeInterval._time_to_minutes(s.jam_mulai), TimeInterval._time_to_minutes(s.jam_selesai))
+                for s in schedules
+            )
+            active, peak = [], 0
+            for start, end in intervals:
+                while active and active[0] <= start:
+                    heapq.heappop(active)
+                heapq.heappush(active, end)
+                peak = max(peak, len(active))
+            clusters.append(ConflictCluster(
+                first.conflict_type,
+                first.day,
+                details.get('room') or details.get('lecturer') or '',
+                schedules,
+                min(s.jam_mulai for s in schedules),
+                max(s.jam_selesai for s in schedules),
+                len(members),
+                peak,
+            ))
+        return clusters
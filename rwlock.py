@@ -0,0 +1,72 @@
+"""
+Reader-Writer Lock for the shared timetable state
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or one writer
+
+    Writers are preferred: once a writer is waiting, new readers queue
+    behind it, so a steady stream of reads cannot starve a write. The
+    lock is not reentrant; a thread must not take read() inside write()
+    or the other way round.
+
+    The lock lives in memory, so it only orders threads of one process.
+    Separate processes, such as gunicorn workers, need a shared lock of
+    their own; the web app relies on SQLite transactions for that.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Hold the lock shared for the duration of the block"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively for the duration of the block"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,204 @@
+"""
+Bulk Schedule Import: stream a CSV or JSON Lines timetable, validate and check it in one pass
+"""
+
+from typing import List, Dict, Tuple, Any, Optional, Iterable, Iterator, Union
+from dataclasses import dataclass, field
+from datetime import time
+from time import perf_counter
+import csv
+import json
+
+from conflict_detector import Schedule, ConflictIndex
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_FIELDS = ('id', 'course_name', 'hari', 'jam_mulai', 'jam_selesai', 'ruangan', 'dosen')
+
+
+@dataclass
+class RowIssue:
+    """Why one imported row was not (or would not be) added"""
+    row: int
+    schedule_id: Optional[str]
+    status: str  # 'invalid', 'duplicate' or 'conflict'
+    message: str
+    conflicts: List[Dict[str, str]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'row': self.row,
+            'schedule_id': self.schedule_id,
+            'status': self.status,
+            'message': self.message,
+            'conflicts': self.conflicts,
+        }
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import check"""
+    rows: int = 0
+    accepted: List[Schedule] = field(default_factory=list)
+    issues: List[RowIssue] = field(default_factory=list)
+    aborted: bool = False
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if every row was valid and conflict-free"""
+        return not self.issues
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'accepted': len(self.accepted),
+            'rejected': len(self.issues),
+            'aborted': self.aborted,
+            'elapsed_seconds': round(self.elapsed_seconds, 4),
+            'issues': [issue.as_dict() for issue in self.issues],
+        }
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Union[Dict[str, Any], ValueError]]]:
+    """
+    Lazily parse an upload into (row number, record) pairs
+
+    Rows are numbered from 1 and exclude the CSV header; a row that cannot
+    be parsed yields a ValueError in place of the record instead of
+    stopping the import.
+    """
+    if fmt == 'csv':
+        for row, record in enumerate(csv.DictReader(lines), 1):
+            yield row, record
+    elif fmt == 'jsonl':
+        row = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row, ValueError(f"Invalid JSON: {e.msg}")
+                continue
+            yield row, record if isinstance(record, dict) else ValueError("Each line must be a JSON object")
+    else:
+        raise ValueError(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+
+def _parse_time(value: Any) -> time:
+    if isinstance(value, time):
+        return value
+    hours, minutes = str(value).strip().split(':')[:2]
+    return time(int(hours), int(minutes))
+
+
+def record_to_schedule(record: Dict[str, Any]) -> Schedule:
+    """
+    Validate one record and build its Schedule
+
+    Raises:
+        ValueError: Missing fields, malformed times or an end before the start
+    """
+    missing = [name for name in IMPORT_FIELDS if record.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    try:
+        start, end = _parse_time(record['jam_mulai']), _parse_time(record['jam_selesai'])
+    except (ValueError, TypeError):
+        raise ValueError("Times must be formatted as HH:MM") from None
+    if end < start:
+        raise ValueError("jam_selesai is before jam_mulai")
+    return Schedule(
+        id=str(record['id']).strip(),
+        hari=str(record['hari']).strip(),
+        jam_mulai=start,
+        jam_selesai=end,
+        ruangan=str(record['ruangan']).strip(),
+        dosen=str(record['dosen']).strip(),
+        course_name=str(record['course_name']).strip(),
+    )
+
+
+class ScheduleImporter:
+    """
+    Validate a batch of schedules against a timetable in a single pass
+
+    Each row is parsed, validated and checked for room and lecturer
+    conflicts as it streams in: once against the existing ConflictIndex
+    (O(log n + k), never modified) and once against an index of the batch
+    rows seen so far. Nothing is committed here; the caller adds
+    `report.accepted` to its own storage in one step.
+
+    on_error='abort' accepts nothing if any row has an issue, and reports
+    every issue, including all conflicts inside the batch. on_error='skip'
+    accepts each row that is valid and fits the timetable plus the rows
+    accepted before it.
+    """
+
+    ON_ERROR = ('abort', 'skip')
+
+    def __init__(self, index: ConflictIndex, on_error: str = 'abort', max_reported_conflicts: int = 5):
+        """
+        Args:
+            index: The current timetable
+            on_error: 'abort' or 'skip'
+            max_reported_conflicts: Conflicts listed per rejected row
+        """
+        if on_error not in self.ON_ERROR:
+            raise ValueError("on_error must be 'abort' or 'skip'")
+        self.index = index
+        self.on_error = on_error
+        self.max_reported_conflicts = max_reported_conflicts
+
+    def check(self, records: Iterable[Tuple[int, Union[Dict[str, Any], ValueError]]]) -> ImportReport:
+        """
+        Check parsed records (see iter_records)
+
+        Returns:
+            ImportReport with the rows to commit and the per-row issues
+        """
+        started = perf_counter()
+        report = ImportReport()
+        batch = ConflictIndex()
+        limit = self.max_reported_conflicts
+
+        for row, record in records:
+            report.rows += 1
+            if isinstance(record, ValueError):
+                report.issues.append(RowIssue(row, None, 'invalid', str(record)))
+                continue
+            try:
+                schedule = record_to_schedule(record)
+            except ValueError as e:
+                report.issues.append(RowIssue(row, record.get('id'), 'invalid', str(e)))
+                continue
+
+            if schedule.id in self.index or schedule.id in batch:
+                report.issues.append(RowIssue(row, schedule.id, 'duplicate',
+                                              f"Schedule ID {schedule.id} already exists"))
+                continue
+
+            conflicts = list(self.index.iter_conflicts(schedule, limit=limit))
+            if len(conflicts) < limit:
+                conflicts.extend(batch.iter_conflicts(schedule, limit=limit - len(conflicts)))
+            if conflicts:
+                found = f'{len(conflicts)}+' if len(conflicts) == limit else len(conflicts)
+                report.issues.append(RowIssue(
+                    row, schedule.id, 'conflict', f'{found} conflicts found',
+                    [{'type': c.conflict_type, 'with_schedule': c.affected_schedules[0].id} for c in conflicts]))
+                if self.on_error == 'skip':
+                    continue
+            batch.add(schedule)
+            report.accepted.append(schedule)
+
+        if self.on_error == 'abort' and report.issues:
+            report.accepted = []
+            report.aborted = True
+        report.elapsed_seconds = perf_counter() - started
+        return report
+
+
+def check_import(lines: Iterable[str], fmt: str, index: ConflictIndex, on_error: str = 'abort') -> ImportReport:
+    """Convenience wrapper: parse an upload and check it against index"""
+    return ScheduleImporter(index, on_error).check(iter_records(lines, fmt))
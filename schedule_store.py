@@ -0,0 +1,446 @@
+"""
+SQLite Schedule Store: persistent schedules and conflict log with indexed overlap queries
+"""
+
+from typing import List, Dict, Tuple, Any, Optional, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import time
+import itertools
+import json
+import os
+import sqlite3
+import threading
+
+from conflict_detector import (
+    Schedule, Conflict, ScheduleConflictDetector, ScheduleTable, TimeInterval, CONFLICT_TYPES
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    hari TEXT NOT NULL,
+    start_min INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    ruangan TEXT NOT NULL,
+    dosen TEXT NOT NULL,
+    course_name TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_schedules_id ON schedules (id);
+CREATE INDEX IF NOT EXISTS idx_schedules_room ON schedules (hari, ruangan, start_min, end_min);
+CREATE INDEX IF NOT EXISTS idx_schedules_lecturer ON schedules (hari, dosen, start_min, end_min);
+CREATE INDEX IF NOT EXISTS idx_schedules_time ON schedules (start_min, end_min);
+CREATE INDEX IF NOT EXISTS idx_schedules_ruangan ON schedules (ruangan);
+CREATE INDEX IF NOT EXISTS idx_schedules_dosen ON schedules (dosen);
+CREATE INDEX IF NOT EXISTS idx_schedules_course ON schedules (course_name);
+
+-- A single row every write updates in its own transaction, so all
+-- connections and processes sharing the file agree on the version and on
+-- the longest stored duration
+CREATE TABLE IF NOT EXISTS store_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    instance TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    max_duration INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS conflict_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    schedule_id TEXT,
+    status TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+"""
+
+_COLUMNS = "id, hari, start_min, end_min, ruangan, dosen, course_name"
+
+# Overlap candidates of one (day, resource): the start bound below `end`
+# and above `start - max duration` keeps the index scan to a narrow range.
+# The bound is read in the same statement, so it always covers the rows seen.
+_OVERLAP_QUERY = (
+    f"SELECT {_COLUMNS} FROM schedules "
+    "WHERE hari = ? AND {column} = ? AND start_min < ? "
+    "AND start_min > ? - (SELECT max_duration FROM store_meta WHERE id = 1) - 1 AND end_min > ? "
+    "ORDER BY start_min, end_min, id"
+)
+
+_VERSION_QUERY = "SELECT version FROM store_meta WHERE id = 1"
+
+
+def _row_to_schedule(row: Tuple) -> Schedule:
+    schedule_id, hari, start, end, ruangan, dosen, course_name = row
+    return Schedule(
+        id=schedule_id,
+        hari=hari,
+        jam_mulai=time(start // 60, start % 60),
+        jam_selesai=time(end // 60, end % 60),
+        ruangan=ruangan,
+        dosen=dosen,
+        course_name=course_name,
+    )
+
+
+def _schedule_to_row(schedule: Schedule) -> Tuple:
+    return (schedule.id, schedule.hari,
+            TimeInterval._time_to_minutes(schedule.jam_mulai), TimeInterval._time_to_minutes(schedule.jam_selesai),
+            schedule.ruangan, schedule.dosen, schedule.course_name)
+
+
+class ScheduleStore:
+    """
+    Schedules and the conflict log kept in SQLite
+
+    File databases run in WAL mode, so readers never block on a writer and
+    a commit is a sequential append to the log. Schedules are indexed on id,
+    (hari, ruangan, start), (hari, dosen, start) and (start, end); checking a
+    candidate is one bounded range scan per resource instead of a pass over
+    the timetable. Rows keep their insertion order across updates.
+
+    Safe to share between threads and processes: every write runs in a
+    BEGIN IMMEDIATE transaction on one connection, serialized by a lock
+    within the process and by SQLite's write lock across processes, while
+    reads on a file database borrow a connection from a pool and run in
+    parallel with each other and with the writer. add_checked() runs the
+    conflict check and the insert in one such transaction, so no other
+    thread or process can book the slot in between. The version lives in
+    the database, so a write by any process moves it.
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        """
+        Args:
+            path: SQLite database file (default: a private in-memory database)
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # A private in-memory database exists only on this connection
+        self._shared_reads = path in ('', ':memory:')
+        self._idle_readers: List[sqlite3.Connection] = []
+        # Thread running the open write transaction, whose reads must see its writes
+        self._writer: Optional[int] = None
+        with self._lock:
+            self.journal_mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            # The instance token keeps versions of different databases from
+            # colliding; max_duration is an upper bound on any stored
+            # duration, never lowered on delete, which only widens the scan
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO store_meta (id, instance, version, max_duration) "
+                    "SELECT 1, ?, 0, MAX(COALESCE(MAX(end_min - start_min), 0), 0) FROM schedules",
+                    (os.urandom(4).hex(),))
+            self.instance = self._conn.execute("SELECT instance FROM store_meta WHERE id = 1").fetchone()[0]
+        self._table: Optional[ScheduleTable] = None
+        self._table_version = -1
+
+    def close(self):
+        with self._lock:
+            while self._idle_readers:
+                self._idle_readers.pop().close()
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the block in one BEGIN IMMEDIATE transaction
+
+        SQLite's write lock is taken up front, so no other connection or
+        process can write until the block ends: whatever is read inside it
+        still holds for the writes that follow. Reads of this thread see
+        the uncommitted writes; nested blocks join the outer transaction.
+        """
+        with self._lock:
+            if self._writer is not None:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._writer = threading.get_ident()
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                self._writer = None
+
+    def _record_write(self, schedules: Iterable[Schedule] = ()):
+        """Move the version and raise the duration bound, inside the write's transaction"""
+        longest = max((TimeInterval._time_to_minutes(s.jam_selesai) - TimeInterval._time_to_minutes(s.jam_mulai)
+                       for s in schedules), default=0)
+        self._conn.execute("UPDATE store_meta SET version = version + 1, max_duration = MAX(max_duration, ?) "
+                           "WHERE id = 1", (longest,))
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """A connection for one read; pooled per concurrent reader on file databases"""
+        if self._shared_reads or self._writer == threading.get_ident():
+            with self._lock:
+                yield self._conn
+            return
+        try:
+            conn = self._idle_readers.pop()
+        except IndexError:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            yield conn
+        finally:
+            self._idle_readers.append(conn)
+
+    def add(self, schedule: Schedule):
+        """
+        Insert a schedule
+
+        Raises:
+            ValueError: If a schedule with the same id is already stored
+        """
+        with self.transaction():
+            try:
+                self._conn.execute(f"INSERT INTO schedules ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   _schedule_to_row(schedule))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Schedule ID {schedule.id} already exists") from None
+            self._record_write((schedule,))
+
+    def add_checked(self, schedule: Schedule, limit: Optional[int] = None) -> List[Conflict]:
+        """
+        Insert a schedule only if it has no conflicts, as one atomic step
+
+        Check and insert share one BEGIN IMMEDIATE transaction: no other
+        write can land in between, so two threads or two processes on the
+        same database can never book the same slot.
+
+        Returns:
+            The conflicts found (at most `limit`); empty if it was inserted
+
+        Raises:
+            ValueError: If a schedule with the same id is already stored
+        """
+        with self.transaction():
+            conflicts = list(self.iter_conflicts(schedule, limit=limit))
+            if not conflicts:
+                self.add(schedule)
+            return conflicts
+
+    def add_many(self, schedules: Iterable[Schedule]) -> int:
+        """
+        Insert several schedules in one transaction
+
+        Returns:
+            Number of rows inserted
+
+        Raises:
+            ValueError: If any id is already stored; nothing is inserted then
+        """
+        schedules = list(schedules)
+        with self.transaction():
+            try:
+                self._conn.executemany(f"INSERT INTO schedules ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                       map(_schedule_to_row, schedules))
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Duplicate schedule ID: {e}") from None
+            self._record_write(schedules)
+        return len(schedules)
+
+    def update(self, schedule_id: str, schedule: Schedule) -> Optional[Schedule]:
+        """
+        Replace a stored schedule in place, keeping its position
+
+        Returns:
+            The previous schedule, or None if the id was not stored
+        """
+        with self.transaction():
+            previous = self.get(schedule_id)
+            if previous is None:
+                return None
+            self._conn.execute(
+                "UPDATE schedules SET id = ?, hari = ?, start_min = ?, end_min = ?, ruangan = ?, dosen = ?, "
+                "course_name = ? WHERE id = ?", (*_schedule_to_row(schedule), schedule_id))
+            self._record_write((schedule,))
+            return previous
+
+    def remove(self, schedule_id: str) -> Optional[Schedule]:
+        """
+        Delete a schedule by id (one indexed delete)
+
+        Returns:
+            The removed schedule, or None if the id was not stored
+        """
+        with self.transaction():
+            previous = self.get(schedule_id)
+            if previous is not None:
+                self._conn.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+                self._record_write()
+            return previous
+
+    def get(self, schedule_id: str) -> Optional[Schedule]:
+        """Return the stored schedule with the given id, if any"""
+        with self._reading() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM schedules WHERE id = ?", (schedule_id,)).fetchone()
+        return None if row is None else _row_to_schedule(row)
+
+    def schedules(self) -> List[Schedule]:
+        """All stored schedules in insertion order"""
+        with self._reading() as conn:
+            rows = conn.execute(f"SELECT {_COLUMNS} FROM schedules ORDER BY seq").fetchall()
+        return [_row_to_schedule(row) for row in rows]
+
+    def table(self) -> ScheduleTable:
+        """
+        All stored schedules as a ScheduleTable, for the detectors
+
+        Built straight from the integer columns without creating Schedule
+        objects, and reused until the next write by any process.
+        """
+        with self._lock:
+            # Version and rows from one snapshot
+            own_transaction = not self._conn.in_transaction
+            if own_transaction:
+                self._conn.execute("BEGIN")
+            try:
+                version = self._conn.execute(_VERSION_QUERY).fetchone()[0]
+                if self._table_version != version:
+                    table = ScheduleTable()
+                    for row in self._conn.execute(f"SELECT {_COLUMNS} FROM schedules ORDER BY seq"):
+                        table.append_row(*row)
+                    self._table, self._table_version = table, version
+            finally:
+                if own_transaction:
+                    self._conn.commit()
+            return self._table
+
+    @property
+    def version(self) -> int:
+        """Schedule-set version; every write, by any connection or process, moves it"""
+        with self._reading() as conn:
+            return conn.execute(_VERSION_QUERY).fetchone()[0]
+
+    @property
+    def etag(self) -> str:
+        """Entity tag of the current schedule set; changes on every write"""
+        return f"{self.instance}-{self.version}"
+
+    def page(self, hari: Optional[str] = None, ruangan: Optional[str] = None, dosen: Optional[str] = None,
+             course_name: Optional[str] = None, start: Optional[time] = None, end: Optional[time] = None,
+             after: int = 0, limit: int = 100) -> Tuple[List[Schedule], Optional[int]]:
+        """
+        One page of schedules in insertion order (keyset pagination)
+
+        Every filter is optional and served by an index: day, room, lecturer
+        and course by equality, and start/end as a time window the schedule
+        must overlap.
+
+        Args:
+            after: Cursor returned with the previous page (0 for the first)
+            limit: Page size
+
+        Returns:
+            (schedules, cursor of the next page or None on the last page)
+        """
+        clauses, params = ["seq > ?"], [after]
+        for column, value in (('hari', hari), ('ruangan', ruangan), ('dosen', dosen), ('course_name', course_name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if end is not None:
+            clauses.append("start_min < ?")
+            params.append(TimeInterval._time_to_minutes(end))
+        if start is not None:
+            clauses.append("end_min > ?")
+            params.append(TimeInterval._time_to_minutes(start))
+        query = (f"SELECT seq, {_COLUMNS} FROM schedules WHERE {' AND '.join(clauses)} "
+                 "ORDER BY seq LIMIT ?")
+        with self._reading() as conn:
+            rows = conn.execute(query, (*params, limit + 1)).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [_row_to_schedule(row[1:]) for row in rows[:limit]], next_cursor
+
+    def find_overlapping(self, hari: str, start: time, end: time, ruangan: Optional[str] = None,
+                         dosen: Optional[str] = None) -> List[Schedule]:
+        """
+        Stored schedules overlapping [start, end) in a room or for a lecturer
+
+        Exactly one of ruangan and dosen must be given.
+        """
+        if (ruangan is None) == (dosen is None):
+            raise ValueError("Give exactly one of ruangan and dosen")
+        column, value = ('ruangan', ruangan) if ruangan is not None else ('dosen', dosen)
+        return self._overlapping(column, hari, value, TimeInterval._time_to_minutes(start),
+                                 TimeInterval._time_to_minutes(end))
+
+    def _overlapping(self, column: str, hari: str, value: str, start: int, end: int) -> List[Schedule]:
+        with self._reading() as conn:
+            rows = conn.execute(_OVERLAP_QUERY.format(column=column), (hari, value, end, start, start)).fetchall()
+        return [_row_to_schedule(row) for row in rows]
+
+    def iter_conflicts(self, candidate: Schedule, replacing: Optional[str] = None, limit: Optional[int] = None,
+                       conflict_types: Optional[Iterable[str]] = None) -> Iterator[Conflict]:
+        """
+        Yield conflicts between a candidate and the stored timetable
+
+        Same contract as ConflictIndex.iter_conflicts: room conflicts first,
+        ordered as [stored schedule, candidate].
+        """
+        if limit is not None and limit <= 0:
+            return
+        types = CONFLICT_TYPES if conflict_types is None else frozenset(conflict_types)
+        yield from itertools.islice(self._iter_candidate_conflicts(candidate, replacing, types), limit)
+
+    def _iter_candidate_conflicts(self, candidate: Schedule, replacing: Optional[str],
+                                  conflict_types: Iterable[str]) -> Iterator[Conflict]:
+        start = TimeInterval._time_to_minutes(candidate.jam_mulai)
+        end = TimeInterval._time_to_minutes(candidate.jam_selesai)
+        ignored = {candidate.id, replacing}
+        if 'room_conflict' in conflict_types:
+            for other in self._overlapping('ruangan', candidate.hari, candidate.ruangan, start, end):
+                if other.id not in ignored:
+                    yield ScheduleConflictDetector._room_conflict(other, candidate, candidate.hari)
+        if 'lecturer_conflict' in conflict_types:
+            for other in self._overlapping('dosen', candidate.hari, candidate.dosen, start, end):
+                if other.id not in ignored:
+                    yield ScheduleConflictDetector._lecturer_conflict(other, candidate, candidate.hari)
+
+    def find_conflicts(self, candidate: Schedule, replacing: Optional[str] = None) -> List[Conflict]:
+        return list(self.iter_conflicts(candidate, replacing=replacing))
+
+    def has_conflicts(self, candidate: Schedule, replacing: Optional[str] = None) -> bool:
+        return next(self.iter_conflicts(candidate, replacing=replacing, limit=1), None) is not None
+
+    def log(self, entry: Dict[str, Any]):
+        """Append a conflict log entry (a JSON-serializable dict with timestamp and status)"""
+        with self.transaction():
+            self._conn.execute(
+                "INSERT INTO conflict_log (timestamp, schedule_id, status, entry) VALUES (?, ?, ?, ?)",
+                (entry['timestamp'], entry.get('schedule_id'), entry['status'], json.dumps(entry, default=str)))
+
+    def logs(self) -> List[Dict[str, Any]]:
+        """All conflict log entries, oldest first"""
+        with self._reading() as conn:
+            rows = conn.execute("SELECT entry FROM conflict_log ORDER BY seq").fetchall()
+        return [json.loads(entry) for entry, in rows]
+
+    def clear_logs(self):
+        with self.transaction():
+            self._conn.execute("DELETE FROM conflict_log")
+
+    def query_plan(self, column: str = 'ruangan') -> str:
+        """SQLite's plan for the overlap query on ruangan or dosen (for diagnostics)"""
+        with self._reading() as conn:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + _OVERLAP_QUERY.format(column=column),
+                                      ('', '', 0, 0, 0)).fetchall()
+        return '\n'.join(row[-1] for row in rows)
+
+    def __contains__(self, schedule_id: str) -> bool:
+        with self._reading() as conn:
+            return conn.execute("SELECT 1 FROM schedules WHERE id = ?", (schedule_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[Schedule]:
+        return iter(self.schedules())
+
+    def __len__(self):
+        with self._reading() as conn:
+            return conn.execute("SELECT COUNT(*) FROM schedules").fetchone()[0]
@@ -97,19 +97,11 @@ async function addSchedule(event) {
 }
 
 // Load schedules
-async function loadSchedules() {
-    try {
-        const response = await fetch('/api/schedules');
-        const schedules = await response.json();
-        
-        const tbody = document.getElementById('schedulesBody');
-        
-        if (schedules.length === 0) {
-            tbody.innerHTML = '<tr><td colspan="7" class="text-center">No schedules yet</td></tr>';
-            return;
-        }
-        
-        tbody.innerHTML = schedules.map(schedule => `
+// Cursor of the next page of schedules (null when everything is shown)
+let schedulesCursor = null;
+
+function renderScheduleRow(schedule) {
+    return `
             <tr>
                 <td><strong>${schedule.id}</strong></td>
                 <td>${schedule.course_name}</td>
@@ -121,7 +113,42 @@ async function loadSchedules() {
                     <button class="btn btn-danger" onclick="deleteSchedule('${schedule.id}')">Delete</button>
                 </td>
             </tr>
-        `).join('');
+        `;
+}
+
+async function loadSchedules(append = false) {
+    try {
+        const cursor = append && schedulesCursor ? `&cursor=${schedulesCursor}` : '';
+        // The browser revalidates with If-None-Match; unchanged pages come back as 304
+        const response = await fetch(`/api/schedules?limit=100${cursor}`);
+        const data = await response.json();
+        const schedules = data.schedules;
+        
+        const tbody = document.getElementById('schedulesBody');
+        document.getElementById('loadMoreSchedules')?.remove();
+        
+        if (!append && schedules.length === 0) {
+            tbody.innerHTML = '<tr><td colspan="7" class="text-center">No schedules yet</td></tr>';
+            return;
+        }
+        
+        const rows = schedules.map(renderScheduleRow).join('');
+        if (append) {
+            tbody.insertAdjacentHTML('beforeend', rows);
+        } else {
+            tbody.innerHTML = rows;
+        }
+        
+        schedulesCursor = data.next_cursor;
+        if (schedulesCursor) {
+            tbody.insertAdjacentHTML('beforeend', `
+            <tr id="loadMoreSchedules">
+                <td colspan="7" class="text-center">
+                    <button class="btn" onclick="loadSchedules(true)">Load more</button>
+                </td>
+            </tr>
+        `);
+        }
     } catch (error) {
         console.error('Error loading schedules:', error);
     }
@@ -151,22 +178,32 @@ async function deleteSchedule(scheduleId) {
 }
 
 // Refresh conflicts
-async function refreshConflicts() {
+// Conflicts listed so far and the offset of the next page (null when all are shown)
+let loadedConflicts = [];
+let conflictsOffset = null;
+
+async function refreshConflicts(append = false) {
     try {
-        const response = await fetch('/api/conflicts');
+        const offset = append && conflictsOffset ? `&offset=${conflictsOffset}` : '';
+        const response = await fetch(`/api/conflicts?limit=100${offset}`);
         const data = await response.json();
         
         const container = document.getElementById('conflictsContainer');
         
         if (data.total_conflicts === 0) {
+            loadedConflicts = [];
+            conflictsOffset = null;
             container.innerHTML = '<div class="message-box">✓ No conflicts detected!</div>';
             return;
         }
         
+        loadedConflicts = append ? loadedConflicts.concat(data.conflicts) : data.conflicts;
+        conflictsOffset = data.next_offset;
+        
         let html = '<div class="conflict-list">';
         
         // Room conflicts
-        data.conflicts
+        loadedConflicts
             .filter(c => c.type === 'room_conflict')
             .forEach((conflict, index) => {
                 let suggestionsHtml = conflict.suggestions 
@@ -194,7 +231,7 @@ async function refreshConflicts() {
             });
         
         // Lecturer conflicts
-        data.conflicts
+        loadedConflicts
             .filter(c => c.type === 'lecturer_conflict')
             .forEach((conflict, index) => {
                 let suggestionsHtml = conflict.suggestions 
@@ -222,6 +259,13 @@ async function refreshConflicts() {
             });
         
         html += '</div>';
+        if (conflictsOffset) {
+            html += `
+                <div class="text-center">
+                    <button class="btn" onclick="refreshConflicts(true)">Load more</button>
+                </div>
+            `;
+        }
         container.innerHTML = html;
     } catch (error) {
         console.error('Error loading conflicts:', error);
@@ -2,8 +2,33 @@
 Test cases and examples for Schedule Conflict Detection
 """
 
-from datetime import time
-from conflict_detector import Schedule, ScheduleConflictDetector, format_conflict_report
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from datetime import time, date, timedelta
+from dataclasses import replace
+from conflict_detector import (
+    Schedule, ScheduleConflictDetector, IntervalTree, TimeInterval, ConflictIndex,
+    ScheduleTable, ConflictResultCache, ConflictReportWriter, format_conflict_report, format_cluster_report
+)
+from vectorized_detector import VectorizedConflictDetector
+from benchmark_detector import run_benchmarks, compare_to_baseline, main as benchmark_main
+from availability import OccupancyIndex
+from conflict_repair import ConflictRepairer
+from recurrence import RecurringSchedule, RecurringConflictDetector
+from enrollment import EnrollmentIndex, StudentConflictDetector
+from rules import (
+    RuleEngine, RoomOverlapRule, LecturerOverlapRule, LecturerTravelBufferRule, RoomCapacityRule,
+    MaxTeachingHoursRule, RuleBasedDetector
+)
+from schedule_store import ScheduleStore
+from schedule_import import ScheduleImporter, iter_records, check_import, IMPORT_FIELDS
+from rwlock import ReadWriteLock
 
 
 def test_room_conflict():
@@ -285,6 +310,1589 @@ def test_large_schedule():
     print(f"✓ Test 7 passed! Processed {len(schedules)} schedules")
 
 
+def test_interval_tree_operations():
+    """Test case 8: Balanced interval tree insert, delete and queries"""
+    print("\n" + "="*80)
+    print("TEST 8: INTERVAL TREE OPERATIONS")
+    print("="*80)
+    
+    tree = IntervalTree()
+    entries = []
+    
+    # 200 one-hour blocks spread over the day
+    for i in range(200):
+        start = 7 * 60 + (i * 7) % 600
+        schedule = Schedule(
+            id=f"SCH{i:03d}",
+            hari="Senin",
+            jam_mulai=time(start // 60, start % 60),
+            jam_selesai=time((start + 60) // 60, (start + 60) % 60),
+            ruangan="Lab 301",
+            dosen="Dr. Ahmad",
+        )
+        interval = TimeInterval(schedule.jam_mulai, schedule.jam_selesai)
+        tree.insert(interval, schedule)
+        entries.append((interval, schedule))
+    
+    assert len(tree) == 200
+    
+    # Remove every third entry
+    for interval, schedule in entries[::3]:
+        assert tree.delete(interval, schedule)
+    remaining = [entry for idx, entry in enumerate(entries) if idx % 3]
+    assert len(tree) == len(remaining)
+    assert not tree.delete(*entries[0]), "Deleting twice should report False"
+    
+    # Tree stays balanced
+    assert tree._root.height <= 2 * len(tree).bit_length()
+    
+    # Overlap and stab queries match a brute-force scan
+    query = TimeInterval(time(10, 0), time(11, 30))
+    expected = sorted(s.id for iv, s in remaining if query.overlaps_with(iv))
+    assert sorted(s.id for s in tree.find_overlapping(query)) == expected
+    
+    expected_stab = sorted(s.id for iv, s in remaining if iv.start <= 12 * 60 < iv.end)
+    assert sorted(s.id for s in tree.stab(time(12, 0))) == expected_stab
+    
+    # Iteration is ordered by start time
+    starts = [interval.start for interval, _ in tree]
+    assert starts == sorted(starts)
+    
+    print(f"✓ Test 8 passed! {len(tree)} intervals, height {tree._root.height}")
+
+
+def _random_schedules(count, seed=0, rooms=12, lecturers=15):
+    """Generate a reproducible timetable with plenty of overlaps"""
+    rng = random.Random(seed)
+    days = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat"]
+    schedules = []
+    for i in range(count):
+        start = rng.randrange(7 * 60, 17 * 60, 15)
+        end = start + rng.choice([0, 50, 100, 150])
+        schedules.append(Schedule(
+            id=f"SCH{i:05d}",
+            hari=rng.choice(days),
+            jam_mulai=time(start // 60, start % 60),
+            jam_selesai=time(end // 60, end % 60),
+            ruangan=f"Lab {rng.randrange(rooms)}",
+            dosen=f"Dosen {rng.randrange(lecturers)}",
+            course_name=f"Course {i}"
+        ))
+    return schedules
+
+
+def _conflict_keys(conflicts):
+    """Order-independent identity of a conflict list"""
+    return sorted(
+        (c.conflict_type, c.affected_schedules[0].id, c.affected_schedules[1].id)
+        for c in conflicts
+    )
+
+
+def test_sweep_mode_matches_interval_tree():
+    """Test case 9: Sweep-line mode finds exactly the same conflicts"""
+    print("\n" + "="*80)
+    print("TEST 9: SWEEP MODE EQUIVALENCE")
+    print("="*80)
+    
+    schedules = _random_schedules(600, seed=9)
+    expected = ScheduleConflictDetector().detect_schedule_conflict(schedules)
+    actual = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(schedules)
+    
+    assert expected, "Fixture should contain conflicts"
+    assert _conflict_keys(actual) == _conflict_keys(expected)
+    
+    # The default mode keeps the order of the original list scan: day by
+    # day, each schedule against the later ones in input order
+    by_day = {}
+    for schedule in schedules:
+        by_day.setdefault(schedule.hari, []).append(schedule)
+    scan_order = []
+    for day, day_schedules in by_day.items():
+        for i, first in enumerate(day_schedules):
+            interval = TimeInterval(first.jam_mulai, first.jam_selesai)
+            for second in day_schedules[i + 1:]:
+                if interval.overlaps_with(TimeInterval(second.jam_mulai, second.jam_selesai)):
+                    if first.ruangan == second.ruangan:
+                        scan_order.append(('room_conflict', first.id, second.id))
+                    if first.dosen == second.dosen:
+                        scan_order.append(('lecturer_conflict', first.id, second.id))
+    assert [(c.conflict_type, c.affected_schedules[0].id, c.affected_schedules[1].id) for c in expected] == scan_order
+    
+    try:
+        ScheduleConflictDetector(mode='unknown')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Unknown mode should be rejected")
+    
+    print(f"✓ Test 9 passed! {len(actual)} conflicts in both modes")
+
+
+def test_conflict_index_incremental():
+    """Test case 10: Incremental index agrees with full re-detection"""
+    print("\n" + "="*80)
+    print("TEST 10: INCREMENTAL CONFLICT INDEX")
+    print("="*80)
+    
+    detector = ScheduleConflictDetector(mode='sweep')
+    pool = _random_schedules(400, seed=10)
+    index = ConflictIndex(pool[:300])
+    
+    # Candidate checks match detecting over schedules + [candidate]
+    for candidate in pool[300:340]:
+        expected = [
+            c for c in detector.detect_schedule_conflict(index.schedules() + [candidate])
+            if candidate in c.affected_schedules
+        ]
+        actual = index.find_conflicts(candidate)
+        assert _conflict_keys(actual) == _conflict_keys(expected)
+    
+    # Remove, update and re-check
+    removed = index.remove(pool[0].id)
+    assert removed is pool[0] and pool[0].id not in index
+    assert index.remove(pool[0].id) is None
+    
+    moved = Schedule(
+        id=pool[1].id, hari="Sabtu", jam_mulai=time(7, 0), jam_selesai=time(8, 0),
+        ruangan="Aula", dosen="Dosen Baru", course_name="Moved"
+    )
+    assert index.update(pool[1].id, moved) is pool[1]
+    assert index.get(pool[1].id) is moved and len(index) == 299
+    
+    clash = Schedule(
+        id="NEW", hari="Sabtu", jam_mulai=time(7, 30), jam_selesai=time(9, 0),
+        ruangan="Aula", dosen="Dosen Lain"
+    )
+    conflicts = index.find_conflicts(clash)
+    assert [(c.conflict_type, c.affected_schedules[0].id) for c in conflicts] == [('room_conflict', moved.id)]
+    assert index.find_conflicts(clash, replacing=moved.id) == []
+    
+    print(f"✓ Test 10 passed! {len(index)} schedules indexed")
+
+
+def test_vectorized_backend_matches():
+    """Test case 11: NumPy backend returns the same conflicts"""
+    print("\n" + "="*80)
+    print("TEST 11: VECTORIZED BACKEND EQUIVALENCE")
+    print("="*80)
+    
+    try:
+        vectorized = VectorizedConflictDetector()
+    except ImportError:
+        print("⚠ numpy not installed - Test 11 skipped")
+        return
+    
+    schedules = _random_schedules(1500, seed=11)
+    expected = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(schedules)
+    actual = vectorized.detect_schedule_conflict(schedules)
+    
+    assert _conflict_keys(actual) == _conflict_keys(expected)
+    by_id = {s.id: s for s in schedules}
+    assert all(by_id[s.id] is s for c in actual for s in c.affected_schedules)
+    assert vectorized.detect_schedule_conflict(schedules[:1]) == []
+    
+    # A known mode for everything inherited; the backend marks the subclass
+    assert vectorized.mode in ScheduleConflictDetector.MODES
+    assert (vectorized.backend, ScheduleConflictDetector.backend) == ('numpy', 'python')
+    assert vectorized.count_conflicts(schedules)['total_conflicts'] == len(expected)
+    
+    # Instrumented runs report fresh stats instead of the previous run's
+    instrumented = VectorizedConflictDetector(instrument=True)
+    assert _conflict_keys(instrumented.detect_schedule_conflict(ScheduleTable(schedules))) == _conflict_keys(expected)
+    stats = instrumented.stats
+    assert (stats.schedules, stats.conflicts) == (len(schedules), len(expected))
+    assert stats.candidate_pairs >= stats.conflicts and stats.groups > 0
+    assert set(stats.phase_seconds) == {'grouping', 'overlap_query', 'conflict_construction'}
+    instrumented.detect_schedule_conflict(schedules[:1])
+    assert (instrumented.stats.schedules, instrumented.stats.conflicts) == (1, 0)
+    
+    print(f"✓ Test 11 passed! {len(actual)} conflicts")
+
+
+def test_parallel_mode_deterministic():
+    """Test case 12: Process-pool mode merges shards deterministically"""
+    print("\n" + "="*80)
+    print("TEST 12: PARALLEL MODE")
+    print("="*80)
+    
+    schedules = _random_schedules(800, seed=12)
+    sweep = ScheduleConflictDetector(mode='sweep')
+    expected = sweep.detect_schedule_conflict(schedules)
+    
+    with ScheduleConflictDetector(mode='parallel', max_workers=2, instrument=True) as parallel:
+        first_run = parallel.detect_schedule_conflict(schedules)
+        pool = parallel._pool
+        second_run = parallel.detect_schedule_conflict(schedules)
+        table_run = parallel.detect_schedule_conflict(ScheduleTable(schedules))
+        
+        # Same conflicts, in exactly the sequential sweep order, on every run
+        ordered = lambda conflicts: [
+            (c.conflict_type, c.affected_schedules[0].id, c.affected_schedules[1].id, c.day) for c in conflicts
+        ]
+        assert ordered(first_run) == ordered(expected)
+        assert ordered(second_run) == ordered(first_run)
+        assert ordered(table_run) == ordered(expected)
+        assert any(first_run[0].affected_schedules[0] is schedule for schedule in schedules)
+        
+        # One long-lived pool; counting ships counts, not pairs
+        assert pool is not None and parallel._pool is pool
+        assert parallel.stats.conflicts == len(expected) and parallel.stats.candidate_pairs >= len(expected)
+        counted = parallel.count_conflicts(schedules)
+        summary = sweep.count_conflicts(schedules)
+        assert counted['total_conflicts'] == summary['total_conflicts'] == len(expected)
+        assert sorted(counted['affected_rooms']) == sorted(summary['affected_rooms'])
+        assert sorted(counted['affected_lecturers']) == sorted(summary['affected_lecturers'])
+    assert parallel._pool is None
+    
+    # A single worker is just the sweep, without a pool
+    single = ScheduleConflictDetector(mode='parallel', max_workers=1)
+    assert ordered(single.detect_schedule_conflict(schedules)) == ordered(expected)
+    assert single._pool is None
+    
+    try:
+        ScheduleConflictDetector(mode='parallel', max_workers=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("max_workers=0 should be rejected")
+    
+    print(f"✓ Test 12 passed! {len(first_run)} conflicts")
+
+
+def test_schedule_table_input():
+    """Test case 13: Detectors consume the compact ScheduleTable directly"""
+    print("\n" + "="*80)
+    print("TEST 13: COMPACT SCHEDULE TABLE")
+    print("="*80)
+    
+    schedules = _random_schedules(700, seed=13)
+    table = ScheduleTable(schedules)
+    
+    assert len(table) == len(schedules)
+    assert len(table.room_names) == len({s.ruangan for s in schedules})
+    assert table.schedule(5) == schedules[5]
+    assert table.schedule(5).jam_selesai == schedules[5].jam_selesai
+    
+    expected = _conflict_keys(ScheduleConflictDetector().detect_schedule_conflict(schedules))
+    for detector in (ScheduleConflictDetector(), ScheduleConflictDetector(mode='sweep')):
+        conflicts = detector.detect_schedule_conflict(table)
+        assert _conflict_keys(conflicts) == expected, detector.mode
+    
+    # Rows shared by several conflicts are materialized once
+    materialized = {}
+    for conflict in conflicts:
+        for schedule in conflict.affected_schedules:
+            assert materialized.setdefault(schedule.id, schedule) is schedule
+    
+    try:
+        vectorized = VectorizedConflictDetector()
+    except ImportError:
+        print("⚠ numpy not installed - vectorized table check skipped")
+    else:
+        assert _conflict_keys(vectorized.detect_schedule_conflict(table)) == expected
+    
+    print(f"✓ Test 13 passed! {len(table)} rows, {len(expected)} conflicts")
+
+
+def test_lazy_details_and_counts_only():
+    """Test case 14: Details are formatted on demand; counts need no Conflicts"""
+    print("\n" + "="*80)
+    print("TEST 14: LAZY DETAILS AND COUNTS-ONLY SUMMARY")
+    print("="*80)
+    
+    detector = ScheduleConflictDetector(mode='sweep')
+    schedules = _random_schedules(500, seed=14)
+    conflicts = detector.detect_schedule_conflict(schedules)
+    
+    # Nothing formatted until someone asks, and the summary doesn't ask
+    summary = detector.get_conflict_summary(conflicts)
+    assert all(c._details is None for c in conflicts)
+    
+    room = next(c for c in conflicts if c.conflict_type == 'room_conflict')
+    first, second = room.affected_schedules
+    assert room.details == {
+        'day': first.hari,
+        'room': first.ruangan,
+        'schedule1_time': f"{first.jam_mulai} - {first.jam_selesai}",
+        'schedule2_time': f"{second.jam_mulai} - {second.jam_selesai}",
+        'course1': first.course_name,
+        'course2': second.course_name,
+    }
+    lecturer = next(c for c in conflicts if c.conflict_type == 'lecturer_conflict')
+    assert lecturer.details['lecturer'] == lecturer.affected_schedules[0].dosen
+    assert lecturer.details['room2'] == lecturer.affected_schedules[1].ruangan
+    
+    # Counts-only path agrees with the full summary, for lists and tables
+    for source in (schedules, ScheduleTable(schedules)):
+        counts = detector.count_conflicts(source)
+        for key in ('total_conflicts', 'room_conflicts', 'lecturer_conflicts'):
+            assert counts[key] == summary[key], key
+        assert sorted(counts['affected_rooms']) == sorted(summary['affected_rooms'])
+        assert sorted(counts['affected_lecturers']) == sorted(summary['affected_lecturers'])
+    
+    print(f"✓ Test 14 passed! {summary['total_conflicts']} conflicts counted")
+
+
+def test_iter_conflicts_streaming():
+    """Test case 15: Streaming generator with limit, type filter and early exit"""
+    print("\n" + "="*80)
+    print("TEST 15: STREAMING ITER_CONFLICTS")
+    print("="*80)
+    
+    schedules = _random_schedules(500, seed=15)
+    
+    for mode in ('interval_tree', 'sweep', 'parallel'):
+        detector = ScheduleConflictDetector(mode=mode, max_workers=2)
+        everything = detector.detect_schedule_conflict(schedules)
+        
+        streamed = list(detector.iter_conflicts(schedules))
+        assert _conflict_keys(streamed) == _conflict_keys(everything), mode
+        
+        first_three = list(detector.iter_conflicts(schedules, limit=3))
+        assert len(first_three) == 3
+        assert list(detector.iter_conflicts(schedules, limit=0)) == []
+        assert list(detector.iter_conflicts(schedules, limit=-1)) == []
+        
+        rooms_only = list(detector.iter_conflicts(schedules, conflict_types=['room_conflict']))
+        assert rooms_only and all(c.conflict_type == 'room_conflict' for c in rooms_only)
+        assert _conflict_keys(rooms_only) == _conflict_keys(
+            [c for c in everything if c.conflict_type == 'room_conflict']
+        )
+        
+        assert detector.has_conflicts(schedules)
+        assert not detector.has_conflicts(schedules[:1])
+    
+    # Early exit on the index as well
+    index = ConflictIndex(schedules[:400])
+    candidate = next(s for s in schedules[400:] if len(index.find_conflicts(s)) > 1)
+    assert len(list(index.iter_conflicts(candidate, limit=1))) == 1
+    assert list(index.iter_conflicts(candidate, limit=0)) == list(index.iter_conflicts(candidate, limit=-1)) == []
+    assert index.has_conflicts(candidate)
+    
+    print("✓ Test 15 passed!")
+
+
+def test_versioned_result_cache():
+    """Test case 16: Results are reused until the schedule set changes"""
+    print("\n" + "="*80)
+    print("TEST 16: VERSIONED CONFLICT RESULT CACHE")
+    print("="*80)
+    
+    class CountingDetector(ScheduleConflictDetector):
+        runs = 0
+        
+        def detect_schedule_conflict(self, schedules):
+            CountingDetector.runs += 1
+            return super().detect_schedule_conflict(schedules)
+        
+        def count_conflicts(self, schedules):
+            CountingDetector.runs += 1
+            return super().count_conflicts(schedules)
+    
+    schedules = _random_schedules(300, seed=16)
+    cache = ConflictResultCache(CountingDetector(mode='sweep'))
+    
+    # Summary alone goes through the counts-only path, once per version
+    summary = cache.summary(schedules)
+    assert cache.summary(schedules) is summary
+    assert CountingDetector.runs == 1
+    
+    conflicts = cache.conflicts(schedules)
+    assert cache.conflicts(schedules) is conflicts
+    assert len(conflicts) == summary['total_conflicts']
+    assert CountingDetector.runs == 2
+    
+    # A mutation invalidates both results
+    schedules.pop()
+    assert cache.bump() == 1
+    conflicts = cache.conflicts(schedules)
+    summary = cache.summary(schedules)
+    assert summary['total_conflicts'] == len(conflicts)
+    assert CountingDetector.runs == 3, "Summary should reuse the cached conflict list"
+    
+    print("✓ Test 16 passed!")
+
+
+def test_benchmark_regression_check():
+    """Test case 17: Benchmark suite runs and flags regressions"""
+    print("\n" + "="*80)
+    print("TEST 17: BENCHMARK SUITE")
+    print("="*80)
+    
+    report = run_benchmarks([200], ['uniform', 'hotspot_rooms'], ['sweep'], repeat=1, log=lambda line: None)
+    assert len(report['results']) == 2
+    result = report['results'][0]
+    assert result['conflicts'] > 0 and result['peak_memory_bytes'] > 0
+    
+    # Same numbers never regress; a much faster baseline does
+    assert compare_to_baseline(report, report) == []
+    faster = json.loads(json.dumps(report))
+    for entry in faster['results']:
+        entry['seconds'] /= 10
+    assert len(compare_to_baseline(report, faster)) == 2
+    
+    # Different conflict counts for the same timetable are always reported
+    wrong = json.loads(json.dumps(report))
+    wrong['results'][1]['conflicts'] += 1
+    assert len(compare_to_baseline(report, wrong)) == 1
+    
+    # The default interval_tree mode is skipped above its size limit
+    report = run_benchmarks([200, 200000], ['uniform'], ['interval_tree'], repeat=1, track_memory=False,
+                            log=lambda line: None)
+    assert [(r['size'], r['mode']) for r in report['results']] == [(200, 'interval_tree')]
+    
+    # A comparison without a baseline fails instead of passing vacuously
+    with tempfile.TemporaryDirectory() as directory:
+        args = ['--sizes', '200', '--scenarios', 'uniform', '--modes', 'sweep', '--repeat', '1', '--no-memory',
+                '--output', os.path.join(directory, 'results.json')]
+        baseline = ['--baseline', os.path.join(directory, 'baseline.json')]
+        assert benchmark_main(args + baseline) == 1
+        assert benchmark_main(args + baseline + ['--no-compare']) == 0
+        assert benchmark_main(args + baseline + ['--update-baseline']) == 0
+        assert benchmark_main(args + baseline + ['--tolerance', '100']) == 0
+    
+    print("✓ Test 17 passed!")
+
+
+def test_detector_instrumentation():
+    """Test case 18: Opt-in phase timers, counters and profiler hooks"""
+    print("\n" + "="*80)
+    print("TEST 18: DETECTOR INSTRUMENTATION")
+    print("="*80)
+    
+    schedules = _random_schedules(400, seed=18)
+    
+    assert ScheduleConflictDetector().stats is None
+    plain = ScheduleConflictDetector(mode='sweep')
+    plain.detect_schedule_conflict(schedules)
+    assert plain.stats is None, "Instrumentation must be opt-in"
+    
+    tree = ScheduleConflictDetector(instrument=True)
+    conflicts = tree.detect_schedule_conflict(schedules)
+    stats = tree.stats
+    # One tree per (day, room) and (day, lecturer): every candidate shares a resource
+    trees = len({(s.hari, s.ruangan) for s in schedules}) + len({(s.hari, s.dosen) for s in schedules})
+    assert stats.mode == 'interval_tree' and stats.schedules == 400 and stats.groups == trees
+    assert stats.conflicts == len(conflicts) > 0
+    assert stats.candidate_pairs == len({frozenset(s.id for s in c.affected_schedules) for c in conflicts})
+    assert stats.discarded_pairs == 0
+    assert set(stats.phase_seconds) == {
+        'grouping', 'tree_build', 'overlap_query', 'pair_dedup', 'conflict_construction'
+    }
+    
+    sweep = ScheduleConflictDetector(mode='sweep', instrument=True)
+    assert _conflict_keys(sweep.detect_schedule_conflict(schedules)) == _conflict_keys(conflicts)
+    assert sweep.stats.candidate_pairs == len(conflicts), "Sweep only generates real conflicts"
+    assert json.dumps(sweep.stats.as_dict())
+    
+    # Streaming runs are instrumented as well
+    list(sweep.iter_conflicts(schedules, limit=5))
+    assert sweep.stats.conflicts == 5
+    
+    # Profiler hooks attach to a single run and leave instrumentation as it was
+    profiled = plain.profile_run(schedules, profiler='cprofile')
+    assert profiled.profile is not None and plain.instrument is False
+    traced = plain.profile_run(schedules, profiler='tracemalloc')
+    assert traced.peak_memory_bytes > 0 and traced.memory_snapshot is not None
+    
+    print(f"✓ Test 18 passed! {stats.candidate_pairs} candidates → {stats.conflicts} conflicts")
+
+
+def test_occupancy_bitsets():
+    """Test case 19: Bitset availability agrees with the interval index"""
+    print("\n" + "="*80)
+    print("TEST 19: OCCUPANCY BITSET INDEX")
+    print("="*80)
+    
+    # Non-empty bookings on the 15 minute grid are exact at 5 minute slots
+    pool = [s for s in _random_schedules(700, seed=19) if s.jam_mulai != s.jam_selesai]
+    occupancy = OccupancyIndex(slot_minutes=5, schedules=pool[:500])
+    index = ConflictIndex(pool[:500])
+    
+    for candidate in pool[500:]:
+        args = (candidate.hari, candidate.jam_mulai, candidate.jam_selesai)
+        room_busy = index.has_conflicts(candidate) and any(
+            c.conflict_type == 'room_conflict' for c in index.find_conflicts(candidate)
+        )
+        assert occupancy.is_room_free(candidate.hari, candidate.ruangan, *args[1:]) == (not room_busy)
+        assert occupancy.is_free(*args, room=candidate.ruangan, lecturer=candidate.dosen) == (
+            not index.has_conflicts(candidate)
+        )
+    
+    # Removing one of two overlapping bookings keeps the other one busy
+    first = Schedule("A", "Sabtu", time(8, 0), time(10, 0), "Aula", "Dosen A")
+    second = Schedule("B", "Sabtu", time(9, 0), time(11, 0), "Aula", "Dosen B")
+    occupancy.add(first)
+    occupancy.add(second)
+    occupancy.remove("A")
+    assert not occupancy.is_room_free("Sabtu", "Aula", time(9, 30), time(10, 0))
+    assert occupancy.is_room_free("Sabtu", "Aula", time(8, 0), time(9, 0))
+    assert occupancy.is_free("Sabtu", time(9, 0), time(11, 0), room="Aula", ignore_id="B")
+    
+    # Unaligned bookings block their partial slots
+    coarse = OccupancyIndex(slot_minutes=30)
+    coarse.add(Schedule("C", "Senin", time(8, 10), time(8, 40), "Lab", "Dosen C"))
+    assert not coarse.is_room_free("Senin", "Lab", time(8, 50), time(9, 0))
+    assert coarse.is_room_free("Senin", "Lab", time(9, 0), time(10, 0))
+    
+    print(f"✓ Test 19 passed! {len(occupancy)} bookings indexed")
+
+
+def test_free_slot_search():
+    """Test case 20: Free-slot search returns only real, ranked placements"""
+    print("\n" + "="*80)
+    print("TEST 20: FREE-SLOT SEARCH")
+    print("="*80)
+    
+    schedules = [s for s in _random_schedules(300, seed=20, rooms=6, lecturers=8) if s.jam_mulai != s.jam_selesai]
+    occupancy = OccupancyIndex(slot_minutes=5, schedules=schedules)
+    index = ConflictIndex(schedules)
+    original = schedules[0]
+    near = (original.hari, original.jam_mulai, original.ruangan)
+    
+    slots = occupancy.find_free_slots(100, lecturer=original.dosen, near=near,
+                                      ignore_id=original.id, limit=25)
+    assert slots, "Expected free placements in a sparse timetable"
+    for slot in slots:
+        moved = Schedule(original.id, slot.hari, slot.jam_mulai, slot.jam_selesai, slot.ruangan, original.dosen)
+        assert not index.find_conflicts(moved, replacing=original.id), f"{slot} is not actually free"
+        assert time(7, 0) <= slot.jam_mulai and slot.jam_selesai <= time(21, 0)
+        assert slot.jam_mulai.minute % 30 == 0
+    
+    # Same day beats other days, then the nearest start wins
+    start = original.jam_mulai.hour * 60 + original.jam_mulai.minute
+    keys = [(slot.hari != original.hari, abs(slot.jam_mulai.hour * 60 + slot.jam_mulai.minute - start))
+            for slot in slots]
+    assert keys == sorted(keys)
+    
+    # Constraints are honoured
+    constrained = occupancy.find_free_slots(50, days=["Rabu"], rooms=["Lab 1"], limit=50)
+    assert constrained and all(s.hari == "Rabu" and s.ruangan == "Lab 1" for s in constrained)
+    
+    # A fully booked room offers nothing
+    full = OccupancyIndex(slot_minutes=5)
+    full.add(Schedule("F", "Senin", time(7, 0), time(21, 0), "Aula", "Dosen F"))
+    assert full.find_free_slots(30, days=["Senin"], rooms=["Aula"]) == []
+    
+    print(f"✓ Test 20 passed! {len(slots)} ranked placements verified")
+
+
+def test_conflict_repair():
+    """Test case 21: Repair solver removes every conflict with few moves"""
+    print("\n" + "="*80)
+    print("TEST 21: CONFLICT REPAIR SOLVER")
+    print("="*80)
+    
+    schedules = [s for s in _random_schedules(400, seed=21, rooms=20, lecturers=25) if s.jam_mulai != s.jam_selesai]
+    detector = ScheduleConflictDetector(mode='sweep')
+    conflicts = detector.detect_schedule_conflict(schedules)
+    assert conflicts, "Test timetable should start with conflicts"
+    
+    plan = ConflictRepairer(time_budget=10).repair(schedules, conflicts)
+    repaired = plan.apply(schedules)
+    assert plan.resolved and not plan.timed_out
+    assert ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(repaired) == []
+    
+    # Each move settles at least one conflict; untouched schedules stay put
+    involved = {s.id for c in conflicts for s in c.affected_schedules}
+    assert len(plan.moves) <= len(conflicts)
+    assert all(move.schedule_id in involved for move in plan.moves)
+    assert [s.id for s in repaired] == [s.id for s in schedules]
+    for move in plan.moves:
+        assert move.replacement.dosen == move.original.dosen
+        assert move.kind in ('time', 'room', 'time+room')
+    
+    # Pinned schedules never move; the other side of their conflicts does
+    pinned = {c.affected_schedules[0].id for c in conflicts[:10]}
+    pinned_plan = ConflictRepairer(time_budget=10).repair(schedules, conflicts, pinned=pinned)
+    assert not pinned & {move.schedule_id for move in pinned_plan.moves}
+    
+    # Two pinned schedules in conflict cannot be repaired
+    a = Schedule("P1", "Senin", time(8, 0), time(10, 0), "Aula", "Dosen A")
+    b = Schedule("P2", "Senin", time(9, 0), time(11, 0), "Aula", "Dosen B")
+    stuck = ConflictRepairer().repair([a, b], pinned=["P1", "P2"])
+    assert not stuck.resolved and sorted(stuck.unresolved) == ["P1", "P2"] and stuck.moves == []
+    
+    print(f"✓ Test 21 passed! {len(conflicts)} conflicts repaired with {len(plan.moves)} moves "
+          f"in {plan.elapsed_seconds:.3f}s")
+
+
+def test_conflict_clusters():
+    """Test case 22: N-way clusters cover exactly the pairwise conflicts"""
+    print("\n" + "="*80)
+    print("TEST 22: CONFLICT CLUSTERS")
+    print("="*80)
+    
+    # 20 classes double-booked into one room: one cluster, not 190 pairs
+    crowded = [
+        Schedule(f"R{i:02d}", "Senin", time(10, 0), time(12, 0), "Aula", f"Dosen {i}", f"Course {i}")
+        for i in range(20)
+    ]
+    detector = ScheduleConflictDetector(mode='sweep')
+    clusters = detector.detect_conflict_clusters(crowded)
+    assert len(clusters) == 1
+    cluster = clusters[0]
+    assert cluster.conflict_type == 'room_conflict' and cluster.resource == "Aula"
+    assert len(cluster.affected_schedules) == 20 and cluster.pair_count == 190
+    assert cluster.max_concurrent == 20
+    assert (cluster.window_start, cluster.window_end) == (time(10, 0), time(12, 0))
+    assert "190 conflicting pairs" in format_cluster_report(clusters)
+    
+    # A chain A-B-C is one component; touching intervals are not
+    chain = [
+        Schedule("A", "Selasa", time(8, 0), time(10, 0), "Lab 1", "Dosen A"),
+        Schedule("B", "Selasa", time(9, 0), time(11, 0), "Lab 1", "Dosen B"),
+        Schedule("C", "Selasa", time(10, 30), time(12, 0), "Lab 1", "Dosen C"),
+        Schedule("D", "Selasa", time(12, 0), time(13, 0), "Lab 1", "Dosen D"),
+    ]
+    clusters = detector.detect_conflict_clusters(chain)
+    assert [[s.id for s in c.affected_schedules] for c in clusters] == [["A", "B", "C"]]
+    assert clusters[0].pair_count == 2 and clusters[0].max_concurrent == 2
+    assert (clusters[0].window_start, clusters[0].window_end) == (time(8, 0), time(12, 0))
+    
+    # Random timetable: pair counts and memberships match pairwise detection
+    schedules = _random_schedules(800, seed=22)
+    conflicts = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(schedules)
+    clusters = detector.detect_conflict_clusters(schedules)
+    for conflict_type in ('room_conflict', 'lecturer_conflict'):
+        selected = [c for c in clusters if c.conflict_type == conflict_type]
+        pairs = [c for c in conflicts if c.conflict_type == conflict_type]
+        assert sum(c.pair_count for c in selected) == len(pairs)
+        members = {s.id for c in selected for s in c.affected_schedules}
+        assert members == {s.id for c in pairs for s in c.affected_schedules}
+    room_only = detector.detect_conflict_clusters(schedules, conflict_types=['room_conflict'])
+    assert len(room_only) == sum(1 for c in clusters if c.conflict_type == 'room_conflict')
+    assert all(c.conflict_type == 'room_conflict' for c in room_only)
+    
+    # The cache detects clusters once per version
+    cache = ConflictResultCache(detector)
+    assert cache.clusters(schedules) is cache.clusters(schedules)
+    
+    print(f"✓ Test 22 passed! {len(conflicts)} pairs collapsed into {len(clusters)} clusters")
+
+
+def test_streaming_report_writer():
+    """Test case 23: Streaming report writer in text, CSV and JSON lines"""
+    print("\n" + "="*80)
+    print("TEST 23: STREAMING REPORT WRITER")
+    print("="*80)
+    
+    schedules = _random_schedules(500, seed=23)
+    detector = ScheduleConflictDetector(mode='sweep')
+    conflicts = detector.detect_schedule_conflict(schedules)
+    expected = detector.get_conflict_summary(conflicts)
+    
+    # Every format computes the summary in the same pass
+    outputs = {}
+    for fmt in ConflictReportWriter.FORMATS:
+        writer = ConflictReportWriter(fmt, chunk_size=64)
+        stream = io.StringIO()
+        summary = writer.write(iter(conflicts), stream)
+        outputs[fmt] = stream.getvalue()
+        assert summary['total_conflicts'] == expected['total_conflicts']
+        assert summary['room_conflicts'] == expected['room_conflicts']
+        assert summary['affected_rooms'] == expected['affected_rooms']
+        assert summary['affected_lecturers'] == expected['affected_lecturers']
+    
+    # Rendering formats each entry on the fly and leaves the conflicts lazy
+    assert all(c._details is None for c in conflicts)
+    
+    # Affected lists are sorted, so reports are reproducible across runs
+    assert expected['affected_rooms'] == sorted(expected['affected_rooms'])
+    assert expected['affected_lecturers'] == sorted(expected['affected_lecturers'])
+    counted = detector.count_conflicts(schedules)
+    assert (counted['affected_rooms'], counted['affected_lecturers']) == (
+        expected['affected_rooms'], expected['affected_lecturers'])
+    with ScheduleConflictDetector(mode='parallel', max_workers=2) as parallel:
+        assert parallel.count_conflicts(schedules) == counted
+    assert f"Affected Rooms: {', '.join(expected['affected_rooms'])}\n" in outputs['text']
+    
+    rows = list(csv.DictReader(io.StringIO(outputs['csv'])))
+    assert len(rows) == len(conflicts)
+    assert (rows[0]['schedule1_id'], rows[0]['schedule2_id']) == tuple(s.id for s in conflicts[0].affected_schedules)
+    
+    records = [json.loads(line) for line in outputs['jsonl'].splitlines()]
+    assert len(records) == len(conflicts)
+    assert records[-1]['details'] == conflicts[-1].details
+    
+    assert f"Total Conflicts: {len(conflicts)}" in outputs['text']
+    assert format_conflict_report(iter(conflicts)) == outputs['text']
+    assert f"{len(conflicts)} conflict(s) found" in format_conflict_report(conflicts)
+    
+    # Text keeps the sectioned layout, even when the sections spill to disk
+    text = outputs['text']
+    room_header = f"ROOM CONFLICTS ({expected['room_conflicts']}):"
+    lecturer_header = f"LECTURER CONFLICTS ({expected['lecturer_conflicts']}):"
+    assert text.index(room_header) < text.index(lecturer_header) < text.index("SUMMARY:")
+    first_room = next(c for c in conflicts if c.conflict_type == 'room_conflict')
+    assert f"{room_header}\n{'-' * 80}\n1. {first_room.day} - Room {first_room.details['room']}\n" in text
+    spilled = io.StringIO()
+    ConflictReportWriter('text', spool_bytes=1024).write(iter(conflicts), spilled)
+    assert spilled.getvalue() == text
+    
+    # Chunks follow chunk_size, and a detector generator streams just as well
+    writer = ConflictReportWriter('jsonl', chunk_size=100)
+    chunks = list(writer.iter_chunks(detector.iter_conflicts(schedules)))
+    assert len(chunks) == -(-len(conflicts) // 100)
+    assert writer.summary['total_conflicts'] == len(conflicts)
+    
+    assert format_conflict_report([]) == "✓ No conflicts detected!"
+    try:
+        ConflictReportWriter('xml')
+        assert False, "Unknown formats should be rejected"
+    except ValueError:
+        pass
+    
+    print(f"✓ Test 23 passed! {len(conflicts)} conflicts streamed in {len(outputs)} formats")
+
+
+def test_recurring_schedules():
+    """Test case 24: Rule-level recurring conflicts match expanded occurrences"""
+    print("\n" + "="*80)
+    print("TEST 24: RECURRING SCHEDULES")
+    print("="*80)
+    
+    # Weekly vs biweekly in the same room: they meet every other week
+    weekly = RecurringSchedule(
+        Schedule("W", "Senin", time(10, 0), time(12, 0), "Lab 301", "Dosen A", "Weekly"),
+        date(2026, 2, 2), date(2026, 5, 25)
+    )
+    biweekly = RecurringSchedule(
+        Schedule("B", "Senin", time(11, 0), time(13, 0), "Lab 301", "Dosen B", "Biweekly"),
+        date(2026, 2, 9), date(2026, 6, 30), interval_weeks=2, exceptions={date(2026, 3, 9)}
+    )
+    conflicts = RecurringConflictDetector().detect([weekly, biweekly])
+    assert len(conflicts) == 1
+    clash = conflicts[0]
+    assert clash.first_date == date(2026, 2, 9) and clash.period_days == 14
+    assert list(clash.dates())[:3] == [date(2026, 2, 9), date(2026, 2, 23), date(2026, 3, 23)]
+    assert clash.occurrence_count == len(list(clash.dates())) == 7
+    dated = next(clash.expand())
+    assert dated.details['day'] == "Senin 2026-02-09"
+    
+    # Moving a session away removes that date and may clash elsewhere
+    biweekly.move(date(2026, 2, 23), date(2026, 2, 24), ruangan="Lab 301")
+    clash = RecurringConflictDetector().detect([weekly, biweekly])[0]
+    assert date(2026, 2, 23) not in set(clash.dates())
+    
+    # Biweekly series on opposite weeks never meet
+    odd = RecurringSchedule(
+        Schedule("O", "Senin", time(10, 0), time(12, 0), "Lab 301", "Dosen C"),
+        date(2026, 2, 16), date(2026, 6, 30), interval_weeks=2
+    )
+    even = RecurringSchedule(
+        Schedule("E", "Senin", time(10, 0), time(12, 0), "Lab 301", "Dosen D"),
+        date(2026, 2, 9), date(2026, 6, 30), interval_weeks=2
+    )
+    assert RecurringConflictDetector().detect([odd, even]) == []
+    
+    # Random rules with holidays and moves agree with brute-force expansion
+    rng = random.Random(24)
+    rules = []
+    for i, schedule in enumerate(_random_schedules(120, seed=24, rooms=5, lecturers=6)):
+        first = date(2026, 1, 1) + timedelta(days=rng.randrange(120))
+        rule = RecurringSchedule(schedule, first, first + timedelta(days=rng.randrange(20, 200)),
+                                 interval_weeks=rng.choice([1, 1, 2, 3]))
+        sessions = list(rule.dates())
+        rule.exceptions |= set(rng.sample(sessions, min(2, len(sessions))))
+        sessions = list(rule.dates())
+        if sessions and rng.random() < 0.3:
+            moved = rng.choice(sessions)
+            rule.move(moved, moved + timedelta(days=rng.randrange(1, 5)), time(10, 0), time(11, 30))
+        rules.append(rule)
+    
+    found = set()
+    for conflict in RecurringConflictDetector().detect(rules):
+        assert conflict.occurrence_count == len(list(conflict.dates()))
+        for day in conflict.dates():
+            found.add((conflict.conflict_type, day, frozenset(s.id for s in conflict.affected_schedules)))
+    
+    occurrences = [replace(session, hari=day.isoformat()) for rule in rules for day, session in rule.occurrences()]
+    expected = {
+        (c.conflict_type, date.fromisoformat(c.affected_schedules[0].hari),
+         frozenset(s.id for s in c.affected_schedules))
+        for c in ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(occurrences)
+    }
+    assert found == expected
+    
+    print(f"✓ Test 24 passed! {len(found)} dated clashes found from {len(rules)} rules")
+
+
+def test_student_conflicts():
+    """Test case 25: Enrollment-aware conflicts match a per-student check"""
+    print("\n" + "="*80)
+    print("TEST 25: STUDENT ENROLLMENT CONFLICTS")
+    print("="*80)
+    
+    schedules = _random_schedules(300, seed=25, rooms=40, lecturers=60)
+    courses = sorted({s.course_name for s in schedules})
+    rng = random.Random(25)
+    enrollments = {course: [] for course in courses}
+    for student in range(400):
+        for course in rng.sample(courses, 5):
+            enrollments[course].append(f"STU{student:04d}")
+    index = EnrollmentIndex(enrollments)
+    
+    conflicts = StudentConflictDetector(index).detect(schedules)
+    found = {
+        (c.affected_schedules[0].id, c.affected_schedules[1].id): c.details['students_affected']
+        for c in conflicts
+    }
+    assert all(c.conflict_type == 'student_conflict' for c in conflicts)
+    
+    # Reference: every overlapping pair, counting students enrolled in both
+    members = {course: set(students) for course, students in enrollments.items()}
+    expected = {}
+    for i, first in enumerate(schedules):
+        for second in schedules[i + 1:]:
+            if first.hari != second.hari or first.course_name == second.course_name:
+                continue
+            if not TimeInterval(first.jam_mulai, first.jam_selesai).overlaps_with(
+                    TimeInterval(second.jam_mulai, second.jam_selesai)):
+                continue
+            shared = len(members[first.course_name] & members[second.course_name])
+            if shared:
+                expected[(first.id, second.id)] = shared
+    assert found == expected
+    
+    # Bitset queries and incremental updates
+    pair = next(iter(found))
+    course1, course2 = (next(s.course_name for s in schedules if s.id == sid) for sid in pair)
+    assert index.shared_count(course1, course2) == found[pair]
+    assert sorted(index.shared_students(course1, course2)) == sorted(members[course1] & members[course2])
+    for student in index.shared_students(course1, course2):
+        index.drop(course1, student)
+    assert index.shared_count(course1, course2) == 0
+    assert pair not in {(c.affected_schedules[0].id, c.affected_schedules[1].id)
+                        for c in StudentConflictDetector(index).detect(schedules)}
+    
+    strict = StudentConflictDetector(EnrollmentIndex(enrollments), min_students=2).detect(schedules)
+    assert len(strict) == sum(1 for shared in expected.values() if shared >= 2)
+    
+    # A course registered after the matrix was built must not shift its keys
+    fresh = EnrollmentIndex(enrollments)
+    detector = StudentConflictDetector(fresh)
+    assert len(detector.detect(schedules)) == len(conflicts)
+    fresh.course_id("Brand New Course")
+    assert fresh.find_course_id("Brand New Course") == len(courses)
+    assert fresh.find_course_id("Unknown Course") is None
+    assert {(c.affected_schedules[0].id, c.affected_schedules[1].id): c.details['students_affected']
+            for c in detector.detect(schedules)} == found
+    
+    print(f"✓ Test 25 passed! {len(conflicts)} student conflicts found")
+
+
+def test_rule_engine():
+    """Test case 26: Pluggable rules share one grouping and sweep"""
+    print("\n" + "="*80)
+    print("TEST 26: PLUGGABLE RULE ENGINE")
+    print("="*80)
+    
+    # The default rules reproduce the built-in room and lecturer checks
+    schedules = _random_schedules(800, seed=26)
+    expected = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(schedules)
+    assert _conflict_keys(RuleEngine().detect(schedules)) == _conflict_keys(expected)
+    
+    engine = RuleEngine([
+        RoomOverlapRule(),
+        LecturerOverlapRule(),
+        LecturerTravelBufferRule(buffer_minutes=20),
+        MaxTeachingHoursRule(max_minutes=240),
+        RoomCapacityRule({"Gedung A 101": 30}, {"Statistika": 45}),
+    ])
+    # Three lecturer rules, yet only two groupings are built and swept
+    assert engine.plan() == {('hari', 'ruangan'): 0, ('hari', 'dosen'): 20}
+    
+    timetable = [
+        Schedule("T1", "Senin", time(8, 0), time(10, 0), "Gedung A 101", "Dr. Rina", "Statistika"),
+        Schedule("T2", "Senin", time(10, 10), time(12, 0), "Gedung B 201", "Dr. Rina", "Kalkulus"),
+        Schedule("T3", "Senin", time(12, 30), time(14, 0), "Gedung B 202", "Dr. Rina", "Aljabar"),
+        Schedule("T4", "Senin", time(13, 0), time(14, 0), "Gedung B 202", "Dr. Budi", "Fisika"),
+    ]
+    by_type = {}
+    for conflict in engine.detect(timetable):
+        by_type.setdefault(conflict.conflict_type, []).append(conflict)
+    
+    travel = by_type['lecturer_travel_conflict']
+    assert [[s.id for s in c.affected_schedules] for c in travel] == [["T1", "T2"]]
+    assert travel[0].details['gap_minutes'] == 10
+    assert [s.id for s in by_type['room_conflict'][0].affected_schedules] == ["T3", "T4"]
+    assert by_type['teaching_load_conflict'][0].details['teaching_minutes'] == 320
+    assert by_type['room_capacity_conflict'][0].details['students'] == 45
+    assert 'lecturer_conflict' not in by_type
+    
+    # Results follow registration order
+    order = [c.conflict_type for c in engine.detect(timetable)]
+    assert order == sorted(order, key=[r.conflict_type for r in engine.rules].index)
+    
+    # Through RuleBasedDetector, registered rules reach the cache and the reports
+    detector = RuleBasedDetector()
+    assert detector.engine.only_default_rules()
+    assert detector.count_conflicts(schedules) == ScheduleConflictDetector(mode='sweep').count_conflicts(schedules)
+    cache = ConflictResultCache(detector)
+    assert len(cache.conflicts(timetable)) == 1
+    detector.engine.register(RoomCapacityRule({"Gedung A 101": 30}, {"Statistika": 45}))
+    detector.engine.register(MaxTeachingHoursRule(max_minutes=240))
+    cache.bump()
+    assert [c.conflict_type for c in cache.conflicts(timetable)] == [
+        'room_conflict', 'room_capacity_conflict', 'teaching_load_conflict']
+    assert cache.summary(timetable)['total_conflicts'] == 3
+    assert [c.conflict_type for c in detector.iter_conflicts(timetable, conflict_types=['room_capacity_conflict'])] == [
+        'room_capacity_conflict']
+    report = format_conflict_report(cache.conflicts(timetable))
+    assert "ROOM CAPACITY CONFLICTS (1):" in report and "IDs: T1 ↔ T2 ↔ T3\n" in report
+    assert ConflictRepairer(time_budget=1).repair(timetable, cache.conflicts(timetable)).resolved
+    
+    # Custom rules stream lazily, stop early, and take a ScheduleTable as is
+    class CountingCapacityRule(RoomCapacityRule):
+        checked = 0
+        
+        def check_schedule(self, schedule):
+            CountingCapacityRule.checked += 1
+            return super().check_schedule(schedule)
+    
+    big = _random_schedules(800, seed=126)
+    everyone = {s.course_name: 1000 for s in big}
+    streaming = RuleBasedDetector(RuleEngine([RoomOverlapRule(), LecturerOverlapRule(),
+                                              CountingCapacityRule({s.ruangan: 10 for s in big}, everyone)]),
+                                  instrument=True)
+    assert streaming.has_conflicts(big) and CountingCapacityRule.checked == 1
+    assert len(list(streaming.iter_conflicts(big, limit=5))) == 5 and streaming.stats.conflicts == 5
+    assert list(streaming.iter_conflicts(big, limit=0)) == []
+    detected = streaming.detect_schedule_conflict(big)
+    overlaps = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(big)
+    assert streaming.stats.conflicts == len(detected) == len(overlaps) + len(big)
+    keys = lambda conflicts: sorted((c.conflict_type, *(s.id for s in c.affected_schedules)) for c in conflicts)
+    assert keys(streaming.detect_schedule_conflict(ScheduleTable(big))) == keys(detected)
+    assert keys(streaming.iter_conflicts(big)) == keys(detected)
+    
+    # Clusters follow the registered rules as well
+    rooms_only = RuleBasedDetector(RuleEngine([RoomOverlapRule(), LecturerTravelBufferRule(buffer_minutes=20)]))
+    clusters = rooms_only.detect_conflict_clusters(timetable)
+    assert [c.conflict_type for c in clusters] == ['room_conflict', 'lecturer_travel_conflict']
+    assert [s.id for s in clusters[1].affected_schedules] == ["T1", "T2"]
+    assert clusters[1].resource == "Dr. Rina" and clusters[1].max_concurrent == 1
+    assert rooms_only.detect_conflict_clusters(timetable, conflict_types=['lecturer_conflict']) == []
+    
+    print(f"✓ Test 26 passed! {len(expected)} built-in conflicts reproduced, "
+          f"{len(by_type)} rule types evaluated together")
+
+
+def test_targeted_conflict_queries():
+    """Test case 27: Per-room, per-lecturer, per-day and per-schedule queries match full detection"""
+    print("\n" + "="*80)
+    print("TEST 27: TARGETED CONFLICT QUERIES")
+    print("="*80)
+    
+    def keys(conflicts):
+        return sorted((c.conflict_type, *sorted(s.id for s in c.affected_schedules)) for c in conflicts)
+    
+    schedules = _random_schedules(1500, seed=27)
+    index = ConflictIndex(schedules)
+    for schedule in schedules[::10]:
+        index.remove(schedule.id)
+    live = index.schedules()
+    expected = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(live)
+    
+    def touching(predicate):
+        return keys(c for c in expected if any(predicate(s) for s in c.affected_schedules))
+    
+    assert keys(index.conflicts_for_room("Lab 3")) == touching(lambda s: s.ruangan == "Lab 3")
+    assert keys(index.conflicts_for_room("Lab 3", day="Rabu")) == keys(
+        c for c in expected if c.details['day'] == "Rabu"
+        and any(s.ruangan == "Lab 3" for s in c.affected_schedules))
+    assert keys(index.conflicts_for_lecturer("Dosen 7")) == touching(lambda s: s.dosen == "Dosen 7")
+    assert keys(index.conflicts_for_lecturer("Dosen 7", conflict_types=['lecturer_conflict'])) == keys(
+        c for c in expected if c.conflict_type == 'lecturer_conflict' and c.affected_schedules[0].dosen == "Dosen 7")
+    assert keys(index.conflicts_for_day("Kamis")) == keys(c for c in expected if c.details['day'] == "Kamis")
+    
+    target = live[0]
+    assert keys(index.conflicts_for_schedule(target.id)) == touching(lambda s: s.id == target.id)
+    assert index.conflicts_for_schedule("MISSING") == []
+    assert index.conflicts_for_room("Aula") == [] and index.conflicts_for_day("Minggu") == []
+    
+    # Emptied partitions disappear from the index
+    for schedule in live:
+        index.remove(schedule.id)
+    assert index.conflicts_for_lecturer("Dosen 7") == []
+    assert not index._room_days and not index._day_lecturers
+    
+    print(f"✓ Test 27 passed! Partition queries agree with {len(expected)} conflicts from full detection")
+
+
+def test_sqlite_schedule_store():
+    """Test case 28: The SQLite store persists schedules and answers overlap queries like the index"""
+    print("\n" + "="*80)
+    print("TEST 28: SQLITE SCHEDULE STORE")
+    print("="*80)
+    
+    def keys(conflicts):
+        return sorted((c.conflict_type, c.affected_schedules[0].id, c.affected_schedules[1].id) for c in conflicts)
+    
+    schedules = _random_schedules(600, seed=28)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jadwal.db")
+        store = ScheduleStore(path)
+        assert store.journal_mode == 'wal'
+        assert store.add_many(schedules[:500]) == 500
+        index = ConflictIndex(schedules[:500])
+        
+        # Overlap candidates come from the (hari, ruangan) / (hari, dosen) indexes
+        assert 'idx_schedules_room' in store.query_plan('ruangan')
+        assert 'idx_schedules_lecturer' in store.query_plan('dosen')
+        for candidate in schedules[500:]:
+            assert keys(store.iter_conflicts(candidate)) == keys(index.iter_conflicts(candidate))
+        assert list(store.iter_conflicts(schedules[0], limit=-1)) == []
+        
+        try:
+            store.add(schedules[0])
+            assert False, "duplicate id accepted"
+        except ValueError:
+            pass
+        
+        moved = replace(schedules[1], hari="Sabtu", jam_mulai=time(7, 0), jam_selesai=time(8, 0))
+        assert store.update(schedules[1].id, moved) == schedules[1]
+        assert store.remove(schedules[2].id) == schedules[2]
+        assert store.remove(schedules[2].id) is None
+        assert [s.id for s in store.schedules()][:2] == [schedules[0].id, schedules[1].id]
+        
+        # The detector runs straight off the stored columns
+        expected = ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(store.schedules())
+        table = store.table()
+        assert store.table() is table
+        assert keys(ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(table)) == keys(expected)
+        
+        store.log({'timestamp': '2026-01-01T08:00:00', 'schedule_id': 'X', 'status': 'ADDED', 'conflicts': []})
+        store.close()
+        
+        # Everything survives a restart
+        reopened = ScheduleStore(path)
+        assert len(reopened) == 499
+        assert reopened.get(schedules[1].id).hari == "Sabtu"
+        assert schedules[2].id not in reopened
+        assert [entry['status'] for entry in reopened.logs()] == ['ADDED']
+        reopened.clear_logs()
+        assert reopened.logs() == []
+        reopened.close()
+    
+    print(f"✓ Test 28 passed! {len(schedules) - 500} candidates checked with indexed range queries, "
+          f"{len(expected)} conflicts from stored columns")
+
+
+def test_bulk_import():
+    """Test case 29: Streaming bulk import validates and checks a batch in one pass"""
+    print("\n" + "="*80)
+    print("TEST 29: STREAMING BULK IMPORT")
+    print("="*80)
+    
+    existing = [Schedule("E1", "Senin", time(8, 0), time(10, 0), "Lab 301", "Dr. Ahmad", "Web Development")]
+    index = ConflictIndex(existing)
+    rows = [
+        "id,course_name,hari,jam_mulai,jam_selesai,ruangan,dosen",
+        "N1,Database,Senin,10:00,12:00,Lab 301,Dr. Budi",      # fits
+        "N2,Statistika,Senin,09:00,11:00,Lab 302,Dr. Ahmad",   # lecturer conflict with E1
+        "N3,Kalkulus,Senin,11:00,12:30,Lab 301,Dr. Citra",     # room conflict with N1
+        "N4,Aljabar,Selasa,25:00,26:00,Lab 301,Dr. Citra",     # invalid time
+        "N1,Fisika,Rabu,08:00,09:00,Lab 303,Dr. Dedi",         # duplicate id
+        "N5,Kimia,Rabu,10:00,09:00,Lab 303,Dr. Dedi",          # ends before it starts
+        "N6,Biologi,Rabu,10:00,11:00,,Dr. Dedi",               # missing room
+    ]
+    lines = (row + "\n" for row in rows)
+    
+    report = check_import(lines, 'csv', index)
+    assert report.aborted and report.accepted == [] and report.rows == 7
+    assert [(i.row, i.status) for i in report.issues] == [
+        (2, 'conflict'), (3, 'conflict'), (4, 'invalid'), (5, 'duplicate'), (6, 'invalid'), (7, 'invalid')]
+    assert report.issues[0].conflicts == [{'type': 'lecturer_conflict', 'with_schedule': 'E1'}]
+    assert report.issues[1].conflicts == [{'type': 'room_conflict', 'with_schedule': 'N1'}]
+    assert len(index) == 1
+    
+    report = check_import((row + "\n" for row in rows), 'csv', index, on_error='skip')
+    assert [s.id for s in report.accepted] == ["N1"]
+    
+    # JSON Lines, with a malformed line reported by row number
+    records = [{"id": "J1", "course_name": "Web", "hari": "Kamis", "jam_mulai": "08:00",
+                "jam_selesai": "09:00", "ruangan": "Lab 1", "dosen": "Dr. E"}]
+    lines = [json.dumps(r) for r in records] + ["", "{not json", "[1, 2]"]
+    report = check_import(lines, 'jsonl', index, on_error='skip')
+    assert [s.id for s in report.accepted] == ["J1"]
+    assert [(i.row, i.status) for i in report.issues] == [(2, 'invalid'), (3, 'invalid')]
+    
+    # A whole semester is checked in one pass, rows streaming from a generator
+    schedules = _random_schedules(5000, seed=29, rooms=200, lecturers=300)
+    def semester():
+        yield ",".join(("id", "course_name", "hari", "jam_mulai", "jam_selesai", "ruangan", "dosen")) + "\n"
+        for s in schedules:
+            yield (f"{s.id},{s.course_name},{s.hari},{s.jam_mulai:%H:%M},{s.jam_selesai:%H:%M},"
+                   f"{s.ruangan},{s.dosen}\n")
+    report = ScheduleImporter(ConflictIndex(), on_error='skip').check(iter_records(semester(), 'csv'))
+    assert report.rows == 5000
+    accepted = report.accepted
+    assert not ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(accepted)
+    # Every skipped row really conflicts with a row accepted before it
+    check = ConflictIndex()
+    rejected = {issue.schedule_id for issue in report.issues}
+    for schedule in schedules:
+        if schedule.id in rejected:
+            assert check.has_conflicts(schedule)
+        else:
+            check.add(schedule)
+    assert len(accepted) + len(rejected) == 5000
+    
+    print(f"✓ Test 29 passed! {len(accepted)} of 5000 rows accepted in {report.elapsed_seconds:.2f}s, "
+          f"{len(rejected)} conflicting rows reported")
+
+
+def test_paginated_schedule_queries():
+    """Test case 30: Keyset pages with indexed filters match filtering the full list"""
+    print("\n" + "="*80)
+    print("TEST 30: PAGINATED AND FILTERED SCHEDULE QUERIES")
+    print("="*80)
+    
+    schedules = _random_schedules(2000, seed=30, rooms=20, lecturers=25)
+    store = ScheduleStore()
+    store.add_many(schedules)
+    
+    def all_pages(**filters):
+        found, cursor = [], 0
+        while cursor is not None:
+            page, cursor = store.page(after=cursor, limit=70, **filters)
+            assert len(page) <= 70
+            found.extend(s.id for s in page)
+        return found
+    
+    assert all_pages() == [s.id for s in schedules]
+    assert all_pages(hari="Rabu", ruangan="Lab 4") == [
+        s.id for s in schedules if s.hari == "Rabu" and s.ruangan == "Lab 4"]
+    assert all_pages(dosen="Dosen 9") == [s.id for s in schedules if s.dosen == "Dosen 9"]
+    assert all_pages(course_name="Course 42") == ["SCH00042"]
+    window = TimeInterval(time(10, 0), time(11, 0))
+    assert all_pages(hari="Senin", start=time(10, 0), end=time(11, 0)) == [
+        s.id for s in schedules
+        if s.hari == "Senin" and TimeInterval(s.jam_mulai, s.jam_selesai).overlaps_with(window)]
+    
+    # Filters are served by indexes, with the cursor as a rowid range
+    plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT seq FROM schedules WHERE seq > ? AND dosen = ? ORDER BY seq",
+        (0, "Dosen 9")).fetchall()
+    assert 'idx_schedules_dosen' in plan[0][-1]
+    
+    # The ETag follows the schedule-set version
+    etag = store.etag
+    store.page(limit=10)
+    assert store.etag == etag
+    store.remove(schedules[0].id)
+    assert store.etag != etag
+    etag = store.etag
+    store.add_many(schedules[:1])
+    assert store.etag != etag and store.version == 3
+    assert ScheduleStore().etag != ScheduleStore().etag
+    
+    print(f"✓ Test 30 passed! {len(schedules)} schedules paged with filters, ETag tied to version")
+
+
+def test_concurrent_store_access():
+    """Test case 31: Concurrent bookings never double-book and readers share the lock"""
+    print("\n" + "="*80)
+    print("TEST 31: THREAD-SAFE STORE AND READER-WRITER LOCK")
+    print("="*80)
+    
+    # Readers overlap each other; a writer waits for them and excludes them
+    lock = ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=5)
+    events = []
+    
+    def reader(name):
+        with lock.read():
+            both_reading.wait()
+            events.append(name)
+    
+    readers = [threading.Thread(target=reader, args=(f"r{i}",)) for i in range(2)]
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    assert sorted(events) == ["r0", "r1"]
+    
+    lock.acquire_read()
+    def writer_task():
+        lock.acquire_write()
+        events.append("w")
+    
+    writer = threading.Thread(target=writer_task)
+    writer.start()
+    writer.join(timeout=0.2)
+    assert "w" not in events and writer.is_alive()
+    lock.release_read()
+    writer.join(timeout=5)
+    assert events[-1] == "w"
+    lock.release_write()
+    
+    # Eight threads race to book 40 contested slots in a file database
+    with tempfile.TemporaryDirectory() as directory:
+        store = ScheduleStore(os.path.join(directory, "jadwal.db"))
+        booked, lost = [], []
+        start_together = threading.Barrier(8, timeout=5)
+        
+        def book(worker):
+            start_together.wait()
+            for slot in range(40):
+                start = 7 * 60 + (slot % 10) * 60
+                candidate = Schedule(f"W{worker}-{slot}", ["Senin", "Selasa", "Rabu", "Kamis"][slot // 10],
+                                     time(start // 60, 0), time(start // 60 + 1, 30),
+                                     "Lab 301", f"Dosen {worker}", f"Course {slot}")
+                if store.add_checked(candidate):
+                    lost.append(candidate.id)
+                else:
+                    booked.append(candidate.id)
+                store.page(hari="Senin", limit=20)
+                len(store)
+        
+        workers = [threading.Thread(target=book, args=(i,)) for i in range(8)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        
+        stored = store.schedules()
+        assert len(booked) + len(lost) == 320
+        assert sorted(s.id for s in stored) == sorted(booked)
+        assert not ScheduleConflictDetector(mode='sweep').detect_schedule_conflict(stored)
+        # 1.5h classes starting every hour in one room, tried in order by
+        # every worker: exactly the even slots of each day get booked
+        assert len(stored) == 20
+        
+        # One store per thread shares nothing but the file, like separate
+        # worker processes: the database transaction alone keeps them apart
+        stores = [ScheduleStore(store.path) for _ in range(4)]
+        start_together = threading.Barrier(4, timeout=5)
+        versions = [s.version for s in stores]
+        results = []
+        
+        def book_elsewhere(worker):
+            start_together.wait()
+            candidate = Schedule(f"P{worker}", "Jumat", time(9, 0), time(10, 0), "Lab 302", f"Dosen P{worker}")
+            results.append(not stores[worker].add_checked(candidate))
+        
+        racers = [threading.Thread(target=book_elsewhere, args=(i,)) for i in range(4)]
+        for thread in racers:
+            thread.start()
+        for thread in racers:
+            thread.join()
+        assert sorted(results) == [False, False, False, True]
+        # Every store sees the write through the version kept in the database
+        assert len({s.version for s in stores}) == 1 and stores[0].version == versions[0] + 1
+        assert len({s.etag for s in stores}) == 1
+        assert all(len(s.table()) == 21 for s in stores)
+        
+        # A long booking made elsewhere widens every store's overlap scan
+        stores[0].add(Schedule("LONG", "Sabtu", time(7, 0), time(17, 0), "Lab 303", "Dosen L"))
+        late = Schedule("LATE", "Sabtu", time(16, 0), time(16, 30), "Lab 303", "Dosen M")
+        assert [c.affected_schedules[0].id for c in stores[1].find_conflicts(late)] == ["LONG"]
+        for other in stores:
+            other.close()
+        store.close()
+    
+    # Readers share one detector and one result cache: every thread gets
+    # the full conflict list, and the cache runs detection once per version
+    schedules = _random_schedules(400, seed=31)
+    expected = len(ScheduleConflictDetector().detect_schedule_conflict(schedules))
+    assert expected > 100
+    shared = ScheduleConflictDetector()
+    detections = []
+    
+    class CountingDetector(ScheduleConflictDetector):
+        runs = 0
+        
+        def detect_schedule_conflict(self, schedules):
+            CountingDetector.runs += 1
+            return super().detect_schedule_conflict(schedules)
+    
+    cache = ConflictResultCache(CountingDetector(mode='sweep'))
+    cached = []
+    
+    def detect_repeatedly():
+        for _ in range(5):
+            detections.append(len(shared.detect_schedule_conflict(schedules)))
+            cached.append(len(cache.conflicts(schedules)))
+    
+    readers = [threading.Thread(target=detect_repeatedly) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    assert detections == [expected] * 20
+    assert cached == [expected] * 20
+    assert CountingDetector.runs == 1
+    
+    print(f"✓ Test 31 passed! {len(booked)} of 320 racing bookings stored, none double-booked")
+
+
+def _web_app():
+    """The Flask app module, on an in-memory store when the tests import it first"""
+    if 'app' not in sys.modules:
+        os.environ['JADWAL_DB'] = ':memory:'
+    import app as api
+    return api
+
+
+def test_asgi_entry_point():
+    """Test case 32: The ASGI entry point serves the Flask routes and notifies in the background"""
+    print("\n" + "="*80)
+    print("TEST 32: ASGI ENTRY POINT")
+    print("="*80)
+    
+    import asyncio
+    api = _web_app()
+    from asgi_app import AsyncScheduleAPI
+    
+    class RecordingObserver:
+        def __init__(self):
+            self.events = []
+        
+        def update(self, event_type, data):
+            self.events.append((event_type, threading.current_thread().name))
+    
+    def streaming_app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        for i in range(100):
+            yield f"{i}\n".encode()
+    
+    async def call(server, method, path, payload=None, query=b''):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+        
+        async def receive():
+            return messages.pop(0)
+        
+        async def send(message):
+            sent.append(message)
+        
+        # No content-length header, as for a chunked upload
+        await server({'type': 'http', 'method': method, 'path': path, 'query_string': query,
+                      'headers': [(b'content-type', b'application/json')]}, receive, send)
+        return sent[0]['status'], b''.join(message.get('body', b'') for message in sent[1:])
+    
+    async def scenario():
+        server = AsyncScheduleAPI()
+        observer = RecordingObserver()
+        api.subject.attach(observer)
+        lifespan = asyncio.Queue()
+        lifespan_sent = []
+        
+        async def lifespan_send(message):
+            lifespan_sent.append(message)
+        
+        await lifespan.put({'type': 'lifespan.startup'})
+        running = asyncio.ensure_future(server({'type': 'lifespan'}, lifespan.get, lifespan_send))
+        while not lifespan_sent:
+            await asyncio.sleep(0)
+        assert lifespan_sent[0]['type'] == 'lifespan.startup.complete'
+        assert api.notify == server.notify
+        
+        try:
+            schedule = {'id': 'ASGI1', 'course_name': 'Async', 'hari': 'Sabtu', 'jam_mulai': '08:00',
+                        'jam_selesai': '10:00', 'ruangan': 'Ruang ASGI', 'dosen': 'Dr. Async'}
+            status, body = await call(server, 'POST', '/api/schedules', schedule)
+            assert status == 201, body
+            status, body = await call(server, 'POST', '/api/schedules', dict(schedule, id='ASGI2'))
+            assert status == 409
+            
+            # Concurrent requests run side by side in the view pool
+            results = await asyncio.gather(*[
+                call(server, 'GET', '/api/schedules', query=b'hari=Sabtu') for _ in range(20)])
+            assert {status for status, _ in results} == {200}
+            assert all(json.loads(body)['schedules'][0]['id'] == 'ASGI1' for _, body in results)
+            
+            await server.drain()
+            assert sorted(event for event, _ in observer.events) == ['SCHEDULE_ADDED', 'SCHEDULE_CONFLICT_DETECTED']
+            assert all(thread.startswith('jadwal-notify') for _, thread in observer.events)
+            
+            # A streamed body arrives complete and in order through the bounded queue
+            streamer = AsyncScheduleAPI(streaming_app, max_workers=2)
+            streamer._loop = asyncio.get_running_loop()  # keep app.py's notifier on `server`
+            status, body = await call(streamer, 'GET', '/')
+            assert status == 200
+            assert body.decode().split() == [str(i) for i in range(100)]
+            streamer.executor.shutdown()
+            streamer.notify_executor.shutdown()
+        finally:
+            api.subject.detach(observer)
+            await call(server, 'DELETE', '/api/schedules/ASGI1')
+            await lifespan.put({'type': 'lifespan.shutdown'})
+            await running
+        
+        assert lifespan_sent[-1]['type'] == 'lifespan.shutdown.complete'
+        assert api.notify != server.notify
+    
+    asyncio.run(scenario())
+    
+    print("✓ Test 32 passed! Routes served over ASGI, notifications delivered off the request path")
+
+
+def test_web_routes():
+    """Test case 33: Conflict, report, free-slot, student, repair and import routes, including bad input"""
+    print("\n" + "="*80)
+    print("TEST 33: WEB API ROUTES")
+    print("="*80)
+    
+    from werkzeug.test import EnvironBuilder
+    api = _web_app()
+    client = api.app.test_client()
+    before = client.get('/api/statistics').get_json()
+    
+    # POST rejects conflicting bookings, so seed six overlapping classes in
+    # one room the way startup loads an existing database
+    seeded = [Schedule(f"WEB{i}", "Sabtu", time(8, 0), time(10, 0), "Ruang Web", f"Dosen Web {i}", f"Web {i}")
+              for i in range(6)]
+    with api.state_lock.write():
+        api.store.add_many(seeded)
+        for schedule in seeded:
+            api.conflict_index.add(schedule)
+            api.occupancy.add(schedule)
+        api.conflict_cache.bump()
+    
+    try:
+        stats = client.get('/api/statistics').get_json()
+        assert stats['total_conflicts'] == before['total_conflicts'] + 15
+        total = stats['total_conflicts']
+        
+        # Conflicts are paged; every listed conflict carries suggestions
+        first = client.get('/api/conflicts?limit=10').get_json()
+        assert len(first['conflicts']) == 10 and first['next_offset'] == 10
+        rest = client.get(f"/api/conflicts?offset={first['next_offset']}&limit=1000").get_json()
+        assert rest['next_offset'] is None
+        listed = first['conflicts'] + rest['conflicts']
+        assert len(listed) == total
+        assert all(conflict['suggestions'] for conflict in listed)
+        assert client.get('/api/conflicts?limit=ten').status_code == 400
+        assert client.get('/api/conflicts?view=graph').status_code == 400
+        clusters = client.get('/api/conflicts?view=clusters').get_json()['clusters']
+        assert any(sorted(c['schedules']) == [s.id for s in seeded] for c in clusters)
+        
+        # Reports
+        report = client.get('/api/conflicts/report?format=csv').get_data(as_text=True)
+        assert len(list(csv.DictReader(io.StringIO(report)))) == total
+        report = client.get('/api/conflicts/report').get_data(as_text=True)
+        assert f"ROOM CONFLICTS ({stats['room_conflicts']}):" in report
+        assert client.get('/api/conflicts/report?format=xml').status_code == 400
+        
+        # Free slots avoid the booked morning
+        slots = client.get('/api/free-slots?duration=120&hari=Sabtu&ruangan=Ruang Web&limit=5').get_json()
+        assert len(slots['candidates']) == 5
+        assert all(slot['jam_mulai'] >= '10:00' or slot['jam_selesai'] <= '08:00' for slot in slots['candidates'])
+        assert client.get('/api/free-slots?duration=0').status_code == 400
+        assert client.get('/api/free-slots?duration=60&near_jam_mulai=8h').status_code == 400
+        
+        # Student conflicts
+        enrollments = {'Web 0': ['M1', 'M2'], 'Web 1': ['M2', 'M3']}
+        students = client.post('/api/conflicts/students', json={'enrollments': enrollments}).get_json()
+        assert students['total_conflicts'] == 1
+        assert students['conflicts'][0]['details']['students_affected'] == 1
+        for body in ([enrollments], {'enrollments': ['Web 0']}, {'enrollments': {'Web 0': 5}},
+                     {'enrollments': {'Web 0': 'M1'}}, {'enrollments': enrollments, 'limit': 'all'}):
+            assert client.post('/api/conflicts/students', json=body).status_code == 400, body
+        
+        # Import: a conflicting row aborts the batch, a clean one is added
+        header = ','.join(IMPORT_FIELDS) + '\n'
+        clash = header + 'WEB8,Clash,Sabtu,09:00,10:00,Ruang Web,Dosen Web 8\n'
+        response = client.post('/api/schedules/import?format=csv', data=clash, content_type='text/csv')
+        assert response.status_code == 409 and response.get_json()['aborted']
+        clean = header + 'WEB7,Evening,Sabtu,19:00,20:00,Ruang Web,Dosen Web 7\n'
+        response = client.post('/api/schedules/import', data=clean, content_type='text/csv')
+        assert response.status_code == 201, response.get_json()
+        assert client.post('/api/schedules/import?format=xml', data=clean).status_code == 400
+        
+        # The upload is read before the write lock is taken: readers get through mid-transfer
+        class SlowUpload(io.BytesIO):
+            reads_blocked = 0
+            
+            @staticmethod
+            def _read_state():
+                with api.state_lock.read():
+                    pass
+            
+            def readinto(self, buffer):
+                reader = threading.Thread(target=self._read_state, daemon=True)
+                reader.start()
+                reader.join(timeout=1)
+                if reader.is_alive():
+                    SlowUpload.reads_blocked += 1
+                return super().readinto(buffer)
+        
+        # Served through the raw WSGI app: the test client would buffer the body first
+        body = (header + 'WEB9,Late,Sabtu,20:00,21:00,Ruang Web,Dosen Web 9\n').encode()
+        environ = EnvironBuilder('/api/schedules/import', method='POST', data=body,
+                                 content_type='text/csv').get_environ()
+        environ['wsgi.input'] = SlowUpload(body)
+        status = []
+        b''.join(api.app.wsgi_app(environ, lambda code, headers: status.append(code)))
+        assert status == ['201 CREATED'] and SlowUpload.reads_blocked == 0
+        
+        # Repair: bad bodies are rejected, a dry run changes nothing, apply resolves
+        for body in ({'pinned': 5}, {'pinned': 'WEB0'}, {'pinned': ['WEB0', 1]}, ['WEB0'], {'time_budget': -1}):
+            assert client.post('/api/conflicts/repair', json=body).status_code == 400, body
+        dry = client.post('/api/conflicts/repair', json={'pinned': ['WEB0']}).get_json()
+        assert dry['resolved'] and not dry['applied']
+        assert 'WEB0' not in [move['schedule_id'] for move in dry['moves']]
+        assert client.get('/api/statistics').get_json()['total_conflicts'] == total
+        applied = client.post('/api/conflicts/repair', json={'apply': True, 'pinned': ['WEB0']}).get_json()
+        assert applied['resolved'] and applied['applied']
+        assert client.get('/api/statistics').get_json()['total_conflicts'] == before['total_conflicts']
+        
+        # A booking committed by another worker process on the same database
+        # reaches this process's indexes and caches on the next request
+        elsewhere = Schedule("WEB10", "Sabtu", time(21, 0), time(22, 0), "Ruang Web", "Dosen Web 10", "Web 10")
+        api.store.add(elsewhere)
+        availability = client.get('/api/availability?hari=Sabtu&jam_mulai=21:00&jam_selesai=21:30'
+                                  '&ruangan=Ruang Web').get_json()
+        assert availability['room_free'] is False and "WEB10" in api.conflict_index
+        clash = {'id': 'WEB11', 'course_name': 'Clash', 'hari': 'Sabtu', 'jam_mulai': '21:30',
+                 'jam_selesai': '22:00', 'ruangan': 'Ruang Web', 'dosen': 'Dosen Web 11'}
+        assert client.post('/api/schedules', json=clash).status_code == 409
+    finally:
+        for schedule_id in [s.id for s in seeded] + ['WEB7', 'WEB9', 'WEB10']:
+            client.delete(f'/api/schedules/{schedule_id}')
+    
+    after = client.get('/api/statistics').get_json()
+    assert after['total_schedules'] == before['total_schedules']
+    
+    print(f"✓ Test 33 passed! {total} conflicts served through the routes, bad input rejected with 400")
+
+
+def test_schedule_manager_duplicate_ids():
+    """Test case 34: ScheduleManager rejects a second schedule with an existing ID"""
+    print("\n" + "="*80)
+    print("TEST 34: SCHEDULE MANAGER DUPLICATE IDS")
+    print("="*80)
+    
+    from integration_example import ScheduleManager
+    
+    class EventRecorder:
+        def __init__(self):
+            self.events = []
+        
+        def update(self, event_type, schedule_data):
+            self.events.append((event_type, schedule_data['schedule_id']))
+    
+    manager = ScheduleManager()
+    recorder = EventRecorder()
+    manager.register_observer(recorder)
+    original = Schedule("DUP1", "Senin", time(8, 0), time(10, 0), "Lab 1", "Dr. A", "Original")
+    # Free slot, other room and lecturer: only the ID clashes
+    duplicate = Schedule("DUP1", "Selasa", time(13, 0), time(15, 0), "Lab 2", "Dr. B", "Duplicate")
+    
+    assert manager.add_schedule(original)
+    assert not manager.add_schedule(duplicate)
+    assert manager.index.get("DUP1") is original
+    assert manager.schedules == [original]
+    assert recorder.events == [('SCHEDULE_ADDED', 'DUP1'), ('SCHEDULE_ADD_FAILED', 'DUP1')]
+    
+    print("✓ Test 34 passed! Duplicate ID rejected, original schedule kept")
+
+
 def run_all_tests():
     """Run all test cases"""
     print("\n" + "█" * 80)
@@ -301,6 +1909,33 @@ def run_all_tests():
         test_different_days_no_conflict()
         test_edge_case_touching_times()
         test_large_schedule()
+        test_interval_tree_operations()
+        test_sweep_mode_matches_interval_tree()
+        test_conflict_index_incremental()
+        test_vectorized_backend_matches()
+        test_parallel_mode_deterministic()
+        test_schedule_table_input()
+        test_lazy_details_and_counts_only()
+        test_iter_conflicts_streaming()
+        test_versioned_result_cache()
+        test_benchmark_regression_check()
+        test_detector_instrumentation()
+        test_occupancy_bitsets()
+        test_free_slot_search()
+        test_conflict_repair()
+        test_conflict_clusters()
+        test_streaming_report_writer()
+        test_recurring_schedules()
+        test_student_conflicts()
+        test_rule_engine()
+        test_targeted_conflict_queries()
+        test_sqlite_schedule_store()
+        test_bulk_import()
+        test_paginated_schedule_queries()
+        test_concurrent_store_access()
+        test_asgi_entry_point()
+        test_web_routes()
+        test_schedule_manager_duplicate_ids()
         
         print("\n" + "█" * 80)
         print("█" + " " * 78 + "█")
@@ -0,0 +1,165 @@
+"""
+NumPy-vectorized Schedule Conflict Detection for bulk imports
+"""
+
+from array import array
+from typing import List, Dict, Tuple, Union
+
+from conflict_detector import Schedule, Conflict, ScheduleConflictDetector, ScheduleTable, TimeInterval, _gc_paused
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this backend needs it
+    np = None
+
+
+class VectorizedConflictDetector(ScheduleConflictDetector):
+    """
+    Drop-in replacement for ScheduleConflictDetector backed by NumPy
+
+    Day, room, lecturer and start/end minutes are encoded as integer arrays.
+    Within every (day, room) and (day, lecturer) group the intervals are
+    sorted once, and searchsorted finds for each interval the run of later
+    intervals starting before it ends - no per-pair Python loop.
+
+    Only detect_schedule_conflict() is vectorized; streaming, counting and
+    cluster detection are inherited and run in 'sweep' mode, which is what
+    self.mode reports. The backend attribute tells the two apart.
+    """
+
+    backend = 'numpy'
+
+    def __init__(self, instrument: bool = False):
+        if np is None:
+            raise ImportError("VectorizedConflictDetector requires numpy (pip install numpy)")
+        super().__init__(mode='sweep', instrument=instrument)
+
+    def detect_schedule_conflict(self, schedules: Union[List[Schedule], ScheduleTable]) -> List[Conflict]:
+        """
+        Detect all conflicts in a list of schedules
+
+        Args:
+            schedules: List of Schedule objects, or a ScheduleTable whose
+                arrays are used without any per-row conversion
+
+        Returns:
+            List of Conflict objects with details, room conflicts first,
+            each ordered by the position of the schedules in the input
+        """
+        conflicts: List[Conflict] = []
+        self._begin_run(schedules)
+        try:
+            if len(schedules) >= 2:
+                with _gc_paused:
+                    conflicts = self._detect_arrays(schedules)
+        finally:
+            self._end_run(len(conflicts))
+        return conflicts
+
+    def _detect_arrays(self, schedules: Union[List[Schedule], ScheduleTable]) -> List[Conflict]:
+        """Vectorized detection of at least two schedules"""
+        with self._phase('grouping'):
+            if isinstance(schedules, ScheduleTable):
+                ids = self._encode(schedules.ids)
+                days = self._from_array(schedules.days)
+                rooms = self._from_array(schedules.rooms)
+                lecturers = self._from_array(schedules.lecturers)
+                starts = self._from_array(schedules.starts)
+                ends = self._from_array(schedules.ends)
+                schedule_at = schedules.materializer()
+            else:
+                ids = self._encode([s.id for s in schedules])
+                days = self._encode([s.hari for s in schedules])
+                rooms = self._encode([s.ruangan for s in schedules])
+                lecturers = self._encode([s.dosen for s in schedules])
+                starts = np.fromiter(
+                    (TimeInterval._time_to_minutes(s.jam_mulai) for s in schedules), dtype=np.int64,
+                    count=len(schedules)
+                )
+                ends = np.fromiter(
+                    (TimeInterval._time_to_minutes(s.jam_selesai) for s in schedules), dtype=np.int64,
+                    count=len(schedules)
+                )
+                schedule_at = schedules.__getitem__
+
+        found = []
+        with self._phase('overlap_query'):
+            for conflict_type, resources in (('room_conflict', rooms), ('lecturer_conflict', lecturers)):
+                groups = days * (int(resources.max()) + 1) + resources
+                first, second = self._overlapping_pairs(groups, starts, ends)
+                keep = ids[first] != ids[second]
+                found.append((conflict_type, first[keep], second[keep]))
+                if self.stats is not None:
+                    self.stats.groups += len(np.unique(groups))
+                    self.stats.candidate_pairs += len(first)
+
+        with self._phase('conflict_construction'):
+            # Materialize every involved row once, then index the objects
+            # with plain lists instead of converting each pair separately
+            positions = np.unique(np.concatenate([first for _, first, _ in found] + [second for _, _, second in found]))
+            rows = [schedule_at(position) for position in positions.tolist()]
+            conflicts = []
+            for conflict_type, first, second in found:
+                firsts = [rows[i] for i in np.searchsorted(positions, first).tolist()]
+                seconds = [rows[i] for i in np.searchsorted(positions, second).tolist()]
+                conflicts.extend([Conflict(conflict_type, [schedule1, schedule2], day=schedule1.hari)
+                                  for schedule1, schedule2 in zip(firsts, seconds)])
+        return conflicts
+
+    @staticmethod
+    def _encode(values: List[str]) -> 'np.ndarray':
+        """Map arbitrary hashable values to dense integer ids"""
+        codes: Dict[str, int] = {}
+        return np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int64, count=len(values))
+
+    @staticmethod
+    def _from_array(values: array) -> 'np.ndarray':
+        """Widen a stdlib array to int64 without going through Python ints"""
+        return np.frombuffer(values, dtype=values.typecode).astype(np.int64)
+
+    @staticmethod
+    def _overlapping_pairs(groups: 'np.ndarray', starts: 'np.ndarray',
+                           ends: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Find all overlapping pairs that share a group id
+
+        Args:
+            groups: Group id per position
+            starts: Start minutes per position
+            ends: End minutes per position
+
+        Returns:
+            (first, second) position arrays with first < second, sorted
+        """
+        order = np.lexsort((ends, starts, groups))
+        sorted_groups = groups[order]
+        sorted_starts = starts[order]
+        sorted_ends = ends[order]
+
+        # A single sortable key: group-major, start-minor
+        span = int(max(starts.max(), ends.max())) + 1
+        offset = sorted_groups * span
+        keys = offset + sorted_starts
+
+        # Candidates for i are the later intervals of its group starting before it ends
+        n = len(order)
+        lo = np.arange(1, n + 1)
+        hi = np.searchsorted(keys, offset + np.maximum(sorted_ends, sorted_starts), side='left')
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        left = np.repeat(np.arange(n), counts)
+        run_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        right = left + 1 + (np.arange(total) - run_offsets)
+
+        # Both overlap conditions; sorting already ordered the starts
+        overlap = (sorted_starts[right] < sorted_ends[left]) & (sorted_starts[left] < sorted_ends[right])
+        a = order[left[overlap]]
+        b = order[right[overlap]]
+        first = np.minimum(a, b)
+        second = np.maximum(a, b)
+        pair_order = np.lexsort((second, first))
+        return first[pair_order], second[pair_order]